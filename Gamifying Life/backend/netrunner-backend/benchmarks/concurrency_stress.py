@@ -0,0 +1,122 @@
+"""Concurrency stress test for the reward and bandwidth paths.
+
+Forks several worker processes (like gunicorn workers) that hammer
+complete_contract and spend_bandwidth for the same netrunner through the
+Flask test client, then checks that no credit, EXP or bandwidth update
+was lost.
+
+    python benchmarks/concurrency_stress.py --workers 8 --requests 200
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def load_app(database_path):
+    from src.main import create_app
+    return create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database_path}', 'AUTO_MIGRATE': True})
+
+
+def worker(database_path, contract_ids, spends, results):
+    app = load_app(database_path)
+    from src.models.user import db
+    with app.app_context():
+        # Never share pooled SQLite connections across a fork
+        db.engine.dispose(close=False)
+
+    client = app.test_client()
+    exp = credits = 0
+    bandwidth = 0.0
+    failures = 0
+    for contract_id, netrunner_id in contract_ids:
+        response = client.post(f'/api/contracts/{contract_id}/complete', json={'time_spent': 2.0})
+        if response.status_code != 200:
+            failures += 1
+            continue
+        exp += response.json['rewards']['exp_gained']
+        credits += response.json['rewards']['credits_gained']
+    for netrunner_id, amount in spends:
+        response = client.post(
+            f'/api/netrunner/{netrunner_id}/bandwidth/spend',
+            json={'amount': amount, 'penalty_multiplier': 1.0}
+        )
+        if response.status_code != 200:
+            failures += 1
+            continue
+        bandwidth += amount
+    results.put((exp, credits, bandwidth, failures))
+
+
+def total_exp(level, exp):
+    return sum(lvl * 200 + 800 for lvl in range(1, level)) + exp
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=200, help='Requests per worker.')
+    args = parser.parse_args()
+
+    database_path = os.path.join(tempfile.mkdtemp(), 'stress.db')
+    app = load_app(database_path)
+    client = app.test_client()
+    netrunner = client.post('/api/netrunner', json={'alias': 'stress'}).json
+
+    # Half the requests complete contracts (time_spent over estimate, so no BW recovery)
+    per_worker = args.requests // 2
+    assignments = []
+    for _ in range(args.workers):
+        contracts = []
+        for i in range(per_worker):
+            contract = client.post(
+                f"/api/netrunner/{netrunner['id']}/contracts",
+                json={'title': f'stress {i}', 'time_estimate': 1.0}
+            ).json
+            contracts.append((contract['id'], netrunner['id']))
+        spends = [(netrunner['id'], 0.01)] * (args.requests - per_worker)
+        assignments.append((contracts, spends))
+
+    results = multiprocessing.Queue()
+    context = multiprocessing.get_context('fork')
+    processes = [
+        context.Process(target=worker, args=(database_path, contracts, spends, results))
+        for contracts, spends in assignments
+    ]
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    totals = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+
+    exp = sum(t[0] for t in totals)
+    credits = sum(t[1] for t in totals)
+    spent = sum(t[2] for t in totals)
+    failures = sum(t[3] for t in totals)
+    final = client.get(f"/api/netrunner/{netrunner['id']}").json
+
+    expected_bandwidth = netrunner['current_bandwidth'] - spent
+    checks = {
+        'credits': (final['credits'], netrunner['credits'] + credits),
+        'exp': (total_exp(final['level'], final['exp']), exp),
+        'current_bandwidth': (round(final['current_bandwidth'], 6), round(expected_bandwidth, 6)),
+    }
+    request_count = args.workers * args.requests
+    print(f'{request_count} requests from {args.workers} workers in {elapsed:.2f}s '
+          f'({request_count / elapsed:.0f} req/s), {failures} failed')
+    lost = False
+    for name, (actual, expected) in checks.items():
+        status = 'ok' if actual == expected else 'LOST UPDATES'
+        lost |= actual != expected
+        print(f'  {name}: {actual} (expected {expected}) {status}')
+    sys.exit(1 if lost or failures else 0)
+
+
+if __name__ == '__main__':
+    main()
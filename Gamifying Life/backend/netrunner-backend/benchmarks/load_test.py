@@ -0,0 +1,416 @@
+"""Load and latency benchmark for every API route.
+
+Seeds a SQLite database at the requested scale (or reuses one), then
+drives each route in routes/netrunner.py and routes/user.py, plus the
+leaderboard, with a pool of concurrent clients. It runs once through the
+Flask test client and once against a real threaded WSGI server. The
+output is JSON with p50/p95/p99 latency, throughput and SQL queries per
+request for each endpoint, so two runs can be diffed between commits.
+
+    python benchmarks/load_test.py --netrunners 10000 --contracts 1000000 \\
+        --entries 10000000 --database /tmp/load.db --output before.json
+    python benchmarks/load_test.py --database /tmp/load.db --skip-seed --output after.json
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DIFFICULTIES = ['Low-Profile', 'Standard-Op', 'High-Stakes']
+SKILL_TREES = ['System Infiltration', 'Hardware Maintenance', 'Data Analysis', 'Social Engineering']
+SEED_BATCH = 20000
+
+
+def load_app(database_path):
+    from src.main import create_app
+    return create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database_path}', 'AUTO_MIGRATE': True})
+
+
+def batches(rows, size=SEED_BATCH):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def bulk_insert(table, rows):
+    from src.models.user import db
+    for batch in batches(rows):
+        db.session.execute(table.insert(), batch)
+        db.session.commit()
+
+
+def seed(args):
+    """Bulk-load netrunners, contracts, data stream entries and skill points with Core inserts."""
+    from src.models.user import db
+    from src.models.netrunner import (
+        Netrunner, Contract, DataStreamEntry, SkillPoint, SkillTreeRollup, LevelCount
+    )
+
+    rng = random.Random(args.seed)
+    start = datetime(2025, 1, 1)
+    span = timedelta(days=30).total_seconds()
+    db.session.execute(db.text('PRAGMA synchronous=OFF'))
+
+    bulk_insert(Netrunner.__table__, ({
+        'alias': f'runner-{i}',
+        'level': rng.randint(1, 40),
+        'exp': rng.randint(0, 900),
+        'credits': rng.randint(0, 50000),
+        'current_bandwidth': 16.0,
+        'max_bandwidth': 16.0,
+        'signal_debt': False,
+        'created_at': start,
+        'last_active': start,
+        'version': 1
+    } for i in range(args.netrunners)))
+
+    def contracts():
+        for i in range(args.contracts):
+            completed = rng.random() < 0.7
+            created_at = start + timedelta(seconds=rng.random() * span)
+            yield {
+                'netrunner_id': rng.randint(1, args.netrunners),
+                'title': f'Contract {i}',
+                'description': 'Seeded by the load test',
+                'difficulty': rng.choice(DIFFICULTIES),
+                'status': 'completed' if completed else 'pending',
+                'time_estimate': 1.0,
+                'time_spent': 1.0 if completed else 0.0,
+                'progress': 100 if completed else 0,
+                'exp_reward': 150,
+                'credit_reward': 75,
+                'contract_type': 'main',
+                'created_at': created_at,
+                'completed_at': created_at + timedelta(hours=1) if completed else None
+            }
+    bulk_insert(Contract.__table__, contracts())
+
+    bulk_insert(DataStreamEntry.__table__, ({
+        'netrunner_id': rng.randint(1, args.netrunners),
+        'message': f'CONTRACT_COMPLETED: Contract {i}',
+        'entry_type': 'success',
+        'created_at': start + timedelta(seconds=rng.random() * span)
+    } for i in range(args.entries)))
+
+    bulk_insert(SkillPoint.__table__, ({
+        'netrunner_id': netrunner_id,
+        'skill_tree': rng.choice(SKILL_TREES),
+        'points': rng.randint(1, 5),
+        'acquired_at': start
+    } for netrunner_id in range(1, args.netrunners + 1) for _ in range(3)))
+
+    SkillTreeRollup.rebuild()
+    LevelCount.rebuild()
+    db.session.execute(db.text('PRAGMA synchronous=NORMAL'))
+
+
+def instrument(app):
+    """Report the SQL statements each request ran in an X-SQL-Queries header."""
+    from flask import g, has_request_context
+    from sqlalchemy import event
+    from src.models.user import db
+
+    def count_query(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context():
+            g.sql_queries = g.get('sql_queries', 0) + 1
+
+    def add_header(response):
+        response.headers['X-SQL-Queries'] = str(g.get('sql_queries', 0))
+        return response
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', count_query)
+    # after_request hooks run last-registered first; go to the front so the unit of work's commit is counted
+    app.after_request_funcs.setdefault(None, []).insert(0, add_header)
+
+
+class Pools:
+    """Ids the write endpoints consume, so every request hits a valid row."""
+
+    def __init__(self, app, args):
+        from src.models.user import db, User
+        from src.models.netrunner import Contract
+
+        self.netrunners = args.netrunners
+        self.rng = random.Random(args.seed + 1)
+        self.lock = threading.Lock()
+        self.sequence = itertools.count()
+        run = f'{os.getpid()}-{time.time_ns()}'
+        self.run = run
+        with app.app_context():
+            # Fresh pending contracts for start/complete and users for update/delete, per run
+            db.session.execute(Contract.__table__.insert(), [{
+                'netrunner_id': self.netrunner(),
+                'title': f'Load {run} {i}',
+                'difficulty': 'Standard-Op',
+                'status': 'pending',
+                'time_estimate': 1.0,
+                'exp_reward': 150,
+                'credit_reward': 75,
+                'created_at': datetime.utcnow()
+            } for i in range(args.requests * 2)])
+            db.session.execute(User.__table__.insert(), [
+                {'username': f'load-{run}-{i}', 'email': f'load-{run}-{i}@example.com'}
+                for i in range(args.requests * 2)
+            ])
+            db.session.commit()
+            self.to_start = db.session.execute(
+                db.select(Contract.id).where(Contract.title.like(f'Load {run} %')).order_by(Contract.id)
+            ).scalars().all()
+            self.to_complete = self.to_start[args.requests:]
+            self.to_start = self.to_start[:args.requests]
+            user_ids = db.session.execute(
+                db.select(User.id).where(User.username.like(f'load-{run}-%')).order_by(User.id)
+            ).scalars().all()
+            self.to_update = list(user_ids)
+            self.to_delete = user_ids[args.requests:]
+
+    def netrunner(self):
+        with self.lock:
+            return self.rng.randint(1, self.netrunners)
+
+    def take(self, pool):
+        with self.lock:
+            return pool.pop()
+
+    def user(self):
+        with self.lock:
+            return self.rng.choice(self.to_update)
+
+    def unique(self, prefix):
+        return f'{prefix}-{self.run}-{next(self.sequence)}'
+
+
+def endpoints(pools):
+    """(name, method, path factory, json body factory, streaming) for every route."""
+    n = pools.netrunner
+    return [
+        ('GET /users', 'GET', lambda: '/api/users', None, False),
+        ('POST /users', 'POST', lambda: '/api/users',
+            lambda: {'username': pools.unique('user'), 'email': pools.unique('mail') + '@example.com'}, False),
+        ('GET /users/<id>', 'GET', lambda: f'/api/users/{pools.user()}', None, False),
+        ('PUT /users/<id>', 'PUT', lambda: f'/api/users/{pools.take(pools.to_update)}',
+            lambda: {'username': pools.unique('renamed'), 'email': pools.unique('renamed') + '@example.com'}, False),
+        ('DELETE /users/<id>', 'DELETE', lambda: f'/api/users/{pools.take(pools.to_delete)}', None, False),
+        ('POST /netrunner', 'POST', lambda: '/api/netrunner', lambda: {'alias': pools.unique('runner')}, False),
+        ('GET /netrunner/<id>', 'GET', lambda: f'/api/netrunner/{n()}', None, False),
+        ('GET /netrunner/<id>/dashboard', 'GET', lambda: f'/api/netrunner/{n()}/dashboard', None, False),
+        ('GET /netrunner/<id>/contracts', 'GET', lambda: f'/api/netrunner/{n()}/contracts', None, False),
+        ('POST /netrunner/<id>/contracts', 'POST', lambda: f'/api/netrunner/{n()}/contracts',
+            lambda: {'title': 'Load contract', 'time_estimate': 1.0}, False),
+        ('POST /contracts/<id>/start', 'POST', lambda: f'/api/contracts/{pools.take(pools.to_start)}/start',
+            None, False),
+        ('POST /contracts/<id>/complete', 'POST',
+            lambda: f'/api/contracts/{pools.take(pools.to_complete)}/complete', lambda: {'time_spent': 1.0}, False),
+        ('POST /netrunner/<id>/bandwidth/spend', 'POST', lambda: f'/api/netrunner/{n()}/bandwidth/spend',
+            lambda: {'amount': 0.25}, False),
+        ('POST /netrunner/<id>/bandwidth/reset', 'POST', lambda: f'/api/netrunner/{n()}/bandwidth/reset',
+            None, False),
+        ('GET /netrunner/<id>/epic-hacks', 'GET', lambda: f'/api/netrunner/{n()}/epic-hacks', None, False),
+        ('POST /netrunner/<id>/epic-hacks', 'POST', lambda: f'/api/netrunner/{n()}/epic-hacks',
+            lambda: {'title': 'Load epic hack'}, False),
+        ('GET /netrunner/<id>/data-stream', 'GET', lambda: f'/api/netrunner/{n()}/data-stream', None, False),
+        ('GET /netrunner/<id>/data-stream/events', 'GET',
+            lambda: f'/api/netrunner/{n()}/data-stream/events', None, True),
+        ('GET /netrunner/<id>/skills', 'GET', lambda: f'/api/netrunner/{n()}/skills', None, False),
+        ('GET /netrunner/<id>/skills?detail', 'GET', lambda: f'/api/netrunner/{n()}/skills?detail=true',
+            None, False),
+        ('GET /leaderboard', 'GET', lambda: '/api/leaderboard', None, False),
+        ('GET /netrunner/<id>/rank', 'GET', lambda: f'/api/netrunner/{n()}/rank?window=5', None, False),
+    ]
+
+
+class TestClientDriver:
+    name = 'test_client'
+
+    def __init__(self, app):
+        self.app = app
+        self.local = threading.local()
+
+    def request(self, method, path, body, streaming):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        response = client.open(path, method=method, json=body, buffered=not streaming)
+        if streaming:
+            # Server-sent events never end; time to the first chunk instead
+            next(iter(response.response))
+            response.close()
+        return response.status_code, int(response.headers.get('X-SQL-Queries', 0))
+
+
+class ServerDriver:
+    name = 'wsgi_server'
+
+    def __init__(self, app):
+        from werkzeug.serving import WSGIRequestHandler, make_server
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_request(self, *args, **kwargs):
+                pass
+
+        self.server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.local = threading.local()
+
+    def connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = self.local.conn = http.client.HTTPConnection('127.0.0.1', self.server.server_port, timeout=30)
+        return conn
+
+    def request(self, method, path, body, streaming):
+        conn = self.connection()
+        payload = json.dumps(body) if body is not None else None
+        headers = {'Content-Type': 'application/json'} if payload is not None else {}
+        conn.request(method, path, body=payload, headers=headers)
+        response = conn.getresponse()
+        if streaming:
+            response.fp.readline()
+            conn.close()
+            self.local.conn = None
+        else:
+            response.read()
+        return response.status, int(response.getheader('X-SQL-Queries', 0))
+
+    def close(self):
+        self.server.shutdown()
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def run_endpoint(driver, endpoint, requests, concurrency):
+    name, method, path, body, streaming = endpoint
+    samples = []
+    errors = 0
+    sql_total = 0
+    lock = threading.Lock()
+
+    def one(_):
+        nonlocal errors, sql_total
+        target = path()
+        payload = body() if body else None
+        started = time.perf_counter()
+        status, queries = driver.request(method, target, payload, streaming)
+        elapsed = time.perf_counter() - started
+        with lock:
+            samples.append(elapsed)
+            sql_total += queries
+            if status >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - started
+
+    samples.sort()
+    to_ms = lambda seconds: round(seconds * 1000, 3) if seconds is not None else None
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'p50_ms': to_ms(percentile(samples, 0.50)),
+        'p95_ms': to_ms(percentile(samples, 0.95)),
+        'p99_ms': to_ms(percentile(samples, 0.99)),
+        'mean_ms': to_ms(sum(samples) / len(samples)),
+        'throughput_rps': round(len(samples) / wall, 1),
+        'sql_per_request': round(sql_total / len(samples), 2)
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--netrunners', type=int, default=1000)
+    parser.add_argument('--contracts', type=int, default=50000)
+    parser.add_argument('--entries', type=int, default=200000, help='Data stream entries.')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint.')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--mode', choices=['test_client', 'wsgi_server', 'both'], default='both')
+    parser.add_argument('--database', help='SQLite file to seed or reuse (default: a temp file).')
+    parser.add_argument('--skip-seed', action='store_true', help='Reuse an already seeded --database.')
+    parser.add_argument('--only', action='append', help='Only run endpoints whose name contains this.')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Write the JSON report here as well as to stdout.')
+    args = parser.parse_args()
+
+    database_path = args.database or os.path.join(tempfile.mkdtemp(), 'load.db')
+    app = load_app(database_path)
+    from src.models.user import db
+    from src.models.netrunner import Netrunner
+
+    with app.app_context():
+        if not args.skip_seed:
+            started = time.perf_counter()
+            seed(args)
+            print(f'Seeded {database_path} in {time.perf_counter() - started:.1f}s', file=sys.stderr)
+        args.netrunners = db.session.execute(db.select(db.func.max(Netrunner.id))).scalar() or 0
+    if not args.netrunners:
+        parser.error('database has no netrunners; drop --skip-seed')
+    instrument(app)
+
+    modes = ['test_client', 'wsgi_server'] if args.mode == 'both' else [args.mode]
+    report = {
+        'commit': git_commit(),
+        'generated_at': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'scale': {'netrunners': args.netrunners, 'contracts': args.contracts, 'entries': args.entries},
+        'requests_per_endpoint': args.requests,
+        'concurrency': args.concurrency,
+        'results': {}
+    }
+    for mode in modes:
+        pools = Pools(app, args)
+        driver = TestClientDriver(app) if mode == 'test_client' else ServerDriver(app)
+        results = report['results'][mode] = {}
+        try:
+            for endpoint in endpoints(pools):
+                if args.only and not any(part in endpoint[0] for part in args.only):
+                    continue
+                results[endpoint[0]] = run_endpoint(driver, endpoint, args.requests, args.concurrency)
+                print(f'{mode:12} {endpoint[0]:42} {results[endpoint[0]]}', file=sys.stderr)
+        finally:
+            if mode == 'wsgi_server':
+                driver.close()
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
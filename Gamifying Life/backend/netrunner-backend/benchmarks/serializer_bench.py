@@ -0,0 +1,105 @@
+"""Microbenchmark for list endpoint serialization.
+
+Seeds contracts and data stream entries into a temporary database, then
+times the old path (ORM objects, to_dict(), jsonify) against the column
+projections in src/services/projection.py and reports rows/sec.
+
+    python benchmarks/serializer_bench.py --rows 20000 --repeat 5
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def load_app(database_path):
+    from src.main import create_app
+    return create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database_path}', 'AUTO_MIGRATE': True})
+
+
+def seed(rows):
+    from src.models.user import db
+    from src.models.netrunner import Netrunner, Contract, DataStreamEntry
+
+    netrunner = Netrunner(alias='bench')
+    db.session.add(netrunner)
+    db.session.flush()
+    start = datetime(2025, 1, 1)
+    db.session.execute(Contract.__table__.insert(), [{
+        'netrunner_id': netrunner.id,
+        'title': f'Contract {i}',
+        'description': 'Benchmark contract with a short description',
+        'difficulty': 'Standard-Op',
+        'status': 'completed' if i % 3 else 'pending',
+        'time_estimate': 1.5,
+        'time_spent': 1.25,
+        'progress': 100 if i % 3 else 0,
+        'exp_reward': 150,
+        'credit_reward': 75,
+        'contract_type': 'main',
+        'created_at': start + timedelta(minutes=i),
+        'completed_at': start + timedelta(minutes=i, hours=1) if i % 3 else None
+    } for i in range(rows)])
+    db.session.execute(DataStreamEntry.__table__.insert(), [{
+        'netrunner_id': netrunner.id,
+        'message': f'CONTRACT_COMPLETED: Contract {i} (+150 EXP)',
+        'entry_type': 'success',
+        'created_at': start + timedelta(minutes=i)
+    } for i in range(rows)])
+    db.session.commit()
+    return netrunner.id
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = load_app(os.path.join(tempfile.mkdtemp(), 'serializer.db'))
+    from flask import jsonify
+    from src.models.user import db
+    from src.models.netrunner import Contract, DataStreamEntry
+    from src.routes.netrunner import CONTRACT_FIELDS, DATA_STREAM_FIELDS
+    from src.services.projection import page_response
+
+    with app.test_request_context():
+        netrunner_id = seed(args.rows)
+        cases = [('contracts', Contract, CONTRACT_FIELDS), ('data-stream', DataStreamEntry, DATA_STREAM_FIELDS)]
+        for name, model, projection in cases:
+            order = (model.created_at.desc(), model.id.desc())
+
+            def orm():
+                db.session.expunge_all()
+                rows = model.query.filter_by(netrunner_id=netrunner_id).order_by(*order).all()
+                return len(jsonify({'items': [row.to_dict() for row in rows], 'next_cursor': None}).get_data())
+
+            def projected():
+                rows = projection.query(model.netrunner_id == netrunner_id).order_by(*order).all()
+                return len(page_response(projection, rows, None).get_data())
+
+            orm_time, orm_size = best_of(args.repeat, orm)
+            projected_time, projected_size = best_of(args.repeat, projected)
+            assert orm_size == projected_size, 'serializers disagree on the response body'
+            print(
+                f'{name:12} to_dict: {args.rows / orm_time:>10,.0f} rows/s   '
+                f'projection: {args.rows / projected_time:>10,.0f} rows/s   '
+                f'speedup: {orm_time / projected_time:.1f}x'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Write throughput with one database versus several shards.
+
+Forks several worker processes (like gunicorn workers), each driving its
+own netrunners through create-contract, complete-contract and
+bandwidth-spend requests via the Flask test client. Rows never overlap
+between workers, so any slowdown comes from waiting for the SQLite
+write lock. Runs once per --shards value on fresh databases and reports
+requests/sec and the slowest single request.
+
+    python benchmarks/shard_bench.py --workers 8 --requests 300 --shards 1 4
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def load_app(workdir, shards, synchronous):
+    from src.main import create_app
+    return create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'app.db')}",
+        'SHARD_COUNT': shards,
+        'SHARD_DIR': workdir,
+        'SQLITE_SYNCHRONOUS': synchronous,
+        'SIDE_EFFECTS_SYNC': True,
+        'AUTO_MIGRATE': True,
+    })
+
+
+def worker(workdir, shards, synchronous, netrunner_ids, requests, results):
+    app = load_app(workdir, shards, synchronous)
+    from src.models.user import db
+    with app.app_context():
+        # Never share pooled SQLite connections across a fork
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+    client = app.test_client()
+    failures = 0
+    slowest = 0.0
+
+    def post(path, body, status):
+        nonlocal failures, slowest
+        call_started = time.perf_counter()
+        response = client.post(path, json=body)
+        slowest = max(slowest, time.perf_counter() - call_started)
+        failures += response.status_code != status
+        return response
+
+    started = time.perf_counter()
+    for i in range(requests // 3):
+        netrunner_id = netrunner_ids[i % len(netrunner_ids)]
+        response = post(f'/api/netrunner/{netrunner_id}/contracts', {'title': f'bench {i}', 'time_estimate': 1.0}, 201)
+        if response.status_code == 201:
+            post(f'/api/contracts/{response.json["id"]}/complete', {'time_spent': 1.0}, 200)
+        post(f'/api/netrunner/{netrunner_id}/bandwidth/spend', {'amount': 0.01, 'penalty_multiplier': 1.0}, 200)
+    results.put((time.perf_counter() - started, failures, slowest))
+
+
+def run(shards, workers, requests, netrunners_per_worker, synchronous):
+    workdir = tempfile.mkdtemp()
+    app = load_app(workdir, shards, synchronous)
+    client = app.test_client()
+    assignments = [
+        [
+            client.post('/api/netrunner', json={'alias': f'bench-{w}-{n}'}).json['id']
+            for n in range(netrunners_per_worker)
+        ]
+        for w in range(workers)
+    ]
+
+    results = multiprocessing.Queue()
+    context = multiprocessing.get_context('fork')
+    processes = [
+        context.Process(target=worker, args=(workdir, shards, synchronous, ids, requests, results))
+        for ids in assignments
+    ]
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    totals = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+
+    request_count = workers * (requests // 3) * 3
+    failures = sum(t[1] for t in totals)
+    slowest = max(t[2] for t in totals)
+    print(f'{shards or 1:>2} shard(s)  {request_count} requests from {workers} workers in {elapsed:.2f}s '
+          f'({request_count / elapsed:,.0f} req/s), slowest {slowest * 1000:.0f} ms, {failures} failed')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=300, help='Write requests per worker.')
+    parser.add_argument('--netrunners', type=int, default=4, help='Netrunners per worker.')
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--synchronous', default='NORMAL', help='SQLite synchronous setting (FULL fsyncs every commit).')
+    args = parser.parse_args()
+    for shards in args.shards:
+        run(shards, args.workers, args.requests, args.netrunners, args.synchronous)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Cold-start benchmark for the app factory.
+
+Each sample is a fresh interpreter, the way a gunicorn worker without
+preload starts. It times importing src.main, create_app() and the first
+request against an already migrated database. It also times the old
+startup path, which ran db.create_all() on every boot, for comparison.
+Prints the median of each phase as JSON.
+
+    python benchmarks/startup_time.py --runs 15
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE = '''
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {backend_dir!r})
+import src.main
+imported = time.perf_counter()
+app = src.main.create_app({{'SQLALCHEMY_DATABASE_URI': {database_uri!r}}})
+created = time.perf_counter()
+if {create_all!r}:
+    from src.models.user import db
+    with app.app_context():
+        db.create_all()
+schema_checked = time.perf_counter()
+response = app.test_client().get('/api/netrunner/1')
+assert response.status_code == 200, response.status_code
+finished = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - started) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'schema_check_ms': (schema_checked - created) * 1000,
+    'first_request_ms': (finished - schema_checked) * 1000,
+    'total_ms': (finished - started) * 1000
+}}))
+'''
+
+
+def sample(database_uri, create_all):
+    code = SAMPLE.format(backend_dir=BACKEND_DIR, database_uri=database_uri, create_all=create_all)
+    output = subprocess.check_output([sys.executable, '-c', code], cwd=BACKEND_DIR, text=True)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=15)
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    from src.main import create_app
+    database_uri = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'startup.db')}"
+    app = create_app({'SQLALCHEMY_DATABASE_URI': database_uri, 'AUTO_MIGRATE': True})
+    app.test_client().post('/api/netrunner', json={'alias': 'startup'})
+
+    report = {'runs': args.runs}
+    for name, create_all in (('factory', False), ('factory_with_create_all', True)):
+        samples = [sample(database_uri, create_all) for _ in range(args.runs)]
+        report[name] = {
+            phase: round(statistics.median(run[phase] for run in samples), 2) for phase in samples[0]
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
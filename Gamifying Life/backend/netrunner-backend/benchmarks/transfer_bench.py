@@ -0,0 +1,125 @@
+"""Throughput benchmark for NDJSON export and import.
+
+Seeds one netrunner with contracts, skill points and data stream entries
+into a temporary database, exports it with export_ndjson(), then imports
+the export back as a new netrunner. Reports rows/sec for both directions,
+the import split into the row load and the derived-table rebuild, and
+the peak Python memory of the export.
+
+    python benchmarks/transfer_bench.py --rows 200000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def load_app(database_path):
+    from src.main import create_app
+    return create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database_path}', 'AUTO_MIGRATE': True})
+
+
+def seed(rows):
+    """rows split 1:1:2 across contracts, skill points and data stream entries"""
+    from src.models.user import db
+    from src.models.netrunner import Netrunner, Contract, SkillPoint, DataStreamEntry
+
+    netrunner = Netrunner(alias='bench')
+    db.session.add(netrunner)
+    db.session.flush()
+    start = datetime(2025, 1, 1)
+    db.session.execute(Contract.__table__.insert(), [{
+        'netrunner_id': netrunner.id,
+        'title': f'Contract {i}',
+        'description': 'Benchmark contract with a short description',
+        'difficulty': 'Standard-Op',
+        'status': 'completed',
+        'time_estimate': 1.5,
+        'time_spent': 1.25,
+        'progress': 100,
+        'exp_reward': 150,
+        'credit_reward': 75,
+        'contract_type': 'main',
+        'created_at': start + timedelta(minutes=i),
+        'completed_at': start + timedelta(minutes=i, hours=1)
+    } for i in range(rows // 4)])
+    db.session.execute(SkillPoint.__table__.insert(), [{
+        'netrunner_id': netrunner.id,
+        'skill_tree': f'Tree {i % 6}',
+        'points': 1,
+        'acquired_at': start + timedelta(minutes=i)
+    } for i in range(rows // 4)])
+    db.session.execute(DataStreamEntry.__table__.insert(), [{
+        'netrunner_id': netrunner.id,
+        'message': f'CONTRACT_COMPLETED: Contract {i} +150 EXP +75 ¥',
+        'entry_type': 'success',
+        'created_at': start + timedelta(minutes=i)
+    } for i in range(rows // 2)])
+    db.session.commit()
+    return netrunner.id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--chunk-size', type=int, default=None)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    app = load_app(os.path.join(workdir, 'transfer.db'))
+    from src.models.user import db
+    from src.services import transfer
+
+    export_path = os.path.join(workdir, 'export.ndjson')
+    with app.app_context():
+        netrunner_id = seed(args.rows)
+
+        started = time.perf_counter()
+        lines = 0
+        with open(export_path, 'w', encoding='utf-8') as output:
+            for chunk in transfer.export_ndjson(db.engine, netrunner_id):
+                output.write(chunk)
+                lines += chunk.count('\n')
+        export_time = time.perf_counter() - started
+
+        # Second pass for memory only; tracemalloc slows allocation too much to time under it
+        tracemalloc.start()
+        for chunk in transfer.export_ndjson(db.engine, netrunner_id):
+            pass
+        _, export_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        # Time the derived-table rebuild on its own by wrapping it
+        rebuild_time = 0.0
+        rebuild = transfer.rebuild_daily_analytics
+
+        def timed_rebuild(*rebuild_args, **kwargs):
+            nonlocal rebuild_time
+            rebuild_started = time.perf_counter()
+            result = rebuild(*rebuild_args, **kwargs)
+            rebuild_time += time.perf_counter() - rebuild_started
+            return result
+        transfer.rebuild_daily_analytics = timed_rebuild
+
+        started = time.perf_counter()
+        with open(export_path, encoding='utf-8') as source:
+            _, counts = transfer.import_ndjson(
+                source, alias='bench-copy', chunk_size=args.chunk_size or transfer.IMPORT_CHUNK_ROWS
+            )
+        db.session.commit()
+        import_time = time.perf_counter() - started
+        transfer.rebuild_daily_analytics = rebuild
+
+    imported = sum(counts.values())
+    print(f'export  {lines:>9,} lines  {lines / export_time:>10,.0f} lines/s   peak {export_peak / 1e6:.1f} MB')
+    print(f'import  {imported:>9,} rows   {imported / import_time:>10,.0f} rows/s    '
+          f'({imported / (import_time - rebuild_time):,.0f} rows/s load, {rebuild_time:.2f}s daily analytics)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+"""Gunicorn settings for a preloaded, multi-worker deployment.
+
+    flask --app src.main netrunner migrate   # once per deploy
+    gunicorn -c gunicorn.conf.py
+
+The app is built once in the master with every import, mapper and the
+static manifest done up front, then workers are forked from it.
+
+Workers are threaded: an open data stream (SSE) connection holds one
+thread for as long as the client stays, so a sync worker would be lost
+to it. Each worker serves up to THREADS requests and streams at once;
+raise it if many clients keep the data stream open.
+"""
+import os
+
+wsgi_app = 'src.main:create_app()'
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+worker_class = 'gthread'
+threads = int(os.environ.get('THREADS', 16))
+preload_app = True
+
+
+def when_ready(server):
+    from src.main import prepare_for_fork
+    prepare_for_fork(server.app.wsgi())
+
+
+def post_fork(server, worker):
+    from src.models.user import db
+    with server.app.wsgi().app_context():
+        # Never reuse pooled SQLite connections inherited from the master, on any shard
+        for engine in db.engines.values():
+            engine.dispose(close=False)
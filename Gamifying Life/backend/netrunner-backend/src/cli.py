@@ -0,0 +1,224 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from src.models.user import db
+from src.models.netrunner import SkillTreeRollup, LevelCount, ExpCount, ShardDirectory
+from src.jobs.daily_reset import reset_all_bandwidth
+from src.jobs.retention import archive_data_stream
+from src.jobs.analytics_backfill import rebuild_daily_analytics
+from src.jobs.seed import seed_dataset
+from src.jobs.rebalance import plan_rebalance, move_netrunners, rebalance
+from src.services.operations import OperationError
+from src.services.transfer import export_ndjson, import_ndjson, IMPORT_CHUNK_ROWS
+from src.services import schema
+from src.services.shards import shard_router
+
+netrunner_cli = AppGroup('netrunner', help='Netrunner maintenance commands.')
+shards_cli = AppGroup('shards', help='Shard directory and rebalancing commands.')
+netrunner_cli.add_command(shards_cli)
+
+# Fleet-wide commands run once per shard, on all shards in parallel
+# (shard_router.run_each); with --netrunner-id they bind to that netrunner's shard
+
+def _bind_netrunner(netrunner_id):
+    placement = shard_router.lookup(netrunner_id)
+    if placement is None:
+        raise click.ClickException(f'Netrunner {netrunner_id} is not in the shard directory')
+    shard_router.bind(placement[0])
+
+@netrunner_cli.command('migrate')
+@click.option('--status', 'show_status', is_flag=True, help='List migrations instead of applying them.')
+def migrate(show_status):
+    """Apply pending schema migrations (run once per deploy, not per worker)."""
+    databases = shard_router.databases()
+    if show_status:
+        for name, engine in databases:
+            if len(databases) > 1:
+                click.echo(f'{name}:')
+            for version, applied in schema.status(engine):
+                click.echo(f"{'applied' if applied else 'pending'}  {version}")
+        return
+    for name, applied in shard_router.migrate().items():
+        click.echo((f'{name}: ' if len(databases) > 1 else '') + f'Applied {len(applied)} migration(s)' + (
+            f": {', '.join(applied)}" if applied else ''
+        ))
+
+@netrunner_cli.command('rebuild-skill-rollups')
+@click.option('--netrunner-id', type=int, default=None, help='Only rebuild this netrunner.')
+def rebuild_skill_rollups(netrunner_id):
+    """Backfill or rebuild skill tree rollups from SkillPoint rows."""
+    if netrunner_id is None:
+        count = sum(shard_router.run_each(SkillTreeRollup.rebuild))
+    else:
+        _bind_netrunner(netrunner_id)
+        count = SkillTreeRollup.rebuild(netrunner_id)
+    click.echo(f'Rebuilt {count} skill tree rollup(s)')
+
+@netrunner_cli.command('reset-bandwidth')
+@click.option('--chunk-size', type=int, default=1000, show_default=True, help='Netrunners per transaction.')
+@click.option('--pause', type=float, default=0.0, help='Seconds to sleep between chunks.')
+def reset_bandwidth(chunk_size, pause):
+    """Nightly bandwidth reset for all netrunners."""
+    results = shard_router.run_each(reset_all_bandwidth, chunk_size=chunk_size, pause=pause)
+    count = sum(reset for reset, _ in results)
+    credits_paid = sum(paid for _, paid in results)
+    click.echo(f'Reset {count} netrunner(s), paid {credits_paid} ¥ in leftover bandwidth')
+
+@netrunner_cli.command('archive-data-stream')
+@click.option('--days', type=int, default=None, help='Retention window (default: DATA_STREAM_RETENTION_DAYS).')
+@click.option('--batch-size', type=int, default=5000, show_default=True, help='Entries moved per transaction.')
+@click.option('--max-batches', type=int, default=None, help='Stop after this many batches.')
+@click.option('--pause', type=float, default=0.0, help='Seconds to sleep between batches.')
+def archive_stream(days, batch_size, max_batches, pause):
+    """Move old data stream entries into the archive tier."""
+    if days is None:
+        days = current_app.config.get('DATA_STREAM_RETENTION_DAYS', 30)
+    moved = sum(shard_router.run_each(
+        archive_data_stream, days, batch_size=batch_size, max_batches=max_batches, pause=pause
+    ))
+    click.echo(f'Archived {moved} data stream entries older than {days} day(s)')
+
+@netrunner_cli.command('rebuild-leaderboard')
+def rebuild_leaderboard():
+    """Rebuild the per-level and per-(level, exp) netrunner counts used for rank lookups."""
+    count = sum(shard_router.run_each(LevelCount.rebuild))
+    exp_count = sum(shard_router.run_each(ExpCount.rebuild))
+    click.echo(f'Rebuilt counts for {count} level(s) and {exp_count} (level, exp) pair(s)')
+
+@netrunner_cli.command('rebuild-daily-analytics')
+@click.option('--netrunner-id', type=int, default=None, help='Only rebuild this netrunner.')
+def rebuild_daily(netrunner_id):
+    """Backfill or rebuild the daily productivity tables from contracts and the data stream."""
+    if netrunner_id is None:
+        counts = {}
+        for shard_counts in shard_router.run_each(rebuild_daily_analytics):
+            for table, count in shard_counts.items():
+                counts[table] = counts.get(table, 0) + count
+    else:
+        _bind_netrunner(netrunner_id)
+        counts = rebuild_daily_analytics(netrunner_id)
+    click.echo(', '.join(f'{count} {table} row(s)' for table, count in counts.items()))
+
+@netrunner_cli.command('export-ndjson')
+@click.argument('netrunner_id', type=int)
+@click.argument('output', type=click.File('w', encoding='utf-8'))
+def export_netrunner(netrunner_id, output):
+    """Write a netrunner's full history to OUTPUT as NDJSON ('-' for stdout)."""
+    lines = 0
+    for chunk in export_ndjson(shard_router.engine_for(netrunner_id), netrunner_id):
+        output.write(chunk)
+        lines += chunk.count('\n')
+    if not lines:
+        raise click.ClickException(f'Netrunner {netrunner_id} not found')
+    click.echo(f'Exported {lines} line(s)', err=True)
+
+@netrunner_cli.command('import-ndjson')
+@click.argument('source', type=click.File('r', encoding='utf-8'))
+@click.option('--alias', default=None, help='Alias for the new netrunner (default: the exported one).')
+@click.option('--chunk-size', type=int, default=IMPORT_CHUNK_ROWS, show_default=True, help='Rows per INSERT batch.')
+def import_netrunner(source, alias, chunk_size):
+    """Load an NDJSON export from SOURCE as a new netrunner."""
+    try:
+        netrunner_id, counts = import_ndjson(source, alias=alias, chunk_size=chunk_size)
+    except OperationError as e:
+        db.session.rollback()
+        raise click.ClickException(e.message)
+    db.session.commit()
+    click.echo(f'Imported netrunner {netrunner_id}: ' + ', '.join(f'{count} {kind}' for kind, count in counts.items()))
+
+@netrunner_cli.command('seed')
+@click.option('--netrunners', type=int, default=100, show_default=True, help='Netrunners (and users) to create.')
+@click.option('--days', type=int, default=730, show_default=True, help='Longest history per netrunner, in days.')
+@click.option('--seed', 'seed_value', type=int, default=0, show_default=True, help='RNG seed.')
+@click.option('--until', default=None, help='Last day of history, exclusive (YYYY-MM-DD, default: today).')
+@click.option('--contracts-per-day', type=float, default=4.0, show_default=True, help='Average contracts per weekday.')
+@click.option('--batch-rows', type=int, default=200000, show_default=True, help='Rows per transaction.')
+@click.option('--alias-prefix', default='runner', show_default=True, help='Aliases are PREFIX-000001 and up.')
+def seed(netrunners, days, seed_value, until, contracts_per_day, batch_rows, alias_prefix):
+    """Fill the database with deterministic synthetic netrunners and history."""
+    if shard_router.enabled:
+        raise click.ClickException(
+            'seed writes to a single database; seed with SHARD_COUNT unset, then run `shards init` and `shards rebalance`'
+        )
+    def progress(done, rows, elapsed):
+        click.echo(f'{done}/{netrunners} netrunner(s), {rows} row(s), {rows / max(elapsed, 1e-9):,.0f} rows/s', err=True)
+
+    try:
+        counts = seed_dataset(
+            db.engine, netrunners, seed=seed_value, until=until, days=days, contracts_per_day=contracts_per_day,
+            retention_days=current_app.config.get('DATA_STREAM_RETENTION_DAYS', 30), batch_rows=batch_rows,
+            alias_prefix=alias_prefix, progress=progress
+        )
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(', '.join(f'{count} {table}' for table, count in counts.items()))
+
+@shards_cli.command('status')
+def shards_status():
+    """Netrunners per shard, and how many the hash ring places elsewhere."""
+    if not shard_router.enabled:
+        click.echo('Sharding is off: every netrunner is in the default database')
+        return
+    listed = [0] * shard_router.count
+    misplaced = [0] * shard_router.count
+    moving = 0
+    for netrunner_id, shard, is_moving in db.session.execute(
+        db.select(ShardDirectory.netrunner_id, ShardDirectory.shard, ShardDirectory.moving)
+    ):
+        listed[shard] += 1
+        misplaced[shard] += shard_router.ring_shard(netrunner_id) != shard
+        moving += is_moving
+    for shard, engine in enumerate(shard_router.engines()):
+        click.echo(f'shard {shard:>3}  {listed[shard]:>9} netrunner(s)  {misplaced[shard]:>7} to move  {engine.url}')
+    if moving:
+        click.echo(f'{moving} netrunner(s) flagged as moving; `shards rebalance` finishes them')
+
+@shards_cli.command('init')
+def shards_init():
+    """Migrate every shard, start their id ranges and list existing netrunners in the directory."""
+    if not shard_router.enabled:
+        raise click.ClickException('Sharding is off; set SHARD_COUNT (or SHARD_URIS) to 2 or more')
+    for name, applied in shard_router.migrate().items():
+        click.echo(f'{name}: applied {len(applied)} migration(s)')
+    added, skipped = shard_router.backfill()
+    click.echo(f'Listed {added} netrunner(s) in the shard directory' + (
+        f', skipped {skipped} whose alias is listed under another id' if skipped else ''
+    ))
+
+@shards_cli.command('move')
+@click.argument('netrunner_id', type=int)
+@click.argument('shard', type=int)
+@click.option('--grace', type=float, default=None, help='Seconds between flagging and copying (default: SHARD_DIRECTORY_TTL + 1).')
+def shards_move(netrunner_id, shard, grace):
+    """Move one netrunner to SHARD."""
+    if not 0 <= shard < shard_router.count:
+        raise click.ClickException(f'No shard {shard}; there are {shard_router.count}')
+    if shard_router.lookup(netrunner_id) is None:
+        raise click.ClickException(f'Netrunner {netrunner_id} is not in the shard directory')
+    try:
+        move_netrunners({netrunner_id: shard}, grace=grace)
+    except OperationError as e:
+        raise click.ClickException(e.message)
+    click.echo(f'Moved netrunner {netrunner_id} to shard {shard}')
+
+@shards_cli.command('rebalance')
+@click.option('--batch-size', type=int, default=100, show_default=True, help='Netrunners flagged and moved together.')
+@click.option('--limit', type=int, default=None, help='Stop after this many netrunners.')
+@click.option('--grace', type=float, default=None, help='Seconds between flagging and copying (default: SHARD_DIRECTORY_TTL + 1).')
+@click.option('--dry-run', is_flag=True, help='Only count the netrunners that would move.')
+def shards_rebalance(batch_size, limit, grace, dry_run):
+    """Move every netrunner to the shard the hash ring places it on (after adding or removing shards)."""
+    if not shard_router.enabled:
+        raise click.ClickException('Sharding is off; set SHARD_COUNT (or SHARD_URIS) to 2 or more')
+    if dry_run:
+        click.echo(f'{len(plan_rebalance(limit))} netrunner(s) would move')
+        return
+
+    def progress(done, total):
+        click.echo(f'{done}/{total} netrunner(s) moved', err=True)
+
+    try:
+        moved = rebalance(batch_size=batch_size, limit=limit, grace=grace, progress=progress)
+    except OperationError as e:
+        raise click.ClickException(e.message)
+    click.echo(f'Moved {moved} netrunner(s)')
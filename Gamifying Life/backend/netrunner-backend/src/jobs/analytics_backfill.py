@@ -0,0 +1,151 @@
+import re
+from collections import defaultdict
+from datetime import date
+
+from src.models.user import db
+from src.models.netrunner import (
+    Contract, DataStreamEntry, DataStreamArchive, DailyProductivity, DailyEstimateAccuracy
+)
+
+try:
+    import numpy as np
+except ImportError:  # optional; without it the grouping is done with a dict
+    np = None
+
+# The data stream is the only record of what was actually paid out, so the
+# backfill reads the amounts back out of the messages the routes write.
+EXP_PATTERN = re.compile(r'\+(\d+) EXP')
+CREDITS_PATTERN = re.compile(r'\+(\d+) ¥')
+BANDWIDTH_PATTERN = re.compile(r'([+-]\d+(?:\.\d+)?) BW')
+REWARD_PREFIXES = ('CONTRACT_COMPLETED:', 'HACK_DEBRIEF:', 'MILESTONE_COMPLETED:', 'EPIC_HACK_COMPLETED:')
+BANDWIDTH_PREFIXES = ('BANDWIDTH_RECOVERED:', 'SIGNAL_NOISE:')
+PRODUCTIVITY_COLUMNS = ('exp_earned', 'credits_earned', 'contracts_completed', 'bandwidth_spent', 'bandwidth_recovered')
+
+
+def group_sums(netrunner_ids, days, columns):
+    """Sum each of columns per (netrunner_id, day).
+
+    Returns the distinct (netrunner_id, day) keys in sorted order and, for
+    each column, the list of totals lined up with those keys.
+    """
+    if not netrunner_ids:
+        return [], [[] for _ in columns]
+    if np is None:
+        totals = defaultdict(lambda: [0] * len(columns))
+        for row, key in enumerate(zip(netrunner_ids, days)):
+            bucket = totals[key]
+            for index, column in enumerate(columns):
+                bucket[index] += column[row]
+        keys = sorted(totals)
+        return keys, [[totals[key][index] for key in keys] for index in range(len(columns))]
+
+    pairs = np.stack([
+        np.asarray(netrunner_ids, dtype=np.int64),
+        np.asarray(days, dtype='datetime64[D]').astype(np.int64)
+    ], axis=1)
+    keys, groups = np.unique(pairs, axis=0, return_inverse=True)
+    groups = groups.reshape(-1)
+    sums = [
+        np.bincount(groups, weights=np.asarray(column, dtype=np.float64), minlength=len(keys)).tolist()
+        for column in columns
+    ]
+    key_days = keys[:, 1].astype('datetime64[D]').tolist()
+    return list(zip(keys[:, 0].tolist(), key_days)), sums
+
+
+def _productivity_rows(netrunner_id):
+    netrunner_ids, days = [], []
+    columns = {name: [] for name in PRODUCTIVITY_COLUMNS}
+
+    def add(row_netrunner_id, day, **amounts):
+        netrunner_ids.append(row_netrunner_id)
+        days.append(day)
+        for name in PRODUCTIVITY_COLUMNS:
+            columns[name].append(amounts.get(name, 0))
+
+    for model in (DataStreamEntry, DataStreamArchive):
+        query = db.select(model.netrunner_id, model.created_at, model.message).where(
+            db.or_(*(model.message.startswith(prefix) for prefix in REWARD_PREFIXES + BANDWIDTH_PREFIXES))
+        )
+        if netrunner_id is not None:
+            query = query.where(model.netrunner_id == netrunner_id)
+        for row_netrunner_id, created_at, message in db.session.execute(query):
+            if message.startswith(BANDWIDTH_PREFIXES):
+                match = BANDWIDTH_PATTERN.search(message)
+                amount = float(match.group(1)) if match else 0.0
+                add(row_netrunner_id, created_at.date(),
+                    bandwidth_recovered=max(amount, 0.0), bandwidth_spent=max(-amount, 0.0))
+            else:
+                exp = EXP_PATTERN.search(message)
+                credits = CREDITS_PATTERN.search(message)
+                add(row_netrunner_id, created_at.date(),
+                    exp_earned=int(exp.group(1)) if exp else 0,
+                    credits_earned=int(credits.group(1)) if credits else 0)
+
+    completed = db.select(Contract.netrunner_id, Contract.completed_at).where(
+        Contract.status == 'completed', Contract.completed_at.isnot(None)
+    )
+    if netrunner_id is not None:
+        completed = completed.where(Contract.netrunner_id == netrunner_id)
+    for row_netrunner_id, completed_at in db.session.execute(completed):
+        add(row_netrunner_id, completed_at.date(), contracts_completed=1)
+
+    keys, sums = group_sums(netrunner_ids, days, [columns[name] for name in PRODUCTIVITY_COLUMNS])
+    for index, (row_netrunner_id, day) in enumerate(keys):
+        row = {'netrunner_id': row_netrunner_id, 'day': day}
+        for name, totals in zip(PRODUCTIVITY_COLUMNS, sums):
+            row[name] = totals[index]
+        for name in ('exp_earned', 'credits_earned', 'contracts_completed'):
+            row[name] = int(row[name])
+        yield row
+
+
+def _estimate_accuracy_rows(netrunner_id):
+    # Few rows per day and the grouping is plain SQL, so this one stays in the database
+    day = db.func.date(Contract.completed_at)
+    query = db.select(
+        Contract.netrunner_id, day, Contract.difficulty,
+        db.func.count(), db.func.sum(Contract.time_spent), db.func.sum(Contract.time_estimate)
+    ).where(
+        Contract.status == 'completed',
+        Contract.completed_at.isnot(None),
+        Contract.time_spent.isnot(None),
+        Contract.time_estimate > 0
+    ).group_by(Contract.netrunner_id, day, Contract.difficulty)
+    if netrunner_id is not None:
+        query = query.where(Contract.netrunner_id == netrunner_id)
+    for row_netrunner_id, row_day, difficulty, count, time_spent, time_estimated in db.session.execute(query):
+        yield {
+            'netrunner_id': row_netrunner_id,
+            'day': date.fromisoformat(row_day),
+            'difficulty': difficulty,
+            'contracts_completed': count,
+            'time_spent': time_spent,
+            'time_estimated': time_estimated
+        }
+
+
+def rebuild_daily_analytics(netrunner_id=None, commit=True):
+    """Recompute the daily analytics tables from contracts and the data stream.
+
+    Covers both the live and archived data stream. Existing rows for the
+    netrunner (or everyone, when netrunner_id is None) are replaced in one
+    transaction, committed unless commit is False. Returns the number of
+    rows written to each table.
+    """
+    productivity = list(_productivity_rows(netrunner_id))
+    accuracy = list(_estimate_accuracy_rows(netrunner_id))
+
+    counts = {}
+    for model, rows in ((DailyProductivity, productivity), (DailyEstimateAccuracy, accuracy)):
+        table = model.__table__
+        delete = table.delete()
+        if netrunner_id is not None:
+            delete = delete.where(table.c.netrunner_id == netrunner_id)
+        db.session.execute(delete)
+        if rows:
+            db.session.execute(table.insert(), rows)
+        counts[table.name] = len(rows)
+    if commit:
+        db.session.commit()
+    return counts
@@ -0,0 +1,66 @@
+import time
+from datetime import datetime
+
+from src.models.user import db
+from src.models.netrunner import Netrunner, DataStreamEntry, BANDWIDTH_CREDIT_RATE
+from src.services.dashboard_cache import dashboard_cache
+
+
+def reset_all_bandwidth(chunk_size=1000, pause=0.0, now=None):
+    """Run the daily bandwidth reset for every netrunner with set-based SQL.
+
+    Netrunners are processed in id-ordered chunks, each in its own short
+    transaction so the SQLite write lock is released between chunks.
+    Returns (netrunners_reset, credits_paid).
+    """
+    netrunner = Netrunner.__table__
+    entry = DataStreamEntry.__table__
+    now = now or datetime.utcnow()
+
+    bonus = db.cast(db.func.max(netrunner.c.current_bandwidth, 0) * BANDWIDTH_CREDIT_RATE, db.Integer)
+    bonus_message = db.literal('DAILY_BONUS: Leftover bandwidth converted +') + db.cast(bonus, db.String) + ' ¥'
+    entry_columns = ['netrunner_id', 'message', 'entry_type', 'created_at']
+
+    reset_count = 0
+    credits_paid = 0
+    last_id = 0
+    while True:
+        bounds = db.session.execute(
+            db.select(netrunner.c.id)
+            .where(netrunner.c.id > last_id)
+            .order_by(netrunner.c.id)
+            .limit(chunk_size)
+        ).scalars().all()
+        if not bounds:
+            break
+        in_chunk = netrunner.c.id.between(bounds[0], bounds[-1])
+
+        # Log entries are derived from the pre-reset values, so insert them first
+        db.session.execute(entry.insert().from_select(entry_columns, db.select(
+            netrunner.c.id, bonus_message, db.literal('success'), db.literal(now)
+        ).where(in_chunk, bonus > 0)))
+        credits_paid += db.session.execute(
+            db.select(db.func.coalesce(db.func.sum(bonus), 0)).where(in_chunk)
+        ).scalar()
+        db.session.execute(netrunner.update().where(in_chunk).values(
+            credits=netrunner.c.credits + bonus,
+            current_bandwidth=netrunner.c.max_bandwidth,
+            signal_debt=False,
+            version=netrunner.c.version + 1
+        ))
+        db.session.execute(entry.insert().from_select(entry_columns, db.select(
+            netrunner.c.id,
+            db.literal('SYSTEM_RESET: Daily bandwidth restored'),
+            db.literal('info'),
+            db.literal(now)
+        ).where(in_chunk)))
+        db.session.commit()
+
+        for netrunner_id in bounds:
+            dashboard_cache.invalidate(netrunner_id)
+        reset_count += len(bounds)
+        last_id = bounds[-1]
+        if pause:
+            time.sleep(pause)
+
+    return reset_count, credits_paid
@@ -0,0 +1,171 @@
+import time
+
+from sqlalchemy import bindparam
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from src.models.user import db
+from src.models.netrunner import Netrunner, LevelCount, ExpCount, ShardDirectory, ShardIdRemap
+from src.services.dashboard_cache import dashboard_cache
+from src.services.entity_cache import entity_cache
+from src.services.operations import OperationError
+from src.services.shards import shard_router
+from src.services.transfer import export_lines, import_ndjson
+
+# Added to SHARD_DIRECTORY_TTL before copying, for requests that read the
+# directory just before their netrunner was flagged to finish
+MOVE_GRACE_SLACK = 1.0
+
+
+def plan_rebalance(limit=None):
+    """{netrunner_id: shard} for directory entries the hash ring places elsewhere, in id order.
+
+    Entries left flagged as moving by an interrupted run are included too.
+    """
+    table = ShardDirectory.__table__
+    moves = {}
+    rows = db.session.execute(
+        db.select(table.c.netrunner_id, table.c.shard, table.c.moving).order_by(table.c.netrunner_id)
+    )
+    for netrunner_id, shard, moving in rows:
+        target = shard_router.ring_shard(netrunner_id)
+        if target != shard or moving:
+            moves[netrunner_id] = target
+            if limit is not None and len(moves) >= limit:
+                break
+    return moves
+
+
+def move_netrunners(moves, grace=None, progress=None):
+    """Move netrunners between shards; moves maps netrunner_id to its new shard.
+
+    All of them are flagged as moving first, so their requests answer 503
+    rather than write to the old shard. Copying starts after grace seconds
+    (SHARD_DIRECTORY_TTL plus MOVE_GRACE_SLACK by default), once every
+    worker's cached directory entry has expired. Each netrunner is then
+    copied with the NDJSON export/import code while holding the source
+    shard's write lock. Its source rows are deleted and its directory entry
+    repointed. Writers on the source shard wait during each copy.
+
+    The netrunner keeps its id, alias and history. Its other rows get new
+    ids from the target shard's range, since the target hands out ids
+    above the highest one it holds. Every old id is recorded in
+    ShardIdRemap, which requests and /sync ops still carrying it are
+    translated through. Netrunner.version is bumped so cached ETags stop
+    matching. A run that stops part way can be repeated.
+    Returns the number of netrunners moved.
+    """
+    if not moves:
+        return 0
+    shard_router.place(moves, moving=True)
+    time.sleep(shard_router.directory_ttl + MOVE_GRACE_SLACK if grace is None else grace)
+
+    moved = 0
+    try:
+        for netrunner_id, target in moves.items():
+            _move(netrunner_id, target)
+            moved += 1
+            if progress:
+                progress(moved, len(moves))
+    finally:
+        # Whatever wasn't moved goes back to being served from where it is
+        remaining = list(moves)[moved:]
+        if remaining:
+            shard_router.place(remaining, moving=False)
+    return moved
+
+
+def rebalance(batch_size=100, limit=None, grace=None, progress=None):
+    """Move every netrunner the hash ring places on another shard, batch_size at a time; returns the number moved."""
+    planned = list(plan_rebalance(limit).items())
+    moved = 0
+    for start in range(0, len(planned), batch_size):
+        done_before = moved
+
+        def batch_progress(done, _):
+            progress(done_before + done, len(planned))
+        moved += move_netrunners(
+            dict(planned[start:start + batch_size]), grace=grace, progress=batch_progress if progress else None
+        )
+    return moved
+
+
+def _move(netrunner_id, target):
+    placement = shard_router.lookup(netrunner_id)
+    if placement is None:
+        raise OperationError(f'Netrunner {netrunner_id} is not in the shard directory', 404)
+    source_shard = placement[0]
+    if source_shard != target:
+        with shard_router.engine(source_shard).connect() as source:
+            source.exec_driver_sql('BEGIN IMMEDIATE')
+            version = source.execute(db.select(Netrunner.version).where(Netrunner.id == netrunner_id)).scalar()
+            shard_router.bind(target)
+            try:
+                if version is not None:
+                    # Clears what an earlier attempt left on the target before it failed
+                    _delete_netrunner(db.session.connection(), netrunner_id)
+                    id_map = {}
+                    import_ndjson(_lines(export_lines(source, netrunner_id)), netrunner_id=netrunner_id, id_map=id_map)
+                    db.session.execute(
+                        Netrunner.__table__.update().where(Netrunner.id == netrunner_id).values(version=version + 1)
+                    )
+                    db.session.commit()
+                    _record_remap(source if shard_router.engine(source_shard) is db.engine else None, netrunner_id, id_map)
+                    _delete_netrunner(source, netrunner_id)
+                    source.commit()
+                elif db.session.execute(db.select(Netrunner.id).where(Netrunner.id == netrunner_id)).first() is None:
+                    raise OperationError(f'Netrunner {netrunner_id} is on neither shard {source_shard} nor {target}', 404)
+                # Otherwise an earlier attempt got as far as deleting the source rows
+            except Exception:
+                db.session.rollback()
+                raise
+            finally:
+                shard_router.unbind()
+
+    shard_router.place([netrunner_id], shard=target, moving=False)
+    dashboard_cache.invalidate(netrunner_id)
+    entity_cache.evict_netrunner(netrunner_id)
+
+
+def _record_remap(connection, netrunner_id, id_map):
+    """Store id_map in ShardIdRemap, on connection if it is already open on the default database."""
+    if connection is None:
+        with db.engine.begin() as connection:
+            return _record_remap(connection, netrunner_id, id_map)
+    table = ShardIdRemap.__table__
+    rows = [
+        {'table_name': table_name, 'old_id': old_id, 'new_id': new_id, 'netrunner_id': netrunner_id}
+        for table_name, ids in id_map.items() for old_id, new_id in ids.items()
+    ]
+    if rows:
+        # Ids from before an earlier move of this netrunner follow it to the newest ones
+        connection.execute(
+            table.update()
+            .where(table.c.table_name == bindparam('b_table_name'), table.c.new_id == bindparam('b_old_id'))
+            .values(new_id=bindparam('b_new_id')),
+            [{'b_' + key: value for key, value in row.items() if key != 'netrunner_id'} for row in rows]
+        )
+        insert = sqlite_insert(table)
+        connection.execute(
+            insert.on_conflict_do_update(
+                index_elements=[table.c.table_name, table.c.old_id],
+                set_={'new_id': insert.excluded.new_id, 'netrunner_id': insert.excluded.netrunner_id}
+            ),
+            rows
+        )
+
+
+def _lines(chunks):
+    for chunk in chunks:
+        yield from chunk.splitlines()
+
+
+def _delete_netrunner(connection, netrunner_id):
+    row = connection.execute(db.select(Netrunner.level, Netrunner.exp).where(Netrunner.id == netrunner_id)).first()
+    if row is None:
+        return
+    for table in reversed(db.metadata.sorted_tables):
+        if 'netrunner_id' in table.c and not table.info.get('shared'):
+            connection.execute(table.delete().where(table.c.netrunner_id == netrunner_id))
+    connection.execute(Netrunner.__table__.delete().where(Netrunner.id == netrunner_id))
+    LevelCount.shift(connection, from_level=row.level)
+    ExpCount.shift(connection, from_key=(row.level, row.exp))
@@ -0,0 +1,56 @@
+import time
+from datetime import datetime, timedelta
+
+from src.models.user import db
+from src.models.netrunner import Netrunner, DataStreamEntry, DataStreamArchive
+from src.services.dashboard_cache import dashboard_cache
+
+
+def archive_data_stream(retention_days, batch_size=5000, max_batches=None, pause=0.0, now=None):
+    """Move data stream entries older than retention_days into the archive tier.
+
+    Works oldest-first in batches of batch_size, one short transaction per
+    batch, so it can run incrementally and be stopped at any point. The
+    netrunners whose entries moved get their version bumped in the same
+    transaction, so their dashboards stop listing the archived entries.
+    Returns the number of entries moved.
+    """
+    netrunner = Netrunner.__table__
+    entry = DataStreamEntry.__table__
+    archive = DataStreamArchive.__table__
+    cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+    columns = ['id', 'netrunner_id', 'message', 'entry_type', 'created_at']
+
+    moved = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        batch = (
+            db.select(entry.c.id)
+            .where(entry.c.created_at < cutoff)
+            .order_by(entry.c.id)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        db.session.execute(archive.insert().from_select(
+            columns,
+            db.select(*(entry.c[name] for name in columns)).where(entry.c.id.in_(batch))
+        ))
+        touched = db.session.execute(
+            netrunner.update()
+            .where(netrunner.c.id.in_(db.select(entry.c.netrunner_id).where(entry.c.id.in_(batch)).distinct()))
+            .values(version=netrunner.c.version + 1)
+            .returning(netrunner.c.id)
+        ).scalars().all()
+        count = db.session.execute(entry.delete().where(entry.c.id.in_(batch))).rowcount
+        db.session.commit()
+
+        for netrunner_id in touched:
+            dashboard_cache.invalidate(netrunner_id)
+
+        moved += count
+        batches += 1
+        if count < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return moved
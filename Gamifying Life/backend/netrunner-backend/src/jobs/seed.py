@@ -0,0 +1,477 @@
+import random
+import time
+from bisect import bisect_right
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+
+from src.models.user import db, User
+from src.models.netrunner import (
+    Netrunner, Contract, EpicHack, Milestone, SkillPoint, SkillTreeRollup, LevelCount, ExpCount,
+    DailyProductivity, DailyEstimateAccuracy, DataStreamEntry, DataStreamArchive,
+    BASE_EXP_PER_HOUR, BASE_CREDITS_PER_HOUR, DIFFICULTY_MULTIPLIERS, BANDWIDTH_CREDIT_RATE,
+    EPIC_HACK_BONUS_EXP_PER_MILESTONE, EPIC_HACK_BONUS_CREDITS_PER_MILESTONE
+)
+from src.services.level_curve import level_curve, level_up_message
+
+# Weighted choices, as (value, weight)
+DIFFICULTIES = [('Low-Profile', 35), ('Standard-Op', 45), ('High-Stakes', 20)]
+TIME_ESTIMATES = [(0.25, 10), (0.5, 20), (0.75, 10), (1.0, 25), (1.5, 12), (2.0, 12), (3.0, 7), (4.0, 4)]
+# Status of contracts older than RECENT_DAYS; newer ones are still pending or active
+OUTCOMES = [('completed', 88), ('failed', 4), ('pending', 4), ('active', 4)]
+RECENT_DAYS = 2
+SKILL_TREES = [
+    'System Infiltration', 'Hardware Maintenance', 'Neural Conditioning',
+    'Data Analysis', 'Social Engineering', 'Signal Discipline'
+]
+CONTRACT_VERBS = ['Refactor', 'Review', 'Draft', 'Debug', 'Study', 'Plan', 'Clean up', 'Ship', 'Outline', 'Practice']
+CONTRACT_OBJECTS = [
+    'auth service', 'weekly budget', 'React tutorial', 'database schema', 'blog post', 'inbox',
+    'Spanish lesson', 'tax documents', 'portfolio site', 'unit tests', 'meal plan', 'conference talk'
+]
+MAINTENANCE_TASKS = ['Morning workout', 'Inbox zero', 'Laundry run', 'Meditation session', 'Grocery run', 'Stretching']
+EPIC_HACK_TITLES = ['Launch side project', 'Run a half marathon', 'Learn Rust', 'Rebuild home lab', 'Write a novella']
+NOISE_ACTIVITIES = ['Doomscrolling', 'Video binge', 'Unplanned nap', 'Rabbit hole browsing']
+MAX_BANDWIDTH = 16.0
+STARTING_CREDITS = 1000
+
+# Only used while seeding: the data is synthetic and rebuilt from scratch if a crash loses it
+BULK_PRAGMAS = {'synchronous': 'OFF', 'cache_size': -262144, 'temp_store': 'MEMORY'}
+
+
+def _weighted(pairs):
+    """(values, cumulative weights) for _pick"""
+    return [value for value, _ in pairs], list(accumulate(weight for _, weight in pairs))
+
+
+def _pick(rng, weighted):
+    # What rng.choices does for one draw, without its per-call setup
+    values, cumulative = weighted
+    return values[bisect_right(cumulative, rng.random() * cumulative[-1])]
+
+
+class _Writer:
+    """Buffers rows per table and writes them with the driver's executemany.
+
+    Rows are tuples in the table's column order, already in storage form
+    (SQLite keeps DateTime as 'YYYY-MM-DD HH:MM:SS.ffffff' text), so
+    nothing goes through SQLAlchemy's per-row compile and bind steps.
+    """
+
+    def __init__(self, connection, chunk_rows):
+        self.connection = connection
+        self.chunk_rows = chunk_rows
+        self.columns = {}
+        self.pending = {}
+        self.counts = {}
+
+    def table(self, model, columns):
+        name = model.__table__.name
+        self.columns[name] = (
+            f"INSERT INTO {name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        )
+        self.pending[name] = []
+        self.counts[name] = 0
+        return self.pending[name]
+
+    def flush(self, name=None):
+        for table in [name] if name else list(self.pending):
+            rows = self.pending[table]
+            if rows:
+                self.connection.exec_driver_sql(self.columns[table], rows)
+                self.counts[table] += len(rows)
+                rows.clear()
+
+    def maybe_flush(self):
+        for table, rows in self.pending.items():
+            if len(rows) >= self.chunk_rows:
+                self.flush(table)
+
+
+class _History:
+    """Generates one netrunner's activity from first_day up to (not including) until.
+
+    Everything is driven by rng, so the same seed gives the same history.
+    Rows are appended to the writer's buffers as they are produced; the
+    derived tables (skill rollups, daily analytics) are accumulated
+    alongside and written by finish().
+    """
+
+    def __init__(self, seeder, rng, netrunner_id, alias, first_day, next_epic_hack_id, next_entry_id):
+        self.seeder = seeder
+        self.rng = rng
+        self.netrunner_id = netrunner_id
+        self.alias = alias
+        self.first_day = first_day
+        self.next_epic_hack_id = next_epic_hack_id
+        self.next_entry_id = next_entry_id
+        self.level, self.exp = 1, 0
+        self.credits = STARTING_CREDITS
+        self.bandwidth = MAX_BANDWIDTH
+        self.last_active = None
+        self.epic_hack = None
+        self.productivity = {}
+        self.accuracy = {}
+        self.skills = {}
+
+    def run(self):
+        day = self.first_day
+        while day < self.seeder.until:
+            self._day(day)
+            self.seeder.writer.maybe_flush()
+            day += timedelta(days=1)
+        return self.finish()
+
+    def _day(self, day):
+        rng, seeder = self.rng, self.seeder
+        prefix = day.isoformat() + ' '
+        clock = seeder.clock
+        # (second of day, order, message, entry_type, exp, credits) sorted before ids are handed out
+        events = []
+
+        if day == self.first_day:
+            events.append((7 * 3600, 0, f'SYSTEM_INIT: Welcome to the Net, {self.alias}', 'success', 0, 0))
+        else:
+            bonus = int(max(0.0, self.bandwidth) * BANDWIDTH_CREDIT_RATE)
+            if bonus > 0:
+                events.append((0, 0, f'DAILY_BONUS: Leftover bandwidth converted +{bonus} ¥', 'success', 0, bonus))
+            events.append((0, 1, 'SYSTEM_RESET: Daily bandwidth restored', 'info', 0, 0))
+            self.bandwidth = MAX_BANDWIDTH
+
+        recent = (seeder.until - day).days <= RECENT_DAYS
+        weekend = day.weekday() >= 5
+        rate = seeder.contracts_per_day * (0.5 if weekend else 1.15)
+        for _ in range(int(rate * rng.uniform(0.5, 1.5) + rng.random())):
+            self._contract(day, prefix, recent, events)
+
+        for _ in range(rng.choices((0, 1, 2), (55, 35, 10))[0]):
+            amount = rng.choice((0.5, 1.0, 1.5, 2.0))
+            cost = amount * 1.5
+            at = rng.randrange(12 * 3600, 24 * 3600)
+            events.append((at, 2, f'SIGNAL_NOISE: {rng.choice(NOISE_ACTIVITIES)} -{cost} BW', 'warning', 0, 0))
+            self._add(day, bandwidth_spent=cost)
+            self.bandwidth -= cost
+            if self.bandwidth < 0:
+                events.append((at, 3, 'SIGNAL_DEBT: System performance degraded', 'error', 0, 0))
+
+        self._epic_hack_progress(day, prefix, events)
+
+        events.sort()
+        archive = day < seeder.archive_before
+        rows = seeder.archive_rows if archive else seeder.entry_rows
+        for at, _, message, entry_type, exp, credits in events:
+            created_at = prefix + clock[at]
+            rows.append((self.next_entry_id, self.netrunner_id, message, entry_type, created_at))
+            self.next_entry_id += 1
+            self.credits += credits
+            if exp:
+                level, self.exp = level_curve.resolve(self.level, self.exp + exp)
+                if level != self.level:
+                    rows.append((
+                        self.next_entry_id, self.netrunner_id, level_up_message(self.level, level), 'success', created_at
+                    ))
+                    self.next_entry_id += 1
+                    self.level = level
+        if events:
+            self.last_active = prefix + clock[events[-1][0]]
+
+    def _contract(self, day, prefix, recent, events):
+        rng, seeder = self.rng, self.seeder
+        clock = seeder.clock
+        difficulty = _pick(rng, seeder.difficulties)
+        estimate = _pick(rng, seeder.estimates)
+        multiplier = DIFFICULTY_MULTIPLIERS[difficulty]
+        exp_reward = int(BASE_EXP_PER_HOUR * estimate * multiplier)
+        credit_reward = int(BASE_CREDITS_PER_HOUR * estimate * multiplier)
+
+        kind = rng.random()
+        epic_hack_id = None
+        if kind < 0.25:
+            contract_type, title = 'maintenance', rng.choice(MAINTENANCE_TASKS)
+        elif kind < 0.3 and self.epic_hack is not None:
+            contract_type, title = 'epic_hack', f"{self.epic_hack['title']}: next step"
+            epic_hack_id = self.epic_hack['id']
+        else:
+            contract_type, title = 'main', f'{rng.choice(CONTRACT_VERBS)} {rng.choice(CONTRACT_OBJECTS)}'
+
+        created = rng.randrange(7 * 3600, 20 * 3600)
+        status = rng.choice(('pending', 'active')) if recent else _pick(rng, seeder.outcomes)
+        events.append((created, 2, f'NEW_CONTRACT: {title} [{difficulty}]', 'info', 0, 0))
+        started = completed = None
+        time_spent, progress = 0.0, 0
+        if status != 'pending':
+            started = min(created + rng.randrange(0, 2 * 3600), 86399)
+            events.append((started, 2, f'HACK_INITIATED: {title}', 'info', 0, 0))
+            progress = rng.randrange(10, 90)
+        if status == 'completed':
+            time_spent = round(estimate * rng.lognormvariate(0, 0.35), 2)
+            completed = min(started + int(time_spent * 3600), 86399)
+            progress = 100
+            efficient = time_spent <= estimate
+            exp_gained = int(exp_reward * (1.2 if efficient else 0.8))
+            credits_gained = int(credit_reward * (1.2 if efficient else 0.8))
+            events.append((
+                completed, 2, f'CONTRACT_COMPLETED: {title} +{exp_gained} EXP +{credits_gained} ¥', 'success',
+                exp_gained, credits_gained
+            ))
+            recovered = 0.25 if efficient else 0
+            if recovered:
+                events.append((completed, 3, f'BANDWIDTH_RECOVERED: Efficient execution +{recovered} BW', 'success', 0, 0))
+                self.bandwidth = min(MAX_BANDWIDTH, self.bandwidth + recovered)
+            bonus = 0
+            if rng.random() < 0.3:
+                bonus = 25
+                events.append((completed, 4, f'HACK_DEBRIEF: Reflection bonus +{bonus} EXP', 'success', bonus, 0))
+            self._add(day, exp_earned=exp_gained + bonus, credits_earned=credits_gained,
+                      contracts_completed=1, bandwidth_recovered=recovered)
+            key = (day, difficulty)
+            count, spent, estimated = self.accuracy.get(key, (0, 0.0, 0.0))
+            self.accuracy[key] = (count + 1, spent + time_spent, estimated + estimate)
+
+            tree = rng.choice(SKILL_TREES)
+            points = 2 if difficulty == 'High-Stakes' else 1
+            acquired_at = day.isoformat() + ' ' + clock[completed]
+            seeder.skill_rows.append((self.netrunner_id, tree, points, acquired_at))
+            total, point_count, last_acquired_at = self.skills.get(tree, (0, 0, acquired_at))
+            self.skills[tree] = (total + points, point_count + 1, max(last_acquired_at, acquired_at))
+
+        seeder.contract_rows.append((
+            self.netrunner_id, epic_hack_id, title, '', difficulty, status, estimate, time_spent, progress,
+            exp_reward, credit_reward, contract_type,
+            prefix + clock[created],
+            prefix + clock[started] if started is not None else None,
+            prefix + clock[completed] if completed is not None else None
+        ))
+
+    def _epic_hack_progress(self, day, prefix, events):
+        rng, seeder = self.rng, self.seeder
+        epic = self.epic_hack
+        if epic is None:
+            if rng.random() < 1 / 45:
+                title = rng.choice(EPIC_HACK_TITLES)
+                at = rng.randrange(8 * 3600, 12 * 3600)
+                self.epic_hack = {
+                    'id': self.next_epic_hack_id, 'title': title, 'created_at': prefix + seeder.clock[at],
+                    'target_date': (day + timedelta(days=rng.randrange(30, 120))).isoformat() + ' 00:00:00.000000',
+                    'milestones': rng.randrange(3, 9), 'completed': []
+                }
+                self.next_epic_hack_id += 1
+                events.append((at, 2, f'EPIC_HACK_INITIATED: {title}', 'info', 0, 0))
+            return
+
+        if rng.random() >= 0.12:
+            return
+        number = len(epic['completed']) + 1
+        at = rng.randrange(13 * 3600, 22 * 3600)
+        exp_gained, credits_gained = BASE_EXP_PER_HOUR, BASE_CREDITS_PER_HOUR
+        title = f"{epic['title']} - phase {number}"
+        epic['completed'].append((title, prefix + seeder.clock[at]))
+        events.append((
+            at, 2, f'MILESTONE_COMPLETED: {title} +{exp_gained} EXP +{credits_gained} ¥', 'success',
+            exp_gained, credits_gained
+        ))
+        if number == epic['milestones']:
+            bonus_exp = epic['milestones'] * EPIC_HACK_BONUS_EXP_PER_MILESTONE
+            bonus_credits = epic['milestones'] * EPIC_HACK_BONUS_CREDITS_PER_MILESTONE
+            events.append((
+                at, 3, f"EPIC_HACK_COMPLETED: {epic['title']} +{bonus_exp} EXP +{bonus_credits} ¥", 'success',
+                bonus_exp, bonus_credits
+            ))
+            exp_gained += bonus_exp
+            credits_gained += bonus_credits
+            self._write_epic_hack(prefix + seeder.clock[at])
+        self._add(day, exp_earned=exp_gained, credits_earned=credits_gained)
+
+    def _write_epic_hack(self, completed_at=None):
+        epic, seeder = self.epic_hack, self.seeder
+        done = len(epic['completed'])
+        seeder.epic_hack_rows.append((
+            epic['id'], self.netrunner_id, epic['title'], '',
+            'completed' if completed_at else ('active' if done else 'pending'),
+            done * 100 // epic['milestones'], epic['target_date'], epic['created_at'], completed_at,
+            epic['milestones'], done
+        ))
+        for number in range(1, epic['milestones'] + 1):
+            if number <= done:
+                title, milestone_completed_at = epic['completed'][number - 1]
+                status = 'completed'
+            else:
+                title, milestone_completed_at = f"{epic['title']} - phase {number}", None
+                status = 'pending'
+            seeder.milestone_rows.append((
+                epic['id'], self.netrunner_id, title, status, BASE_EXP_PER_HOUR, BASE_CREDITS_PER_HOUR,
+                epic['created_at'], milestone_completed_at
+            ))
+        self.epic_hack = None
+
+    def _add(self, day, **amounts):
+        totals = self.productivity.setdefault(day, [0, 0, 0, 0.0, 0.0])
+        for index, name in enumerate(('exp_earned', 'credits_earned', 'contracts_completed',
+                                      'bandwidth_spent', 'bandwidth_recovered')):
+            totals[index] += amounts.get(name, 0)
+
+    def finish(self):
+        seeder = self.seeder
+        if self.epic_hack is not None:
+            self._write_epic_hack()
+        for day, totals in sorted(self.productivity.items()):
+            seeder.productivity_rows.append((self.netrunner_id, day.isoformat(), *totals))
+        for (day, difficulty), totals in sorted(self.accuracy.items()):
+            seeder.accuracy_rows.append((self.netrunner_id, day.isoformat(), difficulty, *totals))
+        for tree, totals in sorted(self.skills.items()):
+            seeder.rollup_rows.append((self.netrunner_id, tree, *totals))
+        return {
+            'level': self.level,
+            'exp': self.exp,
+            'credits': self.credits,
+            'current_bandwidth': self.bandwidth,
+            'signal_debt': self.bandwidth < 0,
+            'last_active': datetime.fromisoformat(self.last_active) if self.last_active else None
+        }
+
+
+class Seeder:
+    """Bulk synthetic dataset: netrunners, their users, and years of history.
+
+    Deterministic for a given seed and until date: netrunner n draws from
+    its own RNG seeded with (seed, n), so changing --netrunners keeps the
+    ones already generated the same. Rows go in through buffered
+    executemany on one connection, committed every batch_rows rows at a
+    netrunner boundary, with synchronous=OFF and a large page cache for
+    the duration. Entries older than the retention window go straight to
+    the archive tier, as if the retention job had already run.
+    """
+
+    def __init__(self, connection, seed=0, until=None, days=730, contracts_per_day=4.0,
+                 retention_days=30, batch_rows=200000, chunk_rows=20000):
+        self.connection = connection
+        self.seed = seed
+        self.until = until or datetime.utcnow().date()
+        self.days = days
+        self.contracts_per_day = contracts_per_day
+        self.archive_before = self.until - timedelta(days=retention_days)
+        self.batch_rows = batch_rows
+        self.difficulties = _weighted(DIFFICULTIES)
+        self.estimates = _weighted(TIME_ESTIMATES)
+        self.outcomes = _weighted(OUTCOMES)
+        self.clock = [f'{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}.000000' for s in range(86400)]
+
+        self.writer = writer = _Writer(connection, chunk_rows)
+        self.contract_rows = writer.table(Contract, [
+            'netrunner_id', 'epic_hack_id', 'title', 'description', 'difficulty', 'status', 'time_estimate',
+            'time_spent', 'progress', 'exp_reward', 'credit_reward', 'contract_type', 'created_at', 'started_at',
+            'completed_at'
+        ])
+        self.epic_hack_rows = writer.table(EpicHack, [
+            'id', 'netrunner_id', 'title', 'description', 'status', 'progress', 'target_date', 'created_at',
+            'completed_at', 'total_milestones', 'completed_milestones'
+        ])
+        self.milestone_rows = writer.table(Milestone, [
+            'epic_hack_id', 'netrunner_id', 'title', 'status', 'exp_reward', 'credit_reward', 'created_at',
+            'completed_at'
+        ])
+        self.skill_rows = writer.table(SkillPoint, ['netrunner_id', 'skill_tree', 'points', 'acquired_at'])
+        self.rollup_rows = writer.table(SkillTreeRollup, [
+            'netrunner_id', 'skill_tree', 'total_points', 'point_count', 'last_acquired_at'
+        ])
+        self.productivity_rows = writer.table(DailyProductivity, [
+            'netrunner_id', 'day', 'exp_earned', 'credits_earned', 'contracts_completed', 'bandwidth_spent',
+            'bandwidth_recovered'
+        ])
+        self.accuracy_rows = writer.table(DailyEstimateAccuracy, [
+            'netrunner_id', 'day', 'difficulty', 'contracts_completed', 'time_spent', 'time_estimated'
+        ])
+        entry_columns = ['id', 'netrunner_id', 'message', 'entry_type', 'created_at']
+        self.entry_rows = writer.table(DataStreamEntry, entry_columns)
+        self.archive_rows = writer.table(DataStreamArchive, entry_columns)
+        writer.counts.update(user=0, netrunner=0)
+
+    def run(self, netrunners, alias_prefix='runner', progress=None):
+        """Create netrunners 1..netrunners; returns rows written per table."""
+        aliases = [f'{alias_prefix}-{number:06d}' for number in range(1, netrunners + 1)]
+        taken = self.connection.execute(
+            db.select(Netrunner.alias).where(Netrunner.alias.in_(aliases[:1] + aliases[-1:]))
+        ).first()
+        if taken is not None:
+            raise ValueError(f'Alias {taken.alias!r} already exists; pick another alias prefix')
+
+        started = time.monotonic()
+        with self._bulk_pragmas():
+            uncommitted = 0
+            try:
+                for number, alias in enumerate(aliases, 1):
+                    uncommitted += self._netrunner(number, alias)
+                    if uncommitted >= self.batch_rows or number == netrunners:
+                        self.connection.commit()
+                        uncommitted = 0
+                        if progress:
+                            progress(number, sum(self.writer.counts.values()), time.monotonic() - started)
+            except BaseException:
+                self.connection.rollback()
+                raise
+        return dict(self.writer.counts)
+
+    def _netrunner(self, number, alias):
+        rng = random.Random(f'{self.seed}:{number}')
+        # Accounts join at different points of the window
+        first_day = self.until - timedelta(days=max(1, int(self.days * rng.uniform(0.4, 1.0))))
+        created_at = datetime.combine(first_day, datetime.min.time()) + timedelta(hours=7)
+        self.connection.execute(User.__table__.insert().values(username=alias, email=f'{alias}@netrunner.test'))
+        netrunner_id = self.connection.execute(
+            Netrunner.__table__.insert()
+            .values(alias=alias, created_at=created_at, last_active=created_at, version=1)
+            .returning(Netrunner.id)
+        ).scalar_one()
+        self.writer.counts['user'] += 1
+        self.writer.counts['netrunner'] += 1
+
+        # Explicit ids for epic hacks (milestones point at them) and the data stream (the
+        # archive assigns none); read once the insert above holds the write lock
+        next_epic_hack_id = self._max_id(EpicHack) + 1
+        next_entry_id = max(self._max_id(DataStreamEntry), self._max_id(DataStreamArchive)) + 1
+        before = sum(self.writer.counts.values())
+        history = _History(self, rng, netrunner_id, alias, first_day, next_epic_hack_id, next_entry_id)
+        final = history.run()
+        self.writer.flush()
+
+        self.connection.execute(
+            Netrunner.__table__.update().where(Netrunner.id == netrunner_id).values(**final)
+        )
+        LevelCount.shift(self.connection, to_level=final['level'])
+        ExpCount.shift(self.connection, to_key=(final['level'], final['exp']))
+        return sum(self.writer.counts.values()) - before + 2
+
+    def _max_id(self, model):
+        return self.connection.execute(db.select(db.func.max(model.id))).scalar() or 0
+
+    @contextmanager
+    def _bulk_pragmas(self):
+        if self.connection.dialect.name != 'sqlite':
+            yield
+            return
+        # Pooled connection: put the settings back before it is reused
+        previous = {
+            name: self.connection.exec_driver_sql(f'PRAGMA {name}').scalar() for name in BULK_PRAGMAS
+        }
+        for name, value in BULK_PRAGMAS.items():
+            self.connection.exec_driver_sql(f'PRAGMA {name}={value}')
+        self.connection.commit()
+        try:
+            yield
+        finally:
+            for name, value in previous.items():
+                self.connection.exec_driver_sql(f'PRAGMA {name}={value}')
+            self.connection.commit()
+
+
+def seed_dataset(engine, netrunners, seed=0, until=None, days=730, contracts_per_day=4.0,
+                 retention_days=30, batch_rows=200000, alias_prefix='runner', progress=None):
+    """Generate netrunners with days of synthetic history; returns rows written per table."""
+    if isinstance(until, str):
+        until = date.fromisoformat(until)
+    with engine.connect() as connection:
+        seeder = Seeder(
+            connection, seed=seed, until=until, days=days, contracts_per_day=contracts_per_day,
+            retention_days=retention_days, batch_rows=batch_rows
+        )
+        return seeder.run(netrunners, alias_prefix=alias_prefix, progress=progress)
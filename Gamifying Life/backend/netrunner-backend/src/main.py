@@ -3,46 +3,132 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
-from flask_cors import CORS
-from src.models.user import db
-from src.models.netrunner import Netrunner, Contract, EpicHack, Milestone, SkillPoint, DataStreamEntry
-from src.routes.user import user_bp
-from src.routes.netrunner import netrunner_bp
-
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
-
-# Enable CORS for all routes
-CORS(app, origins="*")
-
-app.register_blueprint(user_bp, url_prefix='/api')
-app.register_blueprint(netrunner_bp, url_prefix='/api')
-
-# Database configuration
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
-
-with app.app_context():
-    db.create_all()
-
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
-def serve(path):
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
-            return "Static folder not configured", 404
-
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
-        else:
+from flask import Flask
+
+DEFAULT_DATABASE_DIR = os.path.join(os.path.dirname(__file__), 'database')
+
+
+def create_app(config=None):
+    """Build the Flask app.
+
+    Blueprints, models and services are imported here rather than at module
+    level, so importing src.main stays cheap. The schema is not touched on
+    startup: run `flask --app src.main netrunner migrate` once per deploy,
+    or pass AUTO_MIGRATE=True for local development.
+    """
+    from flask_cors import CORS
+    from src.models.user import db
+    from src.routes.user import user_bp
+    from src.routes.netrunner import netrunner_bp
+    from src.routes.leaderboard import leaderboard_bp
+    from src.routes.metrics import metrics_bp
+    from src.routes.analytics import analytics_bp
+    from src.routes.sync import sync_bp
+    from src.routes.transfer import transfer_bp
+    from src.services.dashboard_cache import dashboard_cache
+    from src.services.entity_cache import entity_cache
+    from src.services.unit_of_work import unit_of_work
+    from src.services.metrics import request_metrics
+    from src.services.event_stream import event_broker
+    from src.services import sqlite_tuning
+    from src.services.activity import last_seen
+    from src.services.side_effects import side_effects
+    from src.services.level_curve import level_curve
+    from src.services.static_assets import static_assets
+    from src.services.shards import shard_router
+    from src.cli import netrunner_cli
+
+    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+    app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+
+    # Database configuration
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
+        'DATABASE_URL',
+        f"sqlite:///{os.path.join(DEFAULT_DATABASE_DIR, 'app.db')}"
+    )
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # 2 or more spreads netrunners over that many SQLite files (see services/shards.py)
+    app.config['SHARD_COUNT'] = int(os.environ.get('SHARD_COUNT', 0))
+    app.config['SHARD_DIR'] = os.environ.get('SHARD_DIR', DEFAULT_DATABASE_DIR)
+    app.config['DATA_STREAM_RETENTION_DAYS'] = 30
+    app.config['AUTO_MIGRATE'] = False
+    app.config.update(config or {})
+    if app.config['SQLALCHEMY_DATABASE_URI'].startswith(f'sqlite:///{DEFAULT_DATABASE_DIR}'):
+        os.makedirs(DEFAULT_DATABASE_DIR, exist_ok=True)
+
+    # Enable CORS for all routes
+    CORS(app, origins="*")
+
+    app.register_blueprint(user_bp, url_prefix='/api')
+    app.register_blueprint(netrunner_bp, url_prefix='/api')
+    app.register_blueprint(leaderboard_bp, url_prefix='/api')
+    app.register_blueprint(metrics_bp, url_prefix='/api')
+    app.register_blueprint(analytics_bp, url_prefix='/api')
+    app.register_blueprint(sync_bp, url_prefix='/api')
+    app.register_blueprint(transfer_bp, url_prefix='/api')
+    app.cli.add_command(netrunner_cli)
+
+    # Registers the shard binds, so it has to come before db.init_app
+    shard_router.init_app(app)
+    db.init_app(app)
+    sqlite_tuning.init_app(app)
+    dashboard_cache.init_app(app)
+    entity_cache.init_app(app)
+    # Before unit_of_work so request timings include the end-of-request commit
+    request_metrics.init_app(app)
+    unit_of_work.init_app(app)
+    event_broker.init_app(app)
+    last_seen.init_app(app)
+    side_effects.init_app(app)
+    level_curve.init_app(app)
+    static_assets.init_app(app)
+
+    if app.config['AUTO_MIGRATE']:
+        with app.app_context():
+            shard_router.migrate()
+
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve(path):
+        if app.static_folder is None:
+                return "Static folder not configured", 404
+
+        # Served from the manifest built at startup; unknown paths get index.html
+        asset = static_assets.lookup(path)
+        if asset is None:
             return "index.html not found", 404
+        return static_assets.response_for(asset)
+
+    return app
+
+
+def prepare_for_fork(app):
+    """Finish expensive setup in a preloading master so forked workers share it.
+
+    Configures every mapper up front, drops pooled connections on every
+    database (SQLite handles must not cross a fork) and freezes the heap so
+    workers don't copy it on first garbage collection.
+    """
+    import gc
+    from sqlalchemy.orm import configure_mappers
+    from src.models.user import db
+
+    configure_mappers()
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+    gc.collect()
+    gc.freeze()
+
+
+def __getattr__(name):
+    # `from src.main import app` and `src.main:app` still work, built on first use
+    if name == 'app':
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    create_app({'AUTO_MIGRATE': True}).run(host='0.0.0.0', port=5000, debug=True)
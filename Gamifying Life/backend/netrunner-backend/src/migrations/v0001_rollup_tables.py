@@ -0,0 +1,26 @@
+"""Tables added for rollups, the leaderboard and the data stream archive.
+
+Creates skill_tree_rollup, level_count and data_stream_archive on
+databases that predate them and backfills the two derived tables.
+"""
+from sqlalchemy import inspect, text
+
+from src.models.user import db
+
+
+def upgrade(connection):
+    existing = set(inspect(connection).get_table_names())
+    for name in ('skill_tree_rollup', 'level_count', 'data_stream_archive'):
+        if name not in existing:
+            db.metadata.tables[name].create(connection)
+
+    if 'skill_tree_rollup' not in existing:
+        connection.execute(text(
+            'INSERT INTO skill_tree_rollup (netrunner_id, skill_tree, total_points, point_count, last_acquired_at) '
+            'SELECT netrunner_id, skill_tree, COALESCE(SUM(points), 0), COUNT(*), MAX(acquired_at) '
+            'FROM skill_point GROUP BY netrunner_id, skill_tree'
+        ))
+    if 'level_count' not in existing:
+        connection.execute(text(
+            'INSERT INTO level_count (level, count) SELECT level, COUNT(*) FROM netrunner GROUP BY level'
+        ))
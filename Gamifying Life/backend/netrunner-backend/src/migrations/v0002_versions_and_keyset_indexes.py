@@ -0,0 +1,31 @@
+"""Columns and indexes added after the original schema.
+
+netrunner.version (ETags), contract.epic_hack_id/created_at,
+epic_hack.target_date and the keyset pagination and rank indexes.
+Contracts from before created_at existed get their best known timestamp.
+"""
+from sqlalchemy import inspect, text
+
+from src.models.user import db
+
+NEW_COLUMNS = [
+    ('netrunner', 'version', 'INTEGER NOT NULL DEFAULT 1'),
+    ('contract', 'epic_hack_id', 'INTEGER REFERENCES epic_hack (id)'),
+    ('contract', 'created_at', 'DATETIME'),
+    ('epic_hack', 'target_date', 'DATETIME'),
+]
+
+
+def upgrade(connection):
+    inspector = inspect(connection)
+    for table, column, definition in NEW_COLUMNS:
+        if column not in {existing['name'] for existing in inspector.get_columns(table)}:
+            connection.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {definition}'))
+
+    connection.execute(text(
+        'UPDATE contract SET created_at = COALESCE(started_at, completed_at, CURRENT_TIMESTAMP) '
+        'WHERE created_at IS NULL'
+    ))
+    for table in ('netrunner', 'contract', 'epic_hack', 'data_stream_entry', 'data_stream_archive'):
+        for index in db.metadata.tables[table].indexes:
+            index.create(connection, checkfirst=True)
@@ -0,0 +1,44 @@
+"""Milestone counters on epic_hack and milestone.created_at.
+
+Backfills total_milestones/completed_milestones and progress from the
+existing milestone rows, and completes epic hacks whose milestones are
+all done; from here on they are kept up to date per write.
+"""
+from sqlalchemy import inspect, text
+
+from src.models.user import db
+
+NEW_COLUMNS = [
+    ('epic_hack', 'total_milestones', 'INTEGER NOT NULL DEFAULT 0'),
+    ('epic_hack', 'completed_milestones', 'INTEGER NOT NULL DEFAULT 0'),
+    ('milestone', 'created_at', 'DATETIME'),
+]
+
+
+def upgrade(connection):
+    inspector = inspect(connection)
+    for table, column, definition in NEW_COLUMNS:
+        if column not in {existing['name'] for existing in inspector.get_columns(table)}:
+            connection.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {definition}'))
+
+    connection.execute(text(
+        'UPDATE milestone SET created_at = COALESCE(completed_at, CURRENT_TIMESTAMP) WHERE created_at IS NULL'
+    ))
+    connection.execute(text(
+        'UPDATE epic_hack SET '
+        'total_milestones = (SELECT COUNT(*) FROM milestone WHERE milestone.epic_hack_id = epic_hack.id), '
+        "completed_milestones = (SELECT COUNT(*) FROM milestone "
+        "WHERE milestone.epic_hack_id = epic_hack.id AND milestone.status = 'completed')"
+    ))
+    connection.execute(text(
+        'UPDATE epic_hack SET progress = completed_milestones * 100 / total_milestones WHERE total_milestones > 0'
+    ))
+    # Epics whose milestones were all done before the counters existed would never complete otherwise
+    connection.execute(text(
+        "UPDATE epic_hack SET status = 'completed', completed_at = COALESCE("
+        "(SELECT MAX(milestone.completed_at) FROM milestone WHERE milestone.epic_hack_id = epic_hack.id), "
+        "CURRENT_TIMESTAMP) "
+        "WHERE total_milestones > 0 AND completed_milestones = total_milestones AND status != 'completed'"
+    ))
+    for index in db.metadata.tables['milestone'].indexes:
+        index.create(connection, checkfirst=True)
@@ -0,0 +1,14 @@
+"""Daily productivity and estimate accuracy tables.
+
+Rows are upserted as contracts, milestones and bandwidth spends happen.
+History from before this migration is filled in with
+`flask netrunner rebuild-daily-analytics`.
+"""
+from src.models.user import db
+
+TABLES = ['daily_productivity', 'daily_estimate_accuracy']
+
+
+def upgrade(connection):
+    for name in TABLES:
+        db.metadata.tables[name].create(connection, checkfirst=True)
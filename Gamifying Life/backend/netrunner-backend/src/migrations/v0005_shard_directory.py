@@ -0,0 +1,12 @@
+"""Shard directory table.
+
+Existing tables are left as they are, without AUTOINCREMENT: a database
+that predates sharding becomes shard 0, whose id range starts at 1
+anyway. Fill the directory with `flask netrunner shards init` when
+turning sharding on.
+"""
+from src.models.user import db
+
+
+def upgrade(connection):
+    db.metadata.tables['shard_directory'].create(connection, checkfirst=True)
@@ -0,0 +1,10 @@
+"""Shard id remap table.
+
+Filled in by shard moves from now on; netrunners moved before this
+migration keep their new ids only.
+"""
+from src.models.user import db
+
+
+def upgrade(connection):
+    db.metadata.tables['shard_id_remap'].create(connection, checkfirst=True)
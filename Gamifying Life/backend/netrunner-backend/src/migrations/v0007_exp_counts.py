@@ -0,0 +1,17 @@
+"""Per-(level, exp) netrunner counts for rank lookups.
+
+Filled from the netrunner table here, on every database it runs against;
+`flask netrunner rebuild-leaderboard` recomputes it later if needed.
+"""
+from src.models.user import db
+
+
+def upgrade(connection):
+    table = db.metadata.tables['exp_count']
+    netrunner = db.metadata.tables['netrunner']
+    table.create(connection, checkfirst=True)
+    connection.execute(table.delete())
+    connection.execute(table.insert().from_select(
+        ['level', 'exp', 'count'],
+        db.select(netrunner.c.level, netrunner.c.exp, db.func.count()).group_by(netrunner.c.level, netrunner.c.exp)
+    ))
@@ -1,7 +1,19 @@
 from src.models.user import db
 from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm.attributes import set_committed_value
+from src.services.level_curve import level_curve, level_up_message
 import json
 
+# Leftover bandwidth is paid out at the daily reset: 1 BW = 100 ¥
+BANDWIDTH_CREDIT_RATE = 100
+
+# Table option for rows whose ids a shard hands out from its own range
+# (see services/shards.py): AUTOINCREMENT keeps new ids above the floor a
+# fresh shard writes into sqlite_sequence
+SHARD_ID_RANGE = {"sqlite_autoincrement": True}
+
 class Netrunner(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     alias = db.Column(db.String(80), unique=True, nullable=False)
@@ -13,6 +25,8 @@ class Netrunner(db.Model):
     signal_debt = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_active = db.Column(db.DateTime, default=datetime.utcnow)
+    # Bumped once per transaction that writes the netrunner or any of its rows; drives ETags
+    version = db.Column(db.Integer, nullable=False, default=1)
 
     contracts = db.relationship("Contract", backref="netrunner", lazy=True)
     epic_hacks = db.relationship("EpicHack", backref="netrunner", lazy=True)
@@ -20,6 +34,10 @@ class Netrunner(db.Model):
     skill_points = db.relationship("SkillPoint", backref="netrunner", lazy=True)
     data_stream_entries = db.relationship("DataStreamEntry", backref="netrunner", lazy=True)
 
+    __table_args__ = (
+        db.Index("ix_netrunner_rank", "level", "exp", "id"),
+    )
+
     def __repr__(self):
         return f"<Netrunner {self.alias}>"
 
@@ -30,50 +48,121 @@ class Netrunner(db.Model):
             "level": self.level,
             "exp": self.exp,
             "credits": self.credits,
-            "max_bandwidth": self.max_bandwidth,
-            "current_bandwidth": self.current_bandwidth,
+            # RETURNING can hand back integral REAL values as int
+            "max_bandwidth": float(self.max_bandwidth),
+            "current_bandwidth": float(self.current_bandwidth),
             "signal_debt": self.signal_debt,
             "created_at": self.created_at.isoformat(),
-            "last_active": self.last_active.isoformat()
+            "last_active": self.last_active.isoformat(),
+            "version": self.version
         }
 
-    def update_exp(self, amount):
-        self.exp += amount
-        # Example level up logic
-        while self.exp >= self.level * 200 + 800:
-            self.exp -= (self.level * 200 + 800)
-            self.level += 1
-            self.add_data_stream_entry(f"LEVEL UP: Reached Level {self.level}!", "success")
-
-    def update_credits(self, amount):
-        self.credits += amount
-
-    def use_bandwidth(self, amount):
-        self.current_bandwidth -= amount
-        if self.current_bandwidth < 0:
-            self.signal_debt = True
-            self.add_data_stream_entry("WARNING: Bandwidth depleted. Entering Signal Debt.", "warning")
-        else:
-            self.signal_debt = False
+    def get_exp_to_next_level(self):
+        return level_curve.exp_to_next(self.level)
+
+    @classmethod
+    def apply_delta(cls, netrunner_id, exp=0, credits=0, bandwidth=0.0):
+        """Atomically add to exp, credits and current_bandwidth.
+
+        A single UPDATE ... RETURNING, so concurrent workers never lose
+        increments. Recovered bandwidth is capped at max_bandwidth. Returns
+        the refreshed Netrunner with level-ups settled, or None.
+        """
+        new_bandwidth = cls.current_bandwidth + bandwidth
+        if bandwidth > 0:
+            new_bandwidth = db.func.min(cls.max_bandwidth, new_bandwidth)
+        netrunner = db.session.execute(
+            db.update(cls)
+            .where(cls.id == netrunner_id)
+            .values(
+                exp=cls.exp + exp,
+                credits=cls.credits + credits,
+                current_bandwidth=new_bandwidth,
+                signal_debt=new_bandwidth < 0,
+                version=_next_version(netrunner_id)
+            )
+            .returning(cls)
+            .execution_options(populate_existing=True)
+        ).scalar_one_or_none()
+        if netrunner is not None:
+            # UPDATE statements bypass flush tracking, so record the write for cache invalidation
+            db.session.info.setdefault("netrunners_updated", set()).add(netrunner_id)
+            if exp:
+                ExpCount.shift(
+                    db.session.connection(), (netrunner.level, netrunner.exp - exp), (netrunner.level, netrunner.exp)
+                )
+            netrunner.settle_level_ups()
+        return netrunner
+
+    def settle_level_ups(self):
+        # Level is compare-and-swapped so two workers can't both apply the same level-up
+        while True:
+            level, exp = level_curve.resolve(self.level, self.exp)
+            if level == self.level:
+                return
+            previous_level, previous_exp = self.level, self.exp
+            updated = db.session.execute(
+                db.update(Netrunner)
+                .where(Netrunner.id == self.id, Netrunner.level == previous_level)
+                .values(level=level, exp=Netrunner.exp - (self.exp - exp))
+                .returning(Netrunner)
+                .execution_options(populate_existing=True)
+            ).scalar_one_or_none()
+            if updated is None:
+                db.session.refresh(self)
+                continue
+            LevelCount.shift(db.session.connection(), previous_level, level)
+            ExpCount.shift(db.session.connection(), (previous_level, previous_exp), (level, updated.exp))
+            self.add_data_stream_entry(level_up_message(previous_level, level), "success")
+            return
 
     def reset_daily_bandwidth(self):
-        if self.current_bandwidth > 0:
-            # Convert remaining bandwidth to credits
-            converted_credits = int(self.current_bandwidth * 10) # Example conversion rate
-            self.credits += converted_credits
-            self.add_data_stream_entry(f"BANDWIDTH_CONVERTED: {converted_credits} ¥ from remaining BW.", "info")
-        self.current_bandwidth = self.max_bandwidth
-        self.signal_debt = False
-        self.add_data_stream_entry("BANDWIDTH_RECOVERED: Daily reset complete.", "success")
+        # Convert leftover bandwidth to credits; jobs/daily_reset.py applies the same rule in bulk.
+        # The UPDATE only applies if bandwidth is unchanged since we read it, otherwise re-read and retry.
+        while True:
+            observed = self.current_bandwidth
+            bonus_credits = int(max(0, observed) * BANDWIDTH_CREDIT_RATE)
+            updated = db.session.execute(
+                db.update(Netrunner)
+                .where(Netrunner.id == self.id, Netrunner.current_bandwidth == observed)
+                .values(
+                    credits=Netrunner.credits + bonus_credits,
+                    current_bandwidth=Netrunner.max_bandwidth,
+                    signal_debt=False,
+                    version=_next_version(self.id)
+                )
+                .returning(Netrunner)
+                .execution_options(populate_existing=True)
+            ).scalar_one_or_none()
+            if updated is not None:
+                break
+            db.session.refresh(self)
+        db.session.info.setdefault("netrunners_updated", set()).add(self.id)
+        if bonus_credits > 0:
+            self.add_data_stream_entry(f"DAILY_BONUS: Leftover bandwidth converted +{bonus_credits} ¥", "success")
+        self.add_data_stream_entry("SYSTEM_RESET: Daily bandwidth restored", "info")
+        return bonus_credits
 
     def add_data_stream_entry(self, message, entry_type="info"):
         entry = DataStreamEntry(netrunner=self, message=message, entry_type=entry_type)
         db.session.add(entry)
-        db.session.commit()
+
+# Base rewards per estimated hour, scaled by difficulty
+BASE_EXP_PER_HOUR = 100
+BASE_CREDITS_PER_HOUR = 50
+DIFFICULTY_MULTIPLIERS = {
+    "Low-Profile": 1.0,
+    "Standard-Op": 1.5,
+    "High-Stakes": 2.0,
+}
+# Epic hack completion bonus, scaled by how many milestones it took
+EPIC_HACK_BONUS_EXP_PER_MILESTONE = 50
+EPIC_HACK_BONUS_CREDITS_PER_MILESTONE = 25
 
 class Contract(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     netrunner_id = db.Column(db.Integer, db.ForeignKey("netrunner.id"), nullable=False)
+    epic_hack_id = db.Column(db.Integer, db.ForeignKey("epic_hack.id"), nullable=True)
     title = db.Column(db.String(120), nullable=False)
     description = db.Column(db.Text, nullable=True)
     difficulty = db.Column(db.String(50), nullable=False) # e.g., Low-Profile, Standard-Op, High-Stakes
@@ -84,12 +173,35 @@ class Contract(db.Model):
     exp_reward = db.Column(db.Integer, nullable=False)
     credit_reward = db.Column(db.Integer, nullable=False)
     contract_type = db.Column(db.String(50), default="main") # main, maintenance, epic_hack
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
     started_at = db.Column(db.DateTime, nullable=True)
     completed_at = db.Column(db.DateTime, nullable=True)
 
+    __table_args__ = (
+        db.Index("ix_contract_netrunner_created", "netrunner_id", "created_at", "id"),
+        SHARD_ID_RANGE
+    )
+
     def __repr__(self):
         return f"<Contract {self.title}>"
 
+    @classmethod
+    def mark_completed(cls, contract_id, time_spent):
+        """Move a pending/active contract to completed; None if another request got there first"""
+        return db.session.execute(
+            db.update(cls)
+            .where(cls.id == contract_id, cls.status.in_(["active", "pending"]))
+            .values(status="completed", completed_at=datetime.utcnow(), progress=100, time_spent=time_spent)
+            .returning(cls)
+            .execution_options(populate_existing=True)
+        ).scalar_one_or_none()
+
+    def calculate_rewards(self):
+        hours = self.time_estimate or 1.0
+        multiplier = DIFFICULTY_MULTIPLIERS.get(self.difficulty, 1.0)
+        self.exp_reward = int(BASE_EXP_PER_HOUR * hours * multiplier)
+        self.credit_reward = int(BASE_CREDITS_PER_HOUR * hours * multiplier)
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -104,6 +216,8 @@ class Contract(db.Model):
             "exp_reward": self.exp_reward,
             "credit_reward": self.credit_reward,
             "contract_type": self.contract_type,
+            "epic_hack_id": self.epic_hack_id,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
             "started_at": self.started_at.isoformat() if self.started_at else None,
             "completed_at": self.completed_at.isoformat() if self.completed_at else None
         }
@@ -115,14 +229,60 @@ class EpicHack(db.Model):
     description = db.Column(db.Text, nullable=True)
     status = db.Column(db.String(50), default="pending") # pending, active, completed, failed
     progress = db.Column(db.Integer, default=0) # 0-100%
+    target_date = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     completed_at = db.Column(db.DateTime, nullable=True)
+    # Maintained on every milestone write so progress never needs a recount
+    total_milestones = db.Column(db.Integer, nullable=False, default=0)
+    completed_milestones = db.Column(db.Integer, nullable=False, default=0)
 
     milestones = db.relationship("Milestone", backref="epic_hack", lazy=True)
 
+    __table_args__ = (
+        db.Index("ix_epic_hack_netrunner_created", "netrunner_id", "created_at", "id"),
+        SHARD_ID_RANGE
+    )
+
     def __repr__(self):
         return f"<EpicHack {self.title}>"
 
+    @classmethod
+    def count_new_milestone(cls, epic_hack_id):
+        """Add one milestone to the totals; None if the epic hack is missing or already completed"""
+        total = cls.total_milestones + 1
+        return db.session.execute(
+            db.update(cls)
+            .where(cls.id == epic_hack_id, cls.status != "completed")
+            .values(total_milestones=total, progress=cls.completed_milestones * 100 // total)
+            .returning(cls)
+            .execution_options(populate_existing=True)
+        ).scalar_one_or_none()
+
+    @classmethod
+    def count_completed_milestone(cls, epic_hack_id):
+        """Record one completed milestone; progress and completion are settled in the same UPDATE"""
+        completed = cls.completed_milestones + 1
+        finished = completed >= cls.total_milestones
+        return db.session.execute(
+            db.update(cls)
+            .where(cls.id == epic_hack_id)
+            .values(
+                completed_milestones=completed,
+                progress=completed * 100 // cls.total_milestones,
+                status=db.case((finished, "completed"), else_="active"),
+                completed_at=db.case((finished, datetime.utcnow()), else_=cls.completed_at)
+            )
+            .returning(cls)
+            .execution_options(populate_existing=True)
+        ).scalar_one_or_none()
+
+    def completion_bonus(self):
+        """(exp, credits) paid once when the last milestone completes"""
+        return (
+            self.total_milestones * EPIC_HACK_BONUS_EXP_PER_MILESTONE,
+            self.total_milestones * EPIC_HACK_BONUS_CREDITS_PER_MILESTONE
+        )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -131,6 +291,9 @@ class EpicHack(db.Model):
             "description": self.description,
             "status": self.status,
             "progress": self.progress,
+            "total_milestones": self.total_milestones,
+            "completed_milestones": self.completed_milestones,
+            "target_date": self.target_date.isoformat() if self.target_date else None,
             "created_at": self.created_at.isoformat(),
             "completed_at": self.completed_at.isoformat() if self.completed_at else None
         }
@@ -143,11 +306,28 @@ class Milestone(db.Model):
     status = db.Column(db.String(50), default="pending") # pending, completed
     exp_reward = db.Column(db.Integer, nullable=False)
     credit_reward = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
     completed_at = db.Column(db.DateTime, nullable=True)
 
+    __table_args__ = (
+        db.Index("ix_milestone_epic_hack_created", "epic_hack_id", "created_at", "id"),
+        SHARD_ID_RANGE
+    )
+
     def __repr__(self):
         return f"<Milestone {self.title}>"
 
+    @classmethod
+    def mark_completed(cls, milestone_id):
+        """Move a pending milestone to completed; None if another request got there first"""
+        return db.session.execute(
+            db.update(cls)
+            .where(cls.id == milestone_id, cls.status == "pending")
+            .values(status="completed", completed_at=datetime.utcnow())
+            .returning(cls)
+            .execution_options(populate_existing=True)
+        ).scalar_one_or_none()
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -157,6 +337,7 @@ class Milestone(db.Model):
             "status": self.status,
             "exp_reward": self.exp_reward,
             "credit_reward": self.credit_reward,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
             "completed_at": self.completed_at.isoformat() if self.completed_at else None
         }
 
@@ -167,6 +348,8 @@ class SkillPoint(db.Model):
     points = db.Column(db.Integer, default=1)
     acquired_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = SHARD_ID_RANGE
+
     def __repr__(self):
         return f"<SkillPoint {self.skill_tree} - {self.points}>"
 
@@ -179,6 +362,226 @@ class SkillPoint(db.Model):
             "acquired_at": self.acquired_at.isoformat()
         }
 
+class LevelCount(db.Model):
+    """Netrunners per level; lets rank lookups skip every row above the user's level"""
+    level = db.Column(db.Integer, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    @classmethod
+    def shift(cls, connection, from_level=None, to_level=None):
+        table = cls.__table__
+        if from_level is not None:
+            connection.execute(
+                table.update().where(table.c.level == from_level).values(count=table.c.count - 1)
+            )
+        if to_level is not None:
+            stmt = sqlite_insert(table).values(level=to_level, count=1)
+            connection.execute(stmt.on_conflict_do_update(
+                index_elements=[table.c.level],
+                set_={"count": table.c.count + 1}
+            ))
+
+    @classmethod
+    def rebuild(cls):
+        table = cls.__table__
+        netrunner = Netrunner.__table__
+        db.session.execute(table.delete())
+        result = db.session.execute(table.insert().from_select(
+            ["level", "count"],
+            db.select(netrunner.c.level, db.func.count()).group_by(netrunner.c.level)
+        ))
+        db.session.commit()
+        return result.rowcount
+
+class ExpCount(db.Model):
+    """Netrunners per (level, exp); rank lookups count same-level peers ahead of a user from here"""
+    level = db.Column(db.Integer, primary_key=True)
+    exp = db.Column(db.Integer, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    @classmethod
+    def shift(cls, connection, from_key=None, to_key=None):
+        """Move one netrunner between (level, exp) keys; either may be None"""
+        if from_key == to_key:
+            return
+        table = cls.__table__
+        if from_key is not None:
+            connection.execute(
+                table.update()
+                .where(table.c.level == from_key[0], table.c.exp == from_key[1])
+                .values(count=table.c.count - 1)
+            )
+        if to_key is not None:
+            stmt = sqlite_insert(table).values(level=to_key[0], exp=to_key[1], count=1)
+            connection.execute(stmt.on_conflict_do_update(
+                index_elements=[table.c.level, table.c.exp],
+                set_={"count": table.c.count + 1}
+            ))
+
+    @classmethod
+    def rebuild(cls):
+        table = cls.__table__
+        netrunner = Netrunner.__table__
+        db.session.execute(table.delete())
+        result = db.session.execute(table.insert().from_select(
+            ["level", "exp", "count"],
+            db.select(netrunner.c.level, netrunner.c.exp, db.func.count()).group_by(netrunner.c.level, netrunner.c.exp)
+        ))
+        db.session.commit()
+        return result.rowcount
+
+@event.listens_for(Netrunner, "after_insert")
+def _count_new_netrunner(mapper, connection, target):
+    LevelCount.shift(connection, to_level=target.level)
+    ExpCount.shift(connection, to_key=(target.level, target.exp))
+
+@event.listens_for(Netrunner, "after_update")
+def _count_level_change(mapper, connection, target):
+    state = db.inspect(target)
+    level, exp = state.attrs.level.history, state.attrs.exp.history
+    if level.deleted and level.added and level.deleted[0] != level.added[0]:
+        LevelCount.shift(connection, level.deleted[0], level.added[0])
+    if level.deleted or exp.deleted:
+        ExpCount.shift(
+            connection,
+            (level.deleted[0] if level.deleted else target.level, exp.deleted[0] if exp.deleted else target.exp),
+            (target.level, target.exp)
+        )
+
+@event.listens_for(Netrunner, "after_delete")
+def _count_deleted_netrunner(mapper, connection, target):
+    LevelCount.shift(connection, from_level=target.level)
+    ExpCount.shift(connection, from_key=(target.level, target.exp))
+
+class SkillTreeRollup(db.Model):
+    """Running totals per (netrunner, skill_tree), maintained on SkillPoint writes"""
+    netrunner_id = db.Column(db.Integer, db.ForeignKey("netrunner.id"), primary_key=True)
+    skill_tree = db.Column(db.String(80), primary_key=True)
+    total_points = db.Column(db.Integer, nullable=False, default=0)
+    point_count = db.Column(db.Integer, nullable=False, default=0)
+    last_acquired_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<SkillTreeRollup {self.skill_tree} - {self.total_points}>"
+
+    def to_dict(self):
+        return {
+            "skill_tree": self.skill_tree,
+            "total_points": self.total_points,
+            "point_count": self.point_count,
+            "last_acquired_at": self.last_acquired_at.isoformat() if self.last_acquired_at else None
+        }
+
+    @classmethod
+    def rebuild(cls, netrunner_id=None):
+        """Recompute rollups from SkillPoint rows; returns the number of trees written"""
+        rollup = cls.__table__
+        points = SkillPoint.__table__
+        delete = rollup.delete()
+        source = db.select(
+            points.c.netrunner_id,
+            points.c.skill_tree,
+            db.func.sum(points.c.points),
+            db.func.count(),
+            db.func.max(points.c.acquired_at)
+        ).group_by(points.c.netrunner_id, points.c.skill_tree)
+        bump = Netrunner.__table__.update().values(version=Netrunner.__table__.c.version + 1)
+        if netrunner_id is not None:
+            delete = delete.where(rollup.c.netrunner_id == netrunner_id)
+            source = source.where(points.c.netrunner_id == netrunner_id)
+            bump = bump.where(Netrunner.__table__.c.id == netrunner_id)
+        db.session.execute(delete)
+        db.session.execute(bump)
+        result = db.session.execute(rollup.insert().from_select(
+            ["netrunner_id", "skill_tree", "total_points", "point_count", "last_acquired_at"],
+            source
+        ))
+        db.session.commit()
+        return result.rowcount
+
+@event.listens_for(SkillPoint, "after_insert")
+def _rollup_skill_point_insert(mapper, connection, target):
+    # Runs on the flushing connection, so the rollup commits with the point itself
+    rollup = SkillTreeRollup.__table__
+    stmt = sqlite_insert(rollup).values(
+        netrunner_id=target.netrunner_id,
+        skill_tree=target.skill_tree,
+        total_points=target.points,
+        point_count=1,
+        last_acquired_at=target.acquired_at
+    )
+    connection.execute(stmt.on_conflict_do_update(
+        index_elements=[rollup.c.netrunner_id, rollup.c.skill_tree],
+        set_={
+            "total_points": rollup.c.total_points + stmt.excluded.total_points,
+            "point_count": rollup.c.point_count + 1,
+            "last_acquired_at": db.func.max(
+                db.func.coalesce(rollup.c.last_acquired_at, stmt.excluded.last_acquired_at),
+                stmt.excluded.last_acquired_at
+            )
+        }
+    ))
+
+@event.listens_for(SkillPoint, "after_delete")
+def _rollup_skill_point_delete(mapper, connection, target):
+    rollup = SkillTreeRollup.__table__
+    connection.execute(
+        rollup.update()
+        .where(rollup.c.netrunner_id == target.netrunner_id, rollup.c.skill_tree == target.skill_tree)
+        .values(
+            total_points=rollup.c.total_points - target.points,
+            point_count=rollup.c.point_count - 1
+        )
+    )
+
+class DailyProductivity(db.Model):
+    """Per-netrunner totals for one UTC day, upserted as rewards are paid and bandwidth is spent"""
+    netrunner_id = db.Column(db.Integer, db.ForeignKey("netrunner.id"), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    exp_earned = db.Column(db.Integer, nullable=False, default=0)
+    credits_earned = db.Column(db.Integer, nullable=False, default=0)
+    contracts_completed = db.Column(db.Integer, nullable=False, default=0)
+    bandwidth_spent = db.Column(db.Float, nullable=False, default=0.0)
+    bandwidth_recovered = db.Column(db.Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f"<DailyProductivity {self.netrunner_id} {self.day}>"
+
+    @classmethod
+    def record(cls, netrunner_id, day=None, **amounts):
+        """Add amounts to the day's row, creating it on first use"""
+        _upsert_daily(cls.__table__, {"netrunner_id": netrunner_id, "day": day or datetime.utcnow().date()}, amounts)
+
+class DailyEstimateAccuracy(db.Model):
+    """Completed contract time vs estimate per netrunner, UTC day and difficulty"""
+    netrunner_id = db.Column(db.Integer, db.ForeignKey("netrunner.id"), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    difficulty = db.Column(db.String(50), primary_key=True)
+    contracts_completed = db.Column(db.Integer, nullable=False, default=0)
+    time_spent = db.Column(db.Float, nullable=False, default=0.0)
+    time_estimated = db.Column(db.Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f"<DailyEstimateAccuracy {self.netrunner_id} {self.day} {self.difficulty}>"
+
+    @classmethod
+    def record(cls, contract, day=None):
+        """Count a completed contract; contracts without an estimate have nothing to compare"""
+        if not contract.time_estimate or contract.time_spent is None:
+            return
+        _upsert_daily(
+            cls.__table__,
+            {"netrunner_id": contract.netrunner_id, "day": day or datetime.utcnow().date(), "difficulty": contract.difficulty},
+            {"contracts_completed": 1, "time_spent": contract.time_spent, "time_estimated": contract.time_estimate}
+        )
+
+def _upsert_daily(table, key, amounts):
+    stmt = sqlite_insert(table).values(**key, **amounts)
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=[table.c[name] for name in key],
+        set_={name: table.c[name] + stmt.excluded[name] for name in amounts}
+    ))
+
 class DataStreamEntry(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     netrunner_id = db.Column(db.Integer, db.ForeignKey("netrunner.id"), nullable=False)
@@ -186,6 +589,11 @@ class DataStreamEntry(db.Model):
     entry_type = db.Column(db.String(50), default="info") # info, success, warning, error
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index("ix_data_stream_entry_netrunner_created", "netrunner_id", "created_at", "id"),
+        SHARD_ID_RANGE
+    )
+
     def __repr__(self):
         return f"<DataStreamEntry {self.entry_type} - {self.message[:20]}>"
 
@@ -197,3 +605,113 @@ class DataStreamEntry(db.Model):
             "entry_type": self.entry_type,
             "created_at": self.created_at.isoformat()
         }
+
+class DataStreamArchive(db.Model):
+    """Cold tier for DataStreamEntry rows past the retention window (ids are preserved)"""
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    netrunner_id = db.Column(db.Integer, db.ForeignKey("netrunner.id"), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    entry_type = db.Column(db.String(50), default="info")
+    created_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_data_stream_archive_netrunner_created", "netrunner_id", "created_at", "id"),
+    )
+
+    def __repr__(self):
+        return f"<DataStreamArchive {self.entry_type} - {self.message[:20]}>"
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "netrunner_id": self.netrunner_id,
+            "message": self.message,
+            "entry_type": self.entry_type,
+            "created_at": self.created_at.isoformat()
+        }
+
+class ShardDirectory(db.Model):
+    """Which shard database holds each netrunner; kept in the default database only.
+
+    Also hands out netrunner ids while sharding is on, so they stay unique
+    across shards (see services/shards.py).
+    """
+    netrunner_id = db.Column(db.Integer, primary_key=True)
+    alias = db.Column(db.String(80), unique=True, nullable=False)
+    shard = db.Column(db.Integer, nullable=False)
+    moving = db.Column(db.Boolean, nullable=False, default=False)
+
+    __table_args__ = {"sqlite_autoincrement": True, "info": {"shared": True}}
+
+    def __repr__(self):
+        return f"<ShardDirectory {self.netrunner_id} -> {self.shard}>"
+
+class ShardIdRemap(db.Model):
+    """Old id -> new id for rows a shard move copied; kept in the default database only.
+
+    Moves give a netrunner's rows ids from the target shard's range, so
+    ids clients already hold are translated through here.
+    """
+    table_name = db.Column(db.String(40), primary_key=True)
+    old_id = db.Column(db.Integer, primary_key=True)
+    new_id = db.Column(db.Integer, nullable=False)
+    netrunner_id = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_shard_id_remap_netrunner", "netrunner_id", "table_name"),
+        db.Index("ix_shard_id_remap_new", "table_name", "new_id"),
+        {"info": {"shared": True}}
+    )
+
+    def __repr__(self):
+        return f"<ShardIdRemap {self.table_name} {self.old_id} -> {self.new_id}>"
+
+# Netrunner columns that change without invalidating what clients have cached
+UNVERSIONED_ATTRS = {"last_active", "version"}
+
+def _next_version(netrunner_id):
+    """Version expression for UPDATEs that bypass the flush; bumps at most once per transaction"""
+    bumped = db.session.info.setdefault("versions_bumped", set())
+    if netrunner_id in bumped:
+        return Netrunner.version
+    bumped.add(netrunner_id)
+    return Netrunner.version + 1
+
+def _touched_netrunner_ids(session):
+    touched = set()
+    for obj in (*session.dirty, *session.deleted):
+        if isinstance(obj, Netrunner):
+            state = db.inspect(obj)
+            if any(
+                state.attrs[key].history.has_changes()
+                for key in state.mapper.column_attrs.keys()
+                if key not in UNVERSIONED_ATTRS
+            ):
+                touched.add(obj.id)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        netrunner_id = getattr(obj, "netrunner_id", None)
+        if netrunner_id is not None:
+            touched.add(netrunner_id)
+    return touched
+
+@event.listens_for(db.session, "after_flush")
+def _bump_netrunner_versions(session, flush_context):
+    bumped = session.info.setdefault("versions_bumped", set())
+    netrunner_ids = _touched_netrunner_ids(session) - bumped
+    if not netrunner_ids:
+        return
+    table = Netrunner.__table__
+    session.connection().execute(
+        table.update().where(table.c.id.in_(netrunner_ids)).values(version=table.c.version + 1)
+    )
+    bumped.update(netrunner_ids)
+    # Keep loaded instances in step without an extra SELECT
+    for netrunner_id in netrunner_ids:
+        netrunner = session.identity_map.get(db.inspect(Netrunner).identity_key_from_primary_key((netrunner_id,)))
+        if netrunner is not None and "version" in netrunner.__dict__:
+            set_committed_value(netrunner, "version", netrunner.version + 1)
+
+@event.listens_for(db.session, "after_commit")
+@event.listens_for(db.session, "after_rollback")
+def _reset_bumped_versions(session):
+    session.info.pop("versions_bumped", None)
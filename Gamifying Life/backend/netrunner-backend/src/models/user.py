@@ -1,8 +1,37 @@
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import inspect
+from sqlalchemy.sql.util import find_tables
 
-db = SQLAlchemy()
+
+class RoutingSession(Session):
+    """Session that sends netrunner tables to the shard set in info['shard_engine'].
+
+    Tables marked info={'shared': True} (users and the shard directory)
+    always stay on the default database. Nothing sets a shard unless
+    sharding is configured; see src/services/shards.py.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = self.info.get('shard_engine')
+        if engine is not None and bind is None and not _touches_shared(mapper, clause):
+            return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _touches_shared(mapper, clause):
+    if mapper is not None:
+        return inspect(mapper).local_table.info.get('shared', False)
+    if clause is not None:
+        return any(table.info.get('shared', False) for table in find_tables(clause, include_crud=True))
+    return False
+
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class User(db.Model):
+    __table_args__ = {'info': {'shared': True}}
+
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
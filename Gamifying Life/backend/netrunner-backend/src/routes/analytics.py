@@ -0,0 +1,78 @@
+from datetime import date, datetime, timedelta
+
+from flask import Blueprint, request, jsonify
+from src.models.user import db
+from src.models.netrunner import Netrunner, DailyProductivity, DailyEstimateAccuracy
+from src.services.entity_cache import entity_cache
+
+analytics_bp = Blueprint('analytics', __name__)
+
+DEFAULT_RANGE_DAYS = 30
+MAX_RANGE_DAYS = 366
+PRODUCTIVITY_COLUMNS = ('exp_earned', 'credits_earned', 'contracts_completed', 'bandwidth_spent', 'bandwidth_recovered')
+
+
+def _date_range():
+    """(start, end) from ?start=&end= (YYYY-MM-DD, inclusive); raises ValueError on bad input"""
+    end = request.args.get('end')
+    end = date.fromisoformat(end) if end else datetime.utcnow().date()
+    start = request.args.get('start')
+    start = date.fromisoformat(start) if start else end - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    if start > end:
+        raise ValueError('start is after end')
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise ValueError(f'range is longer than {MAX_RANGE_DAYS} days')
+    return start, end
+
+
+@analytics_bp.route('/netrunner/<int:netrunner_id>/analytics', methods=['GET'])
+def get_analytics(netrunner_id):
+    """Daily productivity for a date range, read from the precomputed daily tables"""
+    entity_cache.get_or_404(Netrunner, netrunner_id)
+    try:
+        start, end = _date_range()
+    except ValueError as error:
+        return jsonify({'error': f'Invalid date range: {error}'}), 400
+
+    in_range = (
+        DailyProductivity.netrunner_id == netrunner_id,
+        DailyProductivity.day.between(start, end)
+    )
+    days = db.session.execute(
+        db.select(DailyProductivity.day, *(getattr(DailyProductivity, name) for name in PRODUCTIVITY_COLUMNS))
+        .where(*in_range)
+        .order_by(DailyProductivity.day)
+    ).all()
+    totals = db.session.execute(
+        db.select(*(db.func.coalesce(db.func.sum(getattr(DailyProductivity, name)), 0) for name in PRODUCTIVITY_COLUMNS))
+        .where(*in_range)
+    ).one()
+
+    accuracy = db.session.execute(
+        db.select(
+            DailyEstimateAccuracy.difficulty,
+            db.func.sum(DailyEstimateAccuracy.contracts_completed),
+            db.func.sum(DailyEstimateAccuracy.time_spent),
+            db.func.sum(DailyEstimateAccuracy.time_estimated)
+        ).where(
+            DailyEstimateAccuracy.netrunner_id == netrunner_id,
+            DailyEstimateAccuracy.day.between(start, end)
+        ).group_by(DailyEstimateAccuracy.difficulty)
+    ).all()
+
+    return jsonify({
+        'netrunner_id': netrunner_id,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'days': [dict(zip(PRODUCTIVITY_COLUMNS, row[1:]), day=row[0].isoformat()) for row in days],
+        'totals': dict(zip(PRODUCTIVITY_COLUMNS, totals)),
+        'estimate_accuracy': {
+            difficulty: {
+                'contracts_completed': count,
+                'time_spent': time_spent,
+                'time_estimated': time_estimated,
+                'ratio': round(time_spent / time_estimated, 3) if time_estimated else None
+            }
+            for difficulty, count, time_spent, time_estimated in accuracy
+        }
+    })
@@ -0,0 +1,39 @@
+from flask import Blueprint, request, jsonify
+from src.models.netrunner import Netrunner
+from src.services.leaderboard import rank_of, total_ranked, top_page, around
+from src.services.pagination import InvalidCursor, MAX_PAGE_SIZE
+from src.services.entity_cache import entity_cache
+
+leaderboard_bp = Blueprint('leaderboard', __name__)
+
+@leaderboard_bp.route('/leaderboard', methods=['GET'])
+def get_leaderboard():
+    """Global leaderboard, best first, one page at a time"""
+    try:
+        entries, next_cursor = top_page(request.args.get('cursor'), request.args.get('limit', type=int))
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    
+    return jsonify({
+        'items': entries,
+        'next_cursor': next_cursor
+    })
+
+@leaderboard_bp.route('/netrunner/<int:netrunner_id>/rank', methods=['GET'])
+def get_rank(netrunner_id):
+    """Rank of one Netrunner (?window=N adds N neighbours above and below)"""
+    netrunner = entity_cache.get_or_404(Netrunner, netrunner_id)
+    
+    result = {
+        'netrunner_id': netrunner.id,
+        'level': netrunner.level,
+        'exp': netrunner.exp,
+        'rank': rank_of(netrunner.level, netrunner.exp),
+        'total': total_ranked()
+    }
+    
+    window = request.args.get('window', 0, type=int)
+    if window > 0:
+        result['window'] = around(netrunner, min(window, MAX_PAGE_SIZE // 2))
+    
+    return jsonify(result)
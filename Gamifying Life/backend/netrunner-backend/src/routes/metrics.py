@@ -0,0 +1,9 @@
+from flask import Blueprint, Response
+from src.services.metrics import request_metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Request, SQL and commit metrics in Prometheus text format"""
+    return Response(request_metrics.render(), mimetype='text/plain; version=0.0.4')
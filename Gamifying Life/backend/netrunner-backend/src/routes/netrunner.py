@@ -1,11 +1,40 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, abort
 from src.models.user import db
-from src.models.netrunner import Netrunner, Contract, EpicHack, Milestone, SkillPoint, DataStreamEntry
-from datetime import datetime, timedelta
+from src.models.netrunner import Netrunner, Contract, EpicHack, Milestone, SkillPoint, SkillTreeRollup, DataStreamEntry, DataStreamArchive, ShardIdRemap
+from src.services.dashboard_cache import dashboard_cache, load_dashboard_snapshot
+from src.services.pagination import keyset_page, keyset_page_tiers, InvalidCursor
+from src.services.event_stream import event_broker, stream_events
+from src.services.etags import version_etag, current_version, is_fresh, not_modified, with_etag
+from src.services.activity import last_seen
+from src.services import operations
+from src.services.operations import OperationError
+from src.services.projection import Projection, json_body, page_response
+from src.services.entity_cache import entity_cache
+from src.services.shards import shard_router, ID_ROUTE_ARGS
+from datetime import datetime
 import random
 
 netrunner_bp = Blueprint('netrunner', __name__)
 
+# Column projections for the list endpoints; each matches the model's to_dict()
+CONTRACT_FIELDS = Projection(Contract, [
+    'id', 'netrunner_id', 'title', 'description', 'difficulty', 'status', 'time_estimate', 'time_spent',
+    'progress', 'exp_reward', 'credit_reward', 'contract_type', 'epic_hack_id', 'created_at',
+    'started_at', 'completed_at'
+])
+EPIC_HACK_FIELDS = Projection(EpicHack, [
+    'id', 'netrunner_id', 'title', 'description', 'status', 'progress', 'total_milestones',
+    'completed_milestones', 'target_date', 'created_at', 'completed_at'
+])
+MILESTONE_FIELDS = Projection(Milestone, [
+    'id', 'epic_hack_id', 'netrunner_id', 'title', 'status', 'exp_reward', 'credit_reward', 'created_at',
+    'completed_at'
+])
+DATA_STREAM_FIELDS = Projection(DataStreamEntry, ['id', 'netrunner_id', 'message', 'entry_type', 'created_at'])
+DATA_STREAM_ARCHIVE_FIELDS = Projection(DataStreamArchive, DATA_STREAM_FIELDS.fields)
+SKILL_POINT_FIELDS = Projection(SkillPoint, ['id', 'netrunner_id', 'skill_tree', 'points', 'acquired_at'])
+SKILL_ROLLUP_FIELDS = Projection(SkillTreeRollup, ['skill_tree', 'total_points', 'point_count', 'last_acquired_at'])
+
 @netrunner_bp.route('/netrunner', methods=['POST'])
 def create_netrunner():
     """Create a new Netrunner"""
@@ -15,11 +44,12 @@ def create_netrunner():
         return jsonify({'error': 'Alias is required'}), 400
     
     # Check if alias already exists
-    existing = Netrunner.query.filter_by(alias=data['alias']).first()
-    if existing:
+    if shard_router.alias_taken(data['alias']):
         return jsonify({'error': 'Alias already exists'}), 409
     
     netrunner = Netrunner(
+        # Sharded, the id comes from the directory and the session moves to the new netrunner's shard
+        id=shard_router.allocate(data['alias']),
         alias=data['alias'],
         level=data.get('level', 1),
         exp=data.get('exp', 0),
@@ -29,7 +59,7 @@ def create_netrunner():
     )
     
     db.session.add(netrunner)
-    db.session.commit()
+    db.session.flush()
     
     # Create welcome data stream entry
     welcome_entry = DataStreamEntry(
@@ -38,277 +68,126 @@ def create_netrunner():
         entry_type='success'
     )
     db.session.add(welcome_entry)
-    db.session.commit()
     
     return jsonify(netrunner.to_dict()), 201
 
 @netrunner_bp.route('/netrunner/<int:netrunner_id>', methods=['GET'])
 def get_netrunner(netrunner_id):
     """Get Netrunner details"""
-    netrunner = Netrunner.query.get_or_404(netrunner_id)
-    
-    # Update last active
-    netrunner.last_active = datetime.utcnow()
-    db.session.commit()
+    # Conditional requests are answered from the version column alone
+    if request.if_none_match:
+        version = current_version(netrunner_id)
+        if version is None:
+            abort(404)
+        etag = version_etag('netrunner', netrunner_id, version)
+        if is_fresh(etag):
+            last_seen.touch(netrunner_id)
+            return not_modified(etag)
+    
+    netrunner = entity_cache.get_or_404(Netrunner, netrunner_id)
+    
+    # Update last active (buffered and flushed in bulk, so this stays a pure read)
+    now = datetime.utcnow()
+    last_seen.touch(netrunner_id, now)
     
     result = netrunner.to_dict()
+    result['last_active'] = now.isoformat()
     result['exp_to_next'] = netrunner.get_exp_to_next_level()
     
-    return jsonify(result)
+    return with_etag(jsonify(result), version_etag('netrunner', netrunner_id, netrunner.version))
 
 @netrunner_bp.route('/netrunner/<int:netrunner_id>/dashboard', methods=['GET'])
 def get_dashboard_data(netrunner_id):
     """Get complete dashboard data for a Netrunner"""
-    netrunner = Netrunner.query.get_or_404(netrunner_id)
-    
-    # Get active contracts (today's tasks)
-    active_contracts = Contract.query.filter_by(
-        netrunner_id=netrunner_id,
-        status='pending'
-    ).order_by(Contract.created_at.desc()).limit(5).all()
-    
-    # Get recent data stream entries
-    data_stream = DataStreamEntry.query.filter_by(
-        netrunner_id=netrunner_id
-    ).order_by(DataStreamEntry.created_at.desc()).limit(10).all()
-    
-    # Get skill points summary
-    skill_points = SkillPoint.query.filter_by(netrunner_id=netrunner_id).all()
-    skill_summary = {}
-    for sp in skill_points:
-        if sp.skill_tree not in skill_summary:
-            skill_summary[sp.skill_tree] = 0
-        skill_summary[sp.skill_tree] += sp.points
-    
-    return jsonify({
-        'netrunner': {
-            **netrunner.to_dict(),
-            'exp_to_next': netrunner.get_exp_to_next_level()
-        },
-        'active_contracts': [contract.to_dict() for contract in active_contracts],
-        'data_stream': [entry.to_dict() for entry in data_stream],
-        'skill_summary': skill_summary
-    })
+    # One primary key lookup answers conditional requests and validates a cached snapshot,
+    # which may predate writes made by another process
+    version = current_version(netrunner_id)
+    if version is None:
+        abort(404)
+    etag = version_etag('dashboard', netrunner_id, version)
+    if is_fresh(etag):
+        return not_modified(etag)
+    
+    snapshot = dashboard_cache.get(netrunner_id, version)
+    if snapshot is None:
+        snapshot = load_dashboard_snapshot(netrunner_id)
+        if snapshot is None:
+            abort(404)
+        dashboard_cache.set(netrunner_id, snapshot)
+    
+    return with_etag(jsonify(snapshot), version_etag('dashboard', netrunner_id, snapshot['netrunner']['version']))
 
 @netrunner_bp.route('/netrunner/<int:netrunner_id>/contracts', methods=['GET'])
 def get_contracts(netrunner_id):
-    """Get all contracts for a Netrunner"""
-    contracts = Contract.query.filter_by(netrunner_id=netrunner_id).order_by(Contract.created_at.desc()).all()
-    return jsonify([contract.to_dict() for contract in contracts])
+    """Get contracts for a Netrunner, newest first, one page at a time"""
+    try:
+        contracts, next_cursor = keyset_page(
+            CONTRACT_FIELDS.query(Contract.netrunner_id == netrunner_id),
+            Contract,
+            request.args.get('cursor'),
+            request.args.get('limit', type=int)
+        )
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    
+    return page_response(CONTRACT_FIELDS, contracts, next_cursor)
 
 @netrunner_bp.route('/netrunner/<int:netrunner_id>/contracts', methods=['POST'])
 def create_contract(netrunner_id):
     """Create a new contract"""
-    data = request.get_json()
-    
-    if not data or 'title' not in data:
-        return jsonify({'error': 'Title is required'}), 400
-    
-    contract = Contract(
-        netrunner_id=netrunner_id,
-        title=data['title'],
-        description=data.get('description', ''),
-        difficulty=data.get('difficulty', 'Standard-Op'),
-        time_estimate=data.get('time_estimate', 1.0),
-        contract_type=data.get('contract_type', 'main'),
-        epic_hack_id=data.get('epic_hack_id')
-    )
-    
-    # Calculate rewards based on difficulty and time
-    contract.calculate_rewards()
-    
-    db.session.add(contract)
-    db.session.commit()
-    
-    # Add data stream entry
-    stream_entry = DataStreamEntry(
-        netrunner_id=netrunner_id,
-        message=f"NEW_CONTRACT: {contract.title} [{contract.difficulty}]",
-        entry_type='info'
-    )
-    db.session.add(stream_entry)
-    db.session.commit()
+    try:
+        contract = operations.create_contract(netrunner_id, request.get_json())
+    except OperationError as error:
+        return jsonify({'error': error.message}), error.status
     
+    db.session.flush()
     return jsonify(contract.to_dict()), 201
 
+
 @netrunner_bp.route('/contracts/<int:contract_id>/start', methods=['POST'])
 def start_contract(contract_id):
     """Start a contract (initiate hack)"""
-    contract = Contract.query.get_or_404(contract_id)
-    netrunner = Netrunner.query.get_or_404(contract.netrunner_id)
-    
-    if contract.status != 'pending':
-        return jsonify({'error': 'Contract is not in pending status'}), 400
-    
-    contract.status = 'active'
-    db.session.commit()
-    
-    # Add data stream entry
-    stream_entry = DataStreamEntry(
-        netrunner_id=netrunner.id,
-        message=f"HACK_INITIATED: {contract.title}",
-        entry_type='info'
-    )
-    db.session.add(stream_entry)
-    db.session.commit()
+    try:
+        contract = operations.start_contract(contract_id)
+    except OperationError as error:
+        return jsonify({'error': error.message}), error.status
     
     return jsonify(contract.to_dict())
 
+
 @netrunner_bp.route('/contracts/<int:contract_id>/complete', methods=['POST'])
 def complete_contract(contract_id):
     """Complete a contract"""
-    data = request.get_json() or {}
-    contract = Contract.query.get_or_404(contract_id)
-    netrunner = Netrunner.query.get_or_404(contract.netrunner_id)
-    
-    if contract.status not in ['active', 'pending']:
-        return jsonify({'error': 'Contract cannot be completed'}), 400
-    
-    # Update contract
-    contract.status = 'completed'
-    contract.completed_at = datetime.utcnow()
-    contract.progress = 100
-    contract.time_spent = data.get('time_spent', contract.time_estimate or 1.0)
-    
-    # Calculate efficiency bonus/penalty
-    efficiency_multiplier = 1.0
-    if contract.time_estimate and contract.time_spent:
-        if contract.time_spent <= contract.time_estimate:
-            # Efficiency bonus
-            efficiency_multiplier = 1.2
-            bandwidth_recovery = 0.25
-        else:
-            # Time penalty
-            efficiency_multiplier = 0.8
-            bandwidth_recovery = 0
-    else:
-        bandwidth_recovery = 0.1
-    
-    # Apply signal debt penalty if active
-    if netrunner.signal_debt:
-        efficiency_multiplier *= 0.75
-    
-    # Award rewards
-    exp_gained = int(contract.exp_reward * efficiency_multiplier)
-    credits_gained = int(contract.credit_reward * efficiency_multiplier)
-    
-    netrunner.add_exp(exp_gained)
-    netrunner.credits += credits_gained
-    netrunner.recover_bandwidth(bandwidth_recovery)
-    
-    db.session.commit()
-    
-    # Add data stream entries
-    completion_entry = DataStreamEntry(
-        netrunner_id=netrunner.id,
-        message=f"CONTRACT_COMPLETED: {contract.title} +{exp_gained} EXP +{credits_gained} ¥",
-        entry_type='success'
-    )
-    db.session.add(completion_entry)
-    
-    if bandwidth_recovery > 0:
-        bw_entry = DataStreamEntry(
-            netrunner_id=netrunner.id,
-            message=f"BANDWIDTH_RECOVERED: Efficient execution +{bandwidth_recovery} BW",
-            entry_type='success'
-        )
-        db.session.add(bw_entry)
-    
-    db.session.commit()
-    
-    # Handle hack debrief if provided
-    debrief = data.get('debrief')
-    if debrief:
-        # Award bonus for reflection
-        bonus_exp = 25
-        netrunner.add_exp(bonus_exp)
-        
-        debrief_entry = DataStreamEntry(
-            netrunner_id=netrunner.id,
-            message=f"HACK_DEBRIEF: Reflection bonus +{bonus_exp} EXP",
-            entry_type='success'
-        )
-        db.session.add(debrief_entry)
-        db.session.commit()
+    try:
+        contract, netrunner, rewards = operations.complete_contract(contract_id, request.get_json() or {})
+    except OperationError as error:
+        return jsonify({'error': error.message}), error.status
     
     return jsonify({
         'contract': contract.to_dict(),
         'netrunner': netrunner.to_dict(),
-        'rewards': {
-            'exp_gained': exp_gained,
-            'credits_gained': credits_gained,
-            'bandwidth_recovered': bandwidth_recovery
-        }
+        'rewards': rewards
     })
 
+
 @netrunner_bp.route('/netrunner/<int:netrunner_id>/bandwidth/spend', methods=['POST'])
 def spend_bandwidth(netrunner_id):
     """Spend bandwidth (signal noise)"""
-    data = request.get_json()
-    
-    if not data or 'amount' not in data:
-        return jsonify({'error': 'Amount is required'}), 400
-    
-    netrunner = Netrunner.query.get_or_404(netrunner_id)
-    amount = float(data['amount'])
-    activity = data.get('activity', 'Unproductive activity')
-    
-    # Apply signal noise penalty (higher cost)
-    penalty_multiplier = data.get('penalty_multiplier', 1.5)
-    actual_cost = amount * penalty_multiplier
-    
-    netrunner.spend_bandwidth(actual_cost)
-    db.session.commit()
-    
-    # Add data stream entry
-    stream_entry = DataStreamEntry(
-        netrunner_id=netrunner_id,
-        message=f"SIGNAL_NOISE: {activity} -{actual_cost} BW",
-        entry_type='warning'
-    )
-    db.session.add(stream_entry)
-    
-    if netrunner.signal_debt:
-        debt_entry = DataStreamEntry(
-            netrunner_id=netrunner_id,
-            message="SIGNAL_DEBT: System performance degraded",
-            entry_type='error'
-        )
-        db.session.add(debt_entry)
-    
-    db.session.commit()
+    try:
+        netrunner = operations.spend_bandwidth(netrunner_id, request.get_json())
+    except OperationError as error:
+        return jsonify({'error': error.message}), error.status
     
     return jsonify(netrunner.to_dict())
 
+
 @netrunner_bp.route('/netrunner/<int:netrunner_id>/bandwidth/reset', methods=['POST'])
 def reset_daily_bandwidth(netrunner_id):
     """Reset daily bandwidth"""
-    netrunner = Netrunner.query.get_or_404(netrunner_id)
-    
-    # Convert leftover bandwidth to credits
-    leftover_bandwidth = max(0, netrunner.current_bandwidth)
-    bonus_credits = int(leftover_bandwidth * 100)  # 1 BW = 100 ¥
-    
-    if bonus_credits > 0:
-        netrunner.credits += bonus_credits
-        
-        bonus_entry = DataStreamEntry(
-            netrunner_id=netrunner_id,
-            message=f"DAILY_BONUS: Leftover bandwidth converted +{bonus_credits} ¥",
-            entry_type='success'
-        )
-        db.session.add(bonus_entry)
+    netrunner = entity_cache.get_or_404(Netrunner, netrunner_id)
     
-    netrunner.reset_daily_bandwidth()
-    
-    reset_entry = DataStreamEntry(
-        netrunner_id=netrunner_id,
-        message="SYSTEM_RESET: Daily bandwidth restored",
-        entry_type='info'
-    )
-    db.session.add(reset_entry)
-    
-    db.session.commit()
+    # Converts leftover bandwidth to credits and logs the reset
+    bonus_credits = netrunner.reset_daily_bandwidth()
     
     return jsonify({
         'netrunner': netrunner.to_dict(),
@@ -317,121 +196,143 @@ def reset_daily_bandwidth(netrunner_id):
 
 @netrunner_bp.route('/netrunner/<int:netrunner_id>/epic-hacks', methods=['GET'])
 def get_epic_hacks(netrunner_id):
-    """Get all epic hacks for a Netrunner"""
-    epic_hacks = EpicHack.query.filter_by(netrunner_id=netrunner_id).order_by(EpicHack.created_at.desc()).all()
-    return jsonify([epic_hack.to_dict() for epic_hack in epic_hacks])
+    """Get epic hacks for a Netrunner, newest first, one page at a time"""
+    try:
+        epic_hacks, next_cursor = keyset_page(
+            EPIC_HACK_FIELDS.query(EpicHack.netrunner_id == netrunner_id),
+            EpicHack,
+            request.args.get('cursor'),
+            request.args.get('limit', type=int)
+        )
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    
+    return page_response(EPIC_HACK_FIELDS, epic_hacks, next_cursor)
 
 @netrunner_bp.route('/netrunner/<int:netrunner_id>/epic-hacks', methods=['POST'])
 def create_epic_hack(netrunner_id):
     """Create a new epic hack"""
-    data = request.get_json()
+    try:
+        epic_hack = operations.create_epic_hack(netrunner_id, request.get_json())
+    except OperationError as error:
+        return jsonify({'error': error.message}), error.status
     
-    if not data or 'title' not in data:
-        return jsonify({'error': 'Title is required'}), 400
-    
-    epic_hack = EpicHack(
-        netrunner_id=netrunner_id,
-        title=data['title'],
-        description=data.get('description', ''),
-        target_date=datetime.fromisoformat(data['target_date']) if data.get('target_date') else None
-    )
-    
-    db.session.add(epic_hack)
-    db.session.commit()
+    db.session.flush()
+    return jsonify(epic_hack.to_dict()), 201
+
+
+@netrunner_bp.route('/epic-hacks/<int:epic_hack_id>/milestones', methods=['GET'])
+def get_milestones(epic_hack_id):
+    """Get milestones for an epic hack, newest first, one page at a time"""
+    try:
+        milestones, next_cursor = keyset_page(
+            MILESTONE_FIELDS.query(Milestone.epic_hack_id == epic_hack_id),
+            Milestone,
+            request.args.get('cursor'),
+            request.args.get('limit', type=int)
+        )
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
     
-    # Add data stream entry
-    stream_entry = DataStreamEntry(
-        netrunner_id=netrunner_id,
-        message=f"EPIC_HACK_INITIATED: {epic_hack.title}",
-        entry_type='info'
-    )
-    db.session.add(stream_entry)
-    db.session.commit()
+    return page_response(MILESTONE_FIELDS, milestones, next_cursor)
+
+@netrunner_bp.route('/epic-hacks/<int:epic_hack_id>/milestones', methods=['POST'])
+def create_milestone(epic_hack_id):
+    """Add a milestone to an epic hack"""
+    try:
+        milestone, epic_hack = operations.create_milestone(epic_hack_id, request.get_json())
+    except OperationError as error:
+        return jsonify({'error': error.message}), error.status
+    
+    db.session.flush()
+    return jsonify({
+        'milestone': milestone.to_dict(),
+        'epic_hack': epic_hack.to_dict()
+    }), 201
+
+
+@netrunner_bp.route('/milestones/<int:milestone_id>/complete', methods=['POST'])
+def complete_milestone(milestone_id):
+    """Complete a milestone, and the epic hack with it once every milestone is done"""
+    try:
+        milestone, epic_hack, netrunner, rewards = operations.complete_milestone(milestone_id)
+    except OperationError as error:
+        return jsonify({'error': error.message}), error.status
     
-    return jsonify(epic_hack.to_dict()), 201
+    return jsonify({
+        'milestone': milestone.to_dict(),
+        'epic_hack': epic_hack.to_dict(),
+        'netrunner': netrunner.to_dict(),
+        'rewards': rewards
+    })
+
 
 @netrunner_bp.route('/netrunner/<int:netrunner_id>/data-stream', methods=['GET'])
 def get_data_stream(netrunner_id):
-    """Get recent data stream entries"""
-    limit = request.args.get('limit', 20, type=int)
-    
-    entries = DataStreamEntry.query.filter_by(
-        netrunner_id=netrunner_id
-    ).order_by(DataStreamEntry.created_at.desc()).limit(limit).all()
+    """Get data stream entries, newest first, one page at a time"""
+    # Paging continues into the archive tier once the hot table runs out
+    try:
+        entries, next_cursor = keyset_page_tiers(
+            [
+                (DATA_STREAM_FIELDS.query(DataStreamEntry.netrunner_id == netrunner_id), DataStreamEntry),
+                (DATA_STREAM_ARCHIVE_FIELDS.query(DataStreamArchive.netrunner_id == netrunner_id), DataStreamArchive)
+            ],
+            request.args.get('cursor'),
+            request.args.get('limit', type=int)
+        )
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
     
-    return jsonify([entry.to_dict() for entry in entries])
+    return page_response(DATA_STREAM_FIELDS, entries, next_cursor)
+
+@netrunner_bp.route('/netrunner/<int:netrunner_id>/data-stream/events', methods=['GET'])
+def stream_data_stream(netrunner_id):
+    """Push new data stream entries as Server-Sent Events"""
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('last_event_id'))
+    try:
+        last_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({'error': 'Invalid Last-Event-ID'}), 400
+    
+    entity_cache.get_or_404(Netrunner, netrunner_id)
+    if last_id is not None:
+        # An id from before a shard move resumes from the entry's new id
+        last_id = shard_router.remapped('data_stream_entry', last_id) or last_id
+    else:
+        # A new client starts with what is written from now on
+        last_id = db.session.execute(
+            db.select(db.func.max(DataStreamEntry.id)).where(DataStreamEntry.netrunner_id == netrunner_id)
+        ).scalar() or 0
+    
+    # Entries are read from the database, so writes made by any worker process reach the client.
+    # Each open stream holds a worker thread; see gunicorn.conf.py.
+    return Response(
+        stream_events(current_app._get_current_object(), event_broker.subscribe(netrunner_id), last_id),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@netrunner_bp.route('/netrunner/<int:netrunner_id>/id-remap', methods=['GET'])
+def get_id_remap(netrunner_id):
+    """Contract, epic hack and milestone ids changed by shard moves, as {type: {old id: new id}}"""
+    entity_cache.get_or_404(Netrunner, netrunner_id)
+    remaps = {table_name: {} for table_name in ID_ROUTE_ARGS.values()}
+    rows = db.session.execute(
+        db.select(ShardIdRemap.table_name, ShardIdRemap.old_id, ShardIdRemap.new_id)
+        .where(ShardIdRemap.netrunner_id == netrunner_id, ShardIdRemap.table_name.in_(list(remaps)))
+    )
+    for table_name, old_id, new_id in rows:
+        remaps[table_name][str(old_id)] = new_id
+    return jsonify(remaps)
 
 @netrunner_bp.route('/netrunner/<int:netrunner_id>/skills', methods=['GET'])
 def get_skills(netrunner_id):
-    """Get skill points for a Netrunner"""
-    skill_points = SkillPoint.query.filter_by(netrunner_id=netrunner_id).all()
+    """Get skill tree totals for a Netrunner (?detail=true lists every point)"""
+    if request.args.get('detail', 'false').lower() != 'true':
+        rollups = SKILL_ROLLUP_FIELDS.query(SkillTreeRollup.netrunner_id == netrunner_id).all()
+        return json_body(SKILL_ROLLUP_FIELDS.encode_mapping(rollups, 'skill_tree'))
     
-    # Group by skill tree
-    skills_by_tree = {}
-    for sp in skill_points:
-        if sp.skill_tree not in skills_by_tree:
-            skills_by_tree[sp.skill_tree] = []
-        skills_by_tree[sp.skill_tree].append(sp.to_dict())
-    
-    return jsonify(skills_by_tree)
-
-# Demo data endpoint for testing
-@netrunner_bp.route('/demo/setup/<int:netrunner_id>', methods=['POST'])
-def setup_demo_data(netrunner_id):
-    """Setup demo data for testing"""
-    netrunner = Netrunner.query.get_or_404(netrunner_id)
-    
-    # Create some demo contracts
-    demo_contracts = [
-        {
-            'title': 'Complete React Tutorial',
-            'description': 'Learn React fundamentals and build a simple app',
-            'difficulty': 'Standard-Op',
-            'time_estimate': 2.0,
-            'contract_type': 'main'
-        },
-        {
-            'title': 'Morning Workout Routine',
-            'description': 'Complete daily exercise routine',
-            'difficulty': 'Low-Profile',
-            'time_estimate': 0.75,
-            'contract_type': 'maintenance'
-        },
-        {
-            'title': 'Database Architecture Review',
-            'description': 'Review and optimize database schema',
-            'difficulty': 'High-Stakes',
-            'time_estimate': 3.0,
-            'contract_type': 'main'
-        }
-    ]
-    
-    for contract_data in demo_contracts:
-        contract = Contract(
-            netrunner_id=netrunner_id,
-            **contract_data
-        )
-        contract.calculate_rewards()
-        db.session.add(contract)
+    skill_points = SKILL_POINT_FIELDS.query(SkillPoint.netrunner_id == netrunner_id).order_by(SkillPoint.id).all()
     
-    # Create some demo data stream entries
-    demo_entries = [
-        "CONTRACT_COMPLETED: Morning Coffee Ritual +50 EXP",
-        "BANDWIDTH_RECOVERED: Efficient coding session +0.5 BW",
-        "CREDITS_EARNED: Task completion bonus +200 ¥",
-        "SYSTEM_ALERT: New Epic Hack milestone available"
-    ]
-    
-    for i, message in enumerate(demo_entries):
-        entry = DataStreamEntry(
-            netrunner_id=netrunner_id,
-            message=message,
-            entry_type='success' if 'COMPLETED' in message else 'info',
-            created_at=datetime.utcnow() - timedelta(minutes=15*i)
-        )
-        db.session.add(entry)
-    
-    db.session.commit()
-    
-    return jsonify({'message': 'Demo data created successfully'})
-
+    # Group by skill tree
+    return json_body(SKILL_POINT_FIELDS.encode_groups(skill_points, 'skill_tree'))
@@ -0,0 +1,162 @@
+from flask import Blueprint, request, jsonify
+from src.models.user import db
+from src.models.netrunner import Netrunner, Contract, EpicHack, Milestone
+from src.services import operations
+from src.services.operations import OperationError
+from src.services.dashboard_cache import load_dashboard_snapshot
+from src.services.entity_cache import entity_cache
+from src.services.shards import shard_router
+
+sync_bp = Blueprint('sync', __name__)
+
+MAX_SYNC_OPS = 500
+
+
+class SyncBatch:
+    """Ops from one /sync request, all scoped to a single netrunner.
+
+    Create ops may carry a "ref"; later ops in the same batch can pass
+    that string wherever an id is expected, which is how actions queued
+    while offline point at contracts that did not exist yet.
+    """
+
+    def __init__(self, netrunner_id):
+        self.netrunner_id = netrunner_id
+        self.refs = {}
+
+    def owned(self, model, value, name):
+        """The netrunner's model row for an id or ref, else OperationError"""
+        if isinstance(value, str):
+            obj = self.refs.get(value)
+            if not isinstance(obj, model):
+                raise OperationError(f'Unknown ref {value!r}')
+            return obj
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise OperationError(f'{name} id is required')
+        obj = self._get(model, value)
+        if obj is None:
+            # Queued before a shard move gave the row a new id
+            new_id = shard_router.remapped(model.__tablename__, value)
+            obj = self._get(model, new_id) if new_id is not None else None
+        if obj is None or obj.netrunner_id != self.netrunner_id:
+            raise OperationError(f'{name} not found', 404)
+        return obj
+
+    def remember(self, op, obj):
+        if op.get('ref') is not None:
+            self.refs[op['ref']] = obj
+
+    # Each handler applies one op and returns a callable that builds its
+    # result once everything has been flushed and ids are assigned
+
+    def create_contract(self, op):
+        data = dict(op)
+        if data.get('epic_hack_id') is not None:
+            data['epic_hack_id'] = self._id(EpicHack, data['epic_hack_id'], 'Epic hack')
+        contract = operations.create_contract(self.netrunner_id, data)
+        self.remember(op, contract)
+        return lambda: {'contract': contract.to_dict()}
+
+    def start_contract(self, op):
+        contract = operations.start_contract(self._id(Contract, op.get('contract_id'), 'Contract'))
+        return lambda: {'contract': contract.to_dict()}
+
+    def complete_contract(self, op):
+        contract, _, rewards = operations.complete_contract(self._id(Contract, op.get('contract_id'), 'Contract'), op)
+        return lambda: {'contract': contract.to_dict(), 'rewards': rewards}
+
+    def spend_bandwidth(self, op):
+        operations.spend_bandwidth(self.netrunner_id, op)
+        return lambda: {}
+
+    def create_epic_hack(self, op):
+        epic_hack = operations.create_epic_hack(self.netrunner_id, op)
+        self.remember(op, epic_hack)
+        return lambda: {'epic_hack': epic_hack.to_dict()}
+
+    def create_milestone(self, op):
+        milestone, _ = operations.create_milestone(self._id(EpicHack, op.get('epic_hack_id'), 'Epic hack'), op)
+        self.remember(op, milestone)
+        return lambda: {'milestone': milestone.to_dict()}
+
+    def complete_milestone(self, op):
+        milestone, epic_hack, _, rewards = operations.complete_milestone(
+            self._id(Milestone, op.get('milestone_id'), 'Milestone')
+        )
+        return lambda: {'milestone': milestone.to_dict(), 'epic_hack': epic_hack.to_dict(), 'rewards': rewards}
+
+    def _get(self, model, object_id):
+        return entity_cache.get(model, object_id) if model in entity_cache.models else db.session.get(model, object_id)
+
+    def _id(self, model, value, name):
+        obj = self.owned(model, value, name)
+        if obj.id is None:
+            # Created earlier in this batch and not flushed yet
+            db.session.flush()
+        return obj.id
+
+
+SYNC_OPS = {
+    'create_contract', 'start_contract', 'complete_contract', 'spend_bandwidth',
+    'create_epic_hack', 'create_milestone', 'complete_milestone'
+}
+
+
+@sync_bp.route('/netrunner/<int:netrunner_id>/sync', methods=['POST'])
+def sync(netrunner_id):
+    """Apply an ordered batch of ops in one transaction.
+
+    Body: {"ops": [{"op": "create_contract", "ref": "local-1", "title": ...},
+    {"op": "complete_contract", "contract_id": "local-1"}, ...], "atomic": false}.
+    Each op takes the same fields as its single-action endpoint. A refused
+    op is reported and skipped; with "atomic": true it rolls back the whole
+    batch with a 409 instead. Returns per-op results and one dashboard
+    snapshot taken after the last op.
+    """
+    entity_cache.get_or_404(Netrunner, netrunner_id)
+    data = request.get_json(silent=True) or {}
+    ops = data.get('ops')
+    if not isinstance(ops, list) or not all(isinstance(op, dict) for op in ops):
+        return jsonify({'error': 'ops must be a list of objects'}), 400
+    if len(ops) > MAX_SYNC_OPS:
+        return jsonify({'error': f'At most {MAX_SYNC_OPS} ops per batch'}), 400
+    atomic = bool(data.get('atomic', False))
+
+    batch = SyncBatch(netrunner_id)
+    outcomes = []
+    failed = 0
+    for op in ops:
+        name = op.get('op')
+        try:
+            if name not in SYNC_OPS:
+                raise OperationError(f'Unknown op {name!r}')
+            outcomes.append(getattr(batch, name)(op))
+        except OperationError as error:
+            outcomes.append({'ok': False, 'status': error.status, 'error': error.message})
+            failed += 1
+        except (ValueError, TypeError) as error:
+            # Bad field values are caught before the op writes anything
+            outcomes.append({'ok': False, 'status': 400, 'error': f'Invalid op: {error}'})
+            failed += 1
+        if failed and atomic:
+            break
+
+    # Contracts, epic hacks and milestones created above go out in one flush
+    db.session.flush()
+    results = []
+    for index, (op, outcome) in enumerate(zip(ops, outcomes)):
+        result = outcome if isinstance(outcome, dict) else {'ok': True, **outcome()}
+        result.update(index=index, op=op.get('op'))
+        if op.get('ref') is not None:
+            result['ref'] = op['ref']
+        results.append(result)
+
+    if failed and atomic:
+        # The unit of work rolls back every op on an error status
+        return jsonify({'applied': 0, 'failed': failed, 'results': results}), 409
+    return jsonify({
+        'applied': len(ops) - failed,
+        'failed': failed,
+        'results': results,
+        'state': load_dashboard_snapshot(netrunner_id)
+    })
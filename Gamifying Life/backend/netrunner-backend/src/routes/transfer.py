@@ -0,0 +1,30 @@
+from flask import Blueprint, Response, request, jsonify
+from src.models.netrunner import Netrunner
+from src.services.operations import OperationError
+from src.services.entity_cache import entity_cache
+from src.services.shards import shard_router
+from src.services.transfer import export_ndjson, import_ndjson
+
+transfer_bp = Blueprint('transfer', __name__)
+
+
+@transfer_bp.route('/netrunner/<int:netrunner_id>/export', methods=['GET'])
+def export_netrunner(netrunner_id):
+    """Stream a netrunner's full history as NDJSON"""
+    entity_cache.get_or_404(Netrunner, netrunner_id)
+    # The generator reads on its own connection to the netrunner's shard, outside the request's session
+    return Response(
+        export_ndjson(shard_router.engine_for(netrunner_id), netrunner_id),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': f'attachment; filename=netrunner-{netrunner_id}.ndjson'}
+    )
+
+
+@transfer_bp.route('/netrunner/import', methods=['POST'])
+def import_netrunner():
+    """Load an NDJSON export as a new netrunner (?alias= overrides the exported alias)"""
+    try:
+        netrunner_id, counts = import_ndjson(request.stream, alias=request.args.get('alias'))
+    except OperationError as e:
+        return jsonify({'error': e.message}), e.status
+    return jsonify({'netrunner_id': netrunner_id, 'imported': counts}), 201
@@ -1,19 +1,22 @@
 from flask import Blueprint, request, jsonify
 from src.models.user import User, db
+from src.services.projection import Projection, stream_array
 
 user_bp = Blueprint("user", __name__)
 
+USER_FIELDS = Projection(User, ["id", "username", "email"])
+
 @user_bp.route("/users", methods=["GET"])
 def get_users():
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users])
+    users = USER_FIELDS.query().order_by(User.id).all()
+    return stream_array(USER_FIELDS, users)
 
 @user_bp.route("/users", methods=["POST"])
 def create_user():
     data = request.get_json()
     new_user = User(username=data["username"], email=data["email"])
     db.session.add(new_user)
-    db.session.commit()
+    db.session.flush()
     return jsonify(new_user.to_dict()), 201
 
 @user_bp.route("/users/<int:user_id>", methods=["GET"])
@@ -27,12 +30,10 @@ def update_user(user_id):
     data = request.get_json()
     user.username = data["username"]
     user.email = data["email"]
-    db.session.commit()
     return jsonify(user.to_dict())
 
 @user_bp.route("/users/<int:user_id>", methods=["DELETE"])
 def delete_user(user_id):
     user = User.query.get_or_404(user_id)
     db.session.delete(user)
-    db.session.commit()
     return "", 204
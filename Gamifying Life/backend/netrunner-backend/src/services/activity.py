@@ -0,0 +1,105 @@
+import atexit
+import os
+import threading
+from datetime import datetime
+
+from sqlalchemy import bindparam
+
+from src.models.netrunner import Netrunner
+from src.services.shards import shard_router
+
+
+class LastSeenBuffer:
+    """Coalesces Netrunner.last_active touches in memory.
+
+    touch() never does I/O. A background thread writes the latest
+    timestamp per netrunner every flush_interval seconds as one batched
+    UPDATE per shard, and a final flush runs at exit. Touches for a
+    netrunner that is being moved to another shard wait for a later flush.
+    """
+
+    def __init__(self, app=None, flush_interval=30.0):
+        self.app = None
+        self.flush_interval = flush_interval
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.flush_interval = app.config.setdefault('LAST_ACTIVE_FLUSH_INTERVAL', self.flush_interval)
+        app.extensions['last_seen'] = self
+        atexit.register(self.stop)
+
+    def touch(self, netrunner_id, when=None):
+        with self._lock:
+            self._pending[netrunner_id] = when or datetime.utcnow()
+        self._ensure_worker()
+
+    def flush(self):
+        """Write buffered touches; returns how many netrunners were updated."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        table = Netrunner.__table__
+        stmt = (
+            table.update()
+            .where(table.c.id == bindparam('netrunner_id'))
+            .values(last_active=bindparam('seen_at'))
+        )
+        params = [{'netrunner_id': nid, 'seen_at': seen_at} for nid, seen_at in pending.items()]
+
+        def update(connection, group):
+            connection.execute(stmt, group)
+            return len(group)
+
+        try:
+            with self.app.app_context():
+                results, deferred = shard_router.write_each(params, key=lambda param: param['netrunner_id'], write=update)
+        except Exception:
+            # Put every touch back (keeping any newer ones) so the next flush retries; rewriting one is harmless
+            self._restore(pending)
+            raise
+        # Netrunners being moved to another shard keep their touches for the next flush
+        self._restore({param['netrunner_id']: param['seen_at'] for param in deferred})
+        return sum(results)
+
+    def _restore(self, touches):
+        with self._lock:
+            for nid, seen_at in touches.items():
+                self._pending.setdefault(nid, seen_at)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout=self.flush_interval)
+        if self.app is not None:
+            self.flush()
+
+    def _ensure_worker(self):
+        # Threads don't survive fork, so each worker process starts its own
+        if self._pid == os.getpid() or self.flush_interval <= 0:
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='last-seen-flush', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                self.app.logger.exception('last_active flush failed')
+
+
+last_seen = LastSeenBuffer()
@@ -0,0 +1,160 @@
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event, literal, Integer, String, DateTime, Text
+
+from src.models.user import db
+from src.models.netrunner import Netrunner, Contract, SkillTreeRollup, DataStreamEntry
+
+
+class DashboardCache:
+    """Per-netrunner dashboard snapshots, bounded by LRU size and TTL.
+
+    Snapshots are dropped automatically when a committed session touched
+    the netrunner or any row that belongs to it. Writes made by other
+    processes (other workers, CLI jobs, shard moves) are caught by passing
+    the current Netrunner.version to get(), which discards older snapshots.
+    """
+
+    def __init__(self, app=None, max_size=1024, ttl=30.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_size = app.config.setdefault('DASHBOARD_CACHE_SIZE', self.max_size)
+        self.ttl = app.config.setdefault('DASHBOARD_CACHE_TTL', self.ttl)
+        app.extensions['dashboard_cache'] = self
+        if not event.contains(db.session, 'after_flush', _collect_dirty):
+            event.listen(db.session, 'after_flush', _collect_dirty)
+            event.listen(db.session, 'after_commit', _invalidate_dirty)
+            event.listen(db.session, 'after_rollback', _discard_dirty)
+
+    def get(self, netrunner_id, version=None):
+        with self._lock:
+            item = self._entries.get(netrunner_id)
+            if item is None:
+                return None
+            expires_at, snapshot = item
+            if expires_at < time.monotonic() or (version is not None and snapshot['netrunner']['version'] != version):
+                del self._entries[netrunner_id]
+                return None
+            self._entries.move_to_end(netrunner_id)
+            return snapshot
+
+    def set(self, netrunner_id, snapshot):
+        with self._lock:
+            self._entries[netrunner_id] = (time.monotonic() + self.ttl, snapshot)
+            self._entries.move_to_end(netrunner_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, netrunner_id):
+        with self._lock:
+            self._entries.pop(netrunner_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+dashboard_cache = DashboardCache()
+
+
+def _collect_dirty(session, flush_context):
+    dirty = session.info.setdefault('dashboard_dirty', set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Netrunner):
+            dirty.add(obj.id)
+        else:
+            netrunner_id = getattr(obj, 'netrunner_id', None)
+            if netrunner_id is not None:
+                dirty.add(netrunner_id)
+
+
+def _invalidate_dirty(session):
+    dirty = session.info.pop('dashboard_dirty', set())
+    dirty.update(session.info.pop('netrunners_updated', ()))
+    for netrunner_id in dirty:
+        dashboard_cache.invalidate(netrunner_id)
+
+
+def _discard_dirty(session):
+    session.info.pop('dashboard_dirty', None)
+    session.info.pop('netrunners_updated', None)
+
+
+def load_dashboard_snapshot(netrunner_id):
+    """Build the dashboard payload in two round trips, or None if not found."""
+    # Netrunner row joined with its five newest pending contracts
+    rows = db.session.execute(
+        db.select(Netrunner, Contract)
+        .outerjoin(Contract, db.and_(
+            Contract.netrunner_id == Netrunner.id,
+            Contract.status == 'pending'
+        ))
+        .where(Netrunner.id == netrunner_id)
+        .order_by(Contract.created_at.desc(), Contract.id.desc())
+        .limit(5)
+    ).all()
+    if not rows:
+        return None
+    netrunner = rows[0][0]
+
+    # Recent data stream and skill totals share a single UNION ALL
+    stream = (
+        db.select(
+            literal('stream', String).label('kind'),
+            DataStreamEntry.id.label('id'),
+            DataStreamEntry.message.label('label'),
+            DataStreamEntry.entry_type.label('entry_type'),
+            DataStreamEntry.created_at.label('created_at'),
+            literal(None, Integer).label('points')
+        )
+        .where(DataStreamEntry.netrunner_id == netrunner_id)
+        .order_by(DataStreamEntry.created_at.desc(), DataStreamEntry.id.desc())
+        .limit(10)
+        .subquery()
+    )
+    skills = (
+        db.select(
+            literal('skill', String),
+            literal(None, Integer),
+            db.cast(SkillTreeRollup.skill_tree, Text),
+            literal(None, String),
+            literal(None, DateTime),
+            SkillTreeRollup.total_points
+        )
+        .where(SkillTreeRollup.netrunner_id == netrunner_id)
+    )
+    data_stream = []
+    skill_summary = {}
+    for row in db.session.execute(db.union_all(db.select(stream), skills)):
+        if row.kind == 'skill':
+            skill_summary[row.label] = row.points
+        else:
+            data_stream.append(row)
+    data_stream.sort(key=lambda row: (row.created_at, row.id), reverse=True)
+
+    return {
+        'netrunner': {
+            **netrunner.to_dict(),
+            'exp_to_next': netrunner.get_exp_to_next_level()
+        },
+        'active_contracts': [contract.to_dict() for _, contract in rows if contract is not None],
+        'data_stream': [
+            {
+                'id': row.id,
+                'netrunner_id': netrunner_id,
+                'message': row.label,
+                'entry_type': row.entry_type,
+                'created_at': row.created_at.isoformat()
+            }
+            for row in data_stream
+        ],
+        'skill_summary': skill_summary
+    }
@@ -0,0 +1,181 @@
+import threading
+from collections import OrderedDict
+
+from flask import abort
+from sqlalchemy import event
+from sqlalchemy.orm import make_transient_to_detached
+
+from src.models.user import db
+from src.models.netrunner import Netrunner, Contract
+
+
+class EntityCache:
+    """Per-process LRU of Netrunner and Contract rows, checked against Netrunner.version.
+
+    Every transaction that writes a netrunner or any of its rows bumps
+    Netrunner.version, so an entry records the owning netrunner's version
+    when it was loaded. A lookup reads the current version (one
+    single-column primary key lookup, once per netrunner per transaction)
+    and uses the entry only if the two match. A commit from another worker
+    therefore never gets served stale. Hits are attached to the session as
+    if they had just been loaded, without a SELECT. A Contract miss loads
+    its Netrunner in the same query, so the usual contract-then-netrunner
+    lookup costs one round trip either way.
+
+    A local commit drops every entry of the netrunners it wrote. Rows read
+    after the transaction has written to their netrunner are never
+    stored, so uncommitted state can't leak into the cache.
+    """
+
+    models = (Netrunner, Contract)
+
+    def __init__(self, app=None, max_size=4096):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        # netrunner_id -> keys of its cached rows, for eviction on commit
+        self._by_netrunner = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_size = app.config.setdefault('ENTITY_CACHE_SIZE', self.max_size)
+        app.extensions['entity_cache'] = self
+        if not event.contains(db.session, 'after_flush', _collect_written):
+            event.listen(db.session, 'after_flush', _collect_written)
+            # Ahead of the listeners that clear the per-transaction write bookkeeping
+            event.listen(db.session, 'after_commit', _evict_written, insert=True)
+            event.listen(db.session, 'after_soft_rollback', _discard_written)
+
+    def get(self, model, object_id):
+        """The Netrunner or Contract with this id, attached to the session, or None."""
+        session = db.session()
+        existing = session.identity_map.get(db.inspect(model).identity_key_from_primary_key((object_id,)))
+        if existing is not None:
+            return existing
+        if self.max_size <= 0:
+            return session.get(model, object_id)
+
+        key = (model.__name__, object_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is not None:
+            netrunner_id, version, state = entry
+            if self.version(netrunner_id) == version:
+                with self._lock:
+                    self.hits += 1
+                return _attach(session, model, state)
+            self.evict_netrunner(netrunner_id)
+            with self._lock:
+                self.stale += 1
+
+        with self._lock:
+            self.misses += 1
+        return self._load(session, model, object_id)
+
+    def get_or_404(self, model, object_id):
+        obj = self.get(model, object_id)
+        if obj is None:
+            abort(404)
+        return obj
+
+    def version(self, netrunner_id):
+        """Current Netrunner.version, read at most once per transaction; None if missing."""
+        seen = db.session.info.setdefault('entity_versions', {})
+        if netrunner_id not in seen:
+            seen[netrunner_id] = db.session.execute(
+                db.select(Netrunner.version).where(Netrunner.id == netrunner_id)
+            ).scalar_one_or_none()
+        return seen[netrunner_id]
+
+    def evict_netrunner(self, netrunner_id):
+        with self._lock:
+            for key in self._by_netrunner.pop(netrunner_id, ()):
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_netrunner.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses, 'stale': self.stale}
+
+    def _load(self, session, model, object_id):
+        if model is Netrunner:
+            netrunner = session.get(Netrunner, object_id)
+            loaded = [netrunner]
+            obj = netrunner
+        else:
+            row = session.execute(
+                db.select(model, Netrunner)
+                .join(Netrunner, Netrunner.id == model.netrunner_id)
+                .where(model.id == object_id)
+            ).first()
+            if row is None:
+                return None
+            obj, netrunner = row
+            loaded = [obj, netrunner]
+        if netrunner is None:
+            return None
+
+        written = session.info.get('versions_bumped', set()) | session.info.get('netrunners_updated', set())
+        if netrunner.id not in written:
+            session.info.setdefault('entity_versions', {}).setdefault(netrunner.id, netrunner.version)
+            for instance in loaded:
+                self._store(instance, netrunner.id, netrunner.version)
+        return obj
+
+    def _store(self, obj, netrunner_id, version):
+        key = (type(obj).__name__, obj.id)
+        state = {attr.key: getattr(obj, attr.key) for attr in db.inspect(type(obj)).column_attrs}
+        with self._lock:
+            self._entries[key] = (netrunner_id, version, state)
+            self._entries.move_to_end(key)
+            self._by_netrunner.setdefault(netrunner_id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                old_key, (old_netrunner_id, _, _) = self._entries.popitem(last=False)
+                keys = self._by_netrunner.get(old_netrunner_id)
+                if keys is not None:
+                    keys.discard(old_key)
+                    if not keys:
+                        del self._by_netrunner[old_netrunner_id]
+
+
+entity_cache = EntityCache()
+
+
+def _attach(session, model, state):
+    obj = model(**state)
+    # Reset attribute history so the session treats it as a freshly loaded, clean row
+    make_transient_to_detached(obj)
+    session.add(obj)
+    return obj
+
+
+def _collect_written(session, flush_context):
+    written = session.info.setdefault('entity_cache_written', set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Netrunner):
+            written.add(obj.id)
+        elif isinstance(obj, Contract):
+            written.add(obj.netrunner_id)
+
+
+def _evict_written(session):
+    written = session.info.pop('entity_cache_written', set())
+    written |= session.info.get('versions_bumped', set()) | session.info.get('netrunners_updated', set())
+    for netrunner_id in written:
+        entity_cache.evict_netrunner(netrunner_id)
+    session.info.pop('entity_versions', None)
+
+
+def _discard_written(session, previous_transaction):
+    session.info.pop('entity_cache_written', None)
+    session.info.pop('entity_versions', None)
@@ -0,0 +1,29 @@
+from flask import Response, request
+
+from src.services.entity_cache import entity_cache
+
+
+def version_etag(resource, netrunner_id, version):
+    return f'{resource}-{netrunner_id}-v{version}'
+
+
+def current_version(netrunner_id):
+    """Netrunner.version via a single-column primary key lookup, or None."""
+    # Shared with the entity cache, so a request checks each version once
+    return entity_cache.version(netrunner_id)
+
+
+def is_fresh(etag):
+    return request.if_none_match.contains(etag)
+
+
+def not_modified(etag):
+    response = Response(status=304)
+    return with_etag(response, etag)
+
+
+def with_etag(response, etag):
+    response.set_etag(etag)
+    # Let clients keep the body but always revalidate
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
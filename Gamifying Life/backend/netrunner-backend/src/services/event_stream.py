@@ -0,0 +1,165 @@
+import json
+import threading
+import time
+from collections import defaultdict
+
+from sqlalchemy import event
+
+from src.models.user import db
+from src.models.netrunner import DataStreamEntry
+from src.services.pagination import MAX_PAGE_SIZE
+from src.services.shards import shard_router
+
+
+class Subscription:
+    def __init__(self, broker, netrunner_id):
+        self.broker = broker
+        self.netrunner_id = netrunner_id
+        self.closed = False
+        self._event = threading.Event()
+
+    def wait(self, timeout):
+        """Block until an entry is published in this process or timeout passes; True if one was."""
+        published = self._event.wait(timeout)
+        self._event.clear()
+        return published
+
+    def notify(self):
+        self._event.set()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class EventBroker:
+    """Feeds committed DataStreamEntry rows to SSE clients.
+
+    Each stream reads its entries from the database (see stream_events),
+    so it sees rows written by any worker process. It polls every
+    poll_interval seconds; entries committed in this process also wake
+    their netrunner's streams at once. Nothing is published until the
+    transaction commits, so clients never see rolled-back rows.
+    """
+
+    def __init__(self, app=None, poll_interval=1.0, heartbeat=15.0):
+        self.poll_interval = poll_interval
+        self.heartbeat = heartbeat
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.poll_interval = app.config.setdefault('DATA_STREAM_POLL_INTERVAL', self.poll_interval)
+        self.heartbeat = app.config.setdefault('DATA_STREAM_HEARTBEAT', self.heartbeat)
+        app.extensions['event_broker'] = self
+        if not event.contains(db.session, 'after_flush', _collect_entries):
+            event.listen(db.session, 'after_flush', _collect_entries)
+            event.listen(db.session, 'after_commit', _publish_entries)
+            event.listen(db.session, 'after_rollback', _discard_entries)
+
+    def subscribe(self, netrunner_id):
+        subscription = Subscription(self, netrunner_id)
+        with self._lock:
+            self._subscribers[netrunner_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscription.closed = True
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.netrunner_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.netrunner_id]
+
+    def publish(self, netrunner_id):
+        """Wake this process's streams for netrunner_id after new entries commit."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(netrunner_id, ()))
+        for subscription in subscribers:
+            subscription.notify()
+
+
+event_broker = EventBroker()
+
+
+def format_event(entry):
+    return f"id: {entry['id']}\nevent: data_stream\ndata: {json.dumps(entry)}\n\n"
+
+
+def stream_events(app, subscription, last_id):
+    """SSE body: every entry after last_id, then new ones until the client leaves.
+
+    Entries are read from the netrunner's shard in pages of MAX_PAGE_SIZE
+    until caught up, so a long backlog is replayed in full. If the
+    netrunner moves to another shard mid-stream, last_id is carried over
+    through the shard id remap.
+    """
+    broker = subscription.broker
+    netrunner_id = subscription.netrunner_id
+    try:
+        yield 'retry: 3000\n\n'
+        shard = None
+        quiet_since = time.monotonic()
+        while not subscription.closed:
+            with app.app_context():
+                placement = shard_router.lookup(netrunner_id)
+                if placement is None:
+                    return
+                if shard is not None and placement[0] != shard:
+                    last_id = shard_router.remapped('data_stream_entry', last_id) or last_id
+                shard, moving = placement
+                engine = shard_router.engine(shard)
+            # A netrunner being moved is read again once it has landed
+            while not moving:
+                entries = _entries_after(engine, netrunner_id, last_id)
+                for entry in entries:
+                    yield format_event(entry)
+                    last_id = entry['id']
+                    quiet_since = time.monotonic()
+                if len(entries) < MAX_PAGE_SIZE:
+                    break
+            if time.monotonic() - quiet_since >= broker.heartbeat:
+                yield ': keepalive\n\n'
+                quiet_since = time.monotonic()
+            subscription.wait(broker.poll_interval)
+    finally:
+        subscription.close()
+
+
+def _entries_after(engine, netrunner_id, last_id):
+    table = DataStreamEntry.__table__
+    with engine.connect() as connection:
+        rows = connection.execute(
+            db.select(table.c.id, table.c.message, table.c.entry_type, table.c.created_at)
+            .where(table.c.netrunner_id == netrunner_id, table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(MAX_PAGE_SIZE)
+        ).all()
+    return [
+        {
+            'id': row.id,
+            'netrunner_id': netrunner_id,
+            'message': row.message,
+            'entry_type': row.entry_type,
+            'created_at': row.created_at.isoformat()
+        }
+        for row in rows
+    ]
+
+
+def _collect_entries(session, flush_context):
+    pending = session.info.setdefault('data_stream_published', set())
+    for obj in session.new:
+        if isinstance(obj, DataStreamEntry):
+            pending.add(obj.netrunner_id)
+
+
+def _publish_entries(session):
+    for netrunner_id in session.info.pop('data_stream_published', ()):
+        event_broker.publish(netrunner_id)
+
+
+def _discard_entries(session):
+    session.info.pop('data_stream_published', None)
@@ -0,0 +1,134 @@
+import heapq
+from itertools import islice
+
+from sqlalchemy import tuple_
+
+from src.models.user import db
+from src.models.netrunner import Netrunner, LevelCount, ExpCount
+from src.services.pagination import encode_token, decode_token, page_size, InvalidCursor
+from src.services.shards import shard_router
+
+# Leaderboard order: level, then exp within the level, newest id first on exact ties.
+# All three walk the (level, exp, id) index.
+RANK_KEY = (Netrunner.level, Netrunner.exp, Netrunner.id)
+RANK_ORDER = (Netrunner.level.desc(), Netrunner.exp.desc(), Netrunner.id.desc())
+
+# Every query below runs on each shard in parallel (shard_router.fan_out);
+# counts are added up and rows merged on the same key the index sorts by
+
+
+def _row_key(row):
+    return row.level, row.exp, row.id
+
+
+def _merged(row_lists, limit, descending=True):
+    return list(islice(heapq.merge(*row_lists, key=_row_key, reverse=descending), limit))
+
+
+def rank_of(level, exp):
+    """Competition rank (ties share a rank) for a (level, exp) pair.
+
+    Levels above come from the LevelCount histograms and same-level peers
+    with more EXP from the ExpCount ones, so no netrunner rows are read.
+    The cost grows with the number of distinct EXP values above exp at
+    that level (bounded by the level curve), not with the number of
+    netrunners.
+    """
+    def ahead(executor):
+        above_level = executor.execute(
+            db.select(db.func.coalesce(db.func.sum(LevelCount.count), 0)).where(LevelCount.level > level)
+        ).scalar()
+        ahead_in_level = executor.execute(
+            db.select(db.func.coalesce(db.func.sum(ExpCount.count), 0)).where(ExpCount.level == level, ExpCount.exp > exp)
+        ).scalar()
+        return above_level + ahead_in_level
+    return sum(shard_router.fan_out(ahead)) + 1
+
+
+def total_ranked():
+    query = db.select(db.func.coalesce(db.func.sum(LevelCount.count), 0))
+    return sum(shard_router.fan_out(lambda executor: executor.execute(query).scalar()))
+
+
+def _entries(rows, offset, first_rank):
+    """Attach ranks to a contiguous run of leaderboard rows.
+
+    offset is how many rows precede rows[0] in leaderboard order and
+    first_rank is rows[0]'s rank; the rest follow without more queries.
+    """
+    entries = []
+    for position, row in enumerate(rows):
+        if not entries:
+            rank = first_rank
+        elif (row.level, row.exp) == (entries[-1]['level'], entries[-1]['exp']):
+            rank = entries[-1]['rank']
+        else:
+            rank = offset + position + 1
+        entries.append({'rank': rank, 'id': row.id, 'alias': row.alias, 'level': row.level, 'exp': row.exp})
+    return entries
+
+
+def _columns():
+    return db.select(Netrunner.id, Netrunner.alias, Netrunner.level, Netrunner.exp)
+
+
+def _ranked(rows):
+    """Entries for a contiguous run of leaderboard rows, ranked from the histograms.
+
+    rows[0]'s rank comes from rank_of; the netrunners tied with it but
+    ahead on id are counted so the ranks after the tie line up.
+    """
+    first = rows[0]
+    first_rank = rank_of(first.level, first.exp)
+    tied_query = (
+        db.select(db.func.count()).select_from(Netrunner)
+        .where(Netrunner.level == first.level, Netrunner.exp == first.exp, Netrunner.id > first.id)
+    )
+    tied_before = sum(shard_router.fan_out(lambda executor: executor.execute(tied_query).scalar()))
+    return _entries(rows, first_rank - 1 + tied_before, first_rank)
+
+def top_page(cursor=None, limit=None):
+    """One page of the global leaderboard as (entries, next_cursor)."""
+    limit = page_size(limit)
+    query = _columns().order_by(*RANK_ORDER).limit(limit + 1)
+    # The cursor only carries the last row's key; ranks are always worked out here
+    if cursor:
+        key = decode_token(cursor)
+        if len(key) != 3 or not all(isinstance(value, int) for value in key):
+            raise InvalidCursor(cursor)
+        query = query.where(tuple_(*RANK_KEY) < tuple_(*key))
+    rows = _merged(shard_router.fan_out(lambda executor: executor.execute(query).all()), limit + 1)
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if not rows:
+        return [], None
+    entries = _ranked(rows)
+
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_token(list(_row_key(rows[-1])))
+    return entries, next_cursor
+
+
+def around(netrunner, window):
+    """Leaderboard rows around a netrunner: up to window above and below."""
+    key = tuple_(*RANK_KEY)
+    mine = tuple_(netrunner.level, netrunner.exp, netrunner.id)
+    above_query = (
+        _columns().where(key > mine)
+        .order_by(Netrunner.level.asc(), Netrunner.exp.asc(), Netrunner.id.asc())
+        .limit(window)
+    )
+    below_query = _columns().where(key <= mine).order_by(*RANK_ORDER).limit(window + 1)
+
+    def neighbours(executor):
+        return executor.execute(above_query).all(), executor.execute(below_query).all()
+    above_lists, below_lists = zip(*shard_router.fan_out(neighbours))
+    above = _merged(above_lists, window, descending=False)
+    below = _merged(below_lists, window + 1)
+    rows = list(reversed(above)) + below
+    if not rows:
+        return []
+    return _ranked(rows)
+
@@ -0,0 +1,71 @@
+import os
+from bisect import bisect_right
+from itertools import accumulate
+
+
+class LevelCurve:
+    """EXP needed per level, precomputed as a cumulative threshold table.
+
+    By default level L costs base + step * L EXP to clear (1000 at level 1).
+    LEVEL_CURVE_BASE / LEVEL_CURVE_STEP / LEVEL_CURVE_MAX_LEVEL change the
+    formula, and LEVEL_CURVE_REQUIREMENTS (a comma separated list, one
+    cost per level) replaces it outright. Each can come from app config or
+    the environment. Netrunners stop levelling at the last level in the table.
+    """
+
+    def __init__(self, app=None, base=800, step=200, max_level=1000):
+        self.configure(base=base, step=step, max_level=max_level)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        for key, current in (('BASE', self.base), ('STEP', self.step), ('MAX_LEVEL', self.max_level)):
+            app.config.setdefault(f'LEVEL_CURVE_{key}', int(os.environ.get(f'LEVEL_CURVE_{key}', current)))
+        requirements = app.config.setdefault('LEVEL_CURVE_REQUIREMENTS', os.environ.get('LEVEL_CURVE_REQUIREMENTS'))
+        if isinstance(requirements, str):
+            requirements = [int(cost) for cost in requirements.split(',') if cost.strip()]
+        self.configure(
+            base=app.config['LEVEL_CURVE_BASE'],
+            step=app.config['LEVEL_CURVE_STEP'],
+            max_level=app.config['LEVEL_CURVE_MAX_LEVEL'],
+            requirements=requirements
+        )
+        app.extensions['level_curve'] = self
+
+    def configure(self, base=800, step=200, max_level=1000, requirements=None):
+        if requirements is None:
+            requirements = [base + step * level for level in range(1, max_level)]
+        if any(cost <= 0 for cost in requirements):
+            raise ValueError('Level requirements must be positive')
+        self.base, self.step = base, step
+        self.max_level = len(requirements) + 1
+        self.requirements = list(requirements)
+        # thresholds[L - 1] is the total EXP a netrunner has earned on reaching level L
+        self.thresholds = [0] + list(accumulate(self.requirements))
+
+    def exp_to_next(self, level):
+        """EXP needed to clear level; past the cap the last cost is reported."""
+        return self.requirements[min(max(level, 1), self.max_level - 1) - 1]
+
+    def resolve(self, level, exp):
+        """Return (level, exp) after spending exp on level-ups, in O(log L).
+
+        Never levels down, and leaves anything already past the cap alone.
+        """
+        if level < 1 or level >= self.max_level:
+            return level, exp
+        total = self.thresholds[level - 1] + exp
+        reached = bisect_right(self.thresholds, total)
+        if reached <= level:
+            return level, exp
+        return reached, total - self.thresholds[reached - 1]
+
+
+level_curve = LevelCurve()
+
+
+def level_up_message(previous_level, level):
+    """One data stream message for every level crossed in a single grant."""
+    if level == previous_level + 1:
+        return f'LEVEL UP: Reached Level {level}!'
+    return f'LEVEL UP: Reached Level {level}! (+{level - previous_level} levels)'
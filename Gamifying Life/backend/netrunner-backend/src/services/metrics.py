@@ -0,0 +1,198 @@
+import cProfile
+import io
+import pstats
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+
+from src.models.user import db
+from src.services.unit_of_work import unit_of_work
+from src.services.side_effects import side_effects
+from src.services.entity_cache import entity_cache
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Prometheus-style cumulative histogram keyed by a tuple of label values."""
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+
+    def observe(self, labels, value):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for labels, (counts, total) in sorted(self._series.items()):
+            label_text = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels))
+            prefix = label_text + ',' if label_text else ''
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {total}')
+            lines.append(f'{self.name}_count{{{label_text}}} {cumulative}')
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _counter(name, help_text, value):
+    return [f'# HELP {name} {help_text}', f'# TYPE {name} counter', f'{name} {value}']
+
+
+def _gauge(name, help_text, value):
+    return [f'# HELP {name} {help_text}', f'# TYPE {name} gauge', f'{name} {value}']
+
+
+class RequestMetrics:
+    """Per-request wall time, SQL count/time and commits, exported as Prometheus text.
+
+    Register it before unit_of_work: after_request hooks run in reverse, so
+    the end-of-request commit is included in what gets measured. Queries
+    slower than SLOW_QUERY_MS are logged. When REQUEST_PROFILING is on, a
+    request carrying the X-Profile header gets a cProfile dump as its body.
+    """
+
+    def __init__(self, app=None, slow_query_ms=250):
+        self.app = None
+        self.slow_query_ms = slow_query_ms
+        self.profiling = False
+        self.slow_queries = 0
+        self._lock = threading.Lock()
+        labels = ('method', 'endpoint')
+        self.request_seconds = Histogram(
+            'netrunner_http_request_duration_seconds', 'Wall time per request.',
+            labels + ('status',), LATENCY_BUCKETS
+        )
+        self.sql_queries = Histogram(
+            'netrunner_http_request_sql_queries', 'SQL statements executed per request.',
+            labels, QUERY_COUNT_BUCKETS
+        )
+        self.sql_seconds = Histogram(
+            'netrunner_http_request_sql_duration_seconds', 'Time spent in SQL per request.',
+            labels, LATENCY_BUCKETS
+        )
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.slow_query_ms = app.config.setdefault('SLOW_QUERY_MS', self.slow_query_ms)
+        self.profiling = app.config.setdefault('REQUEST_PROFILING', self.profiling)
+        app.extensions['request_metrics'] = self
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        with app.app_context():
+            engines = list(db.engines.values())
+        for engine in engines:
+            if not event.contains(engine, 'after_cursor_execute', _after_cursor_execute):
+                event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    def _start(self):
+        g.request_started = time.perf_counter()
+        if self.profiling and request.headers.get('X-Profile'):
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler is already running in this process
+                return
+            g.profiler = profiler
+
+    def _finish(self, response):
+        started = g.pop('request_started', None)
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        queries = g.get('sql_queries', 0)
+        sql_time = g.get('sql_seconds', 0.0)
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        labels = (request.method, endpoint)
+        with self._lock:
+            self.request_seconds.observe(labels + (str(response.status_code),), elapsed)
+            self.sql_queries.observe(labels, queries)
+            self.sql_seconds.observe(labels, sql_time)
+
+        response.headers['Server-Timing'] = (
+            f'app;dur={elapsed * 1000:.2f}, db;dur={sql_time * 1000:.2f};desc="{queries} queries"'
+        )
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.disable()
+            response = self._profile_response(profiler, response, elapsed, queries, sql_time)
+        return response
+
+    def _profile_response(self, profiler, response, elapsed, queries, sql_time):
+        out = io.StringIO()
+        out.write(
+            f"{request.method} {request.full_path.rstrip('?')} -> {response.status_code}\n"
+            f'wall {elapsed * 1000:.2f} ms, {queries} SQL statements in {sql_time * 1000:.2f} ms, '
+            f"{g.get('commit_count', 0)} commit(s)\n\n"
+        )
+        pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(40)
+        profiled = Response(out.getvalue(), status=response.status_code, mimetype='text/plain')
+        profiled.headers['Server-Timing'] = response.headers['Server-Timing']
+        return profiled
+
+    def record_query(self, statement, elapsed):
+        if has_request_context():
+            g.sql_queries = g.get('sql_queries', 0) + 1
+            g.sql_seconds = g.get('sql_seconds', 0.0) + elapsed
+        if elapsed * 1000 >= self.slow_query_ms:
+            with self._lock:
+                self.slow_queries += 1
+            self.app.logger.warning('Slow query (%.1f ms): %s', elapsed * 1000, statement)
+
+    def render(self):
+        with self._lock:
+            lines = self.request_seconds.render() + self.sql_queries.render() + self.sql_seconds.render()
+            slow_queries = self.slow_queries
+        stats = unit_of_work.stats()
+        lines += _counter('netrunner_sql_slow_queries_total', 'Queries slower than SLOW_QUERY_MS.', slow_queries)
+        lines += _counter('netrunner_unit_of_work_requests_total', 'Requests finished by the unit of work.', stats['requests'])
+        lines += _counter('netrunner_db_commits_total', 'Commits made while serving requests.', stats['commits'])
+        cached = entity_cache.stats()
+        lines += _gauge('netrunner_entity_cache_size', 'Netrunner and Contract rows held by the entity cache.', cached['size'])
+        lines += _counter('netrunner_entity_cache_hits_total', 'Entity lookups served from the cache.', cached['hits'])
+        lines += _counter('netrunner_entity_cache_misses_total', 'Entity lookups that went to the database.', cached['misses'])
+        lines += _counter('netrunner_entity_cache_stale_total', 'Cached rows dropped because the version moved on.', cached['stale'])
+        queued = side_effects.stats()
+        lines += _gauge('netrunner_side_effect_queue_depth', 'Batches waiting for a side effect worker.', queued['depth'])
+        lines += _gauge('netrunner_side_effect_deferred', 'Entries held back while their netrunners move shards.', queued['deferred'])
+        lines += _gauge('netrunner_side_effect_lag_seconds', 'Commit-to-write delay of the last batch.', queued['last_lag_seconds'])
+        lines += _gauge('netrunner_side_effect_max_lag_seconds', 'Largest commit-to-write delay seen.', queued['max_lag_seconds'])
+        lines += _counter('netrunner_side_effect_entries_total', 'Data stream entries written by the queue.', queued['written'])
+        lines += _counter('netrunner_side_effect_batches_total', 'Grouped inserts made by the queue.', queued['batches'])
+        lines += _counter('netrunner_side_effect_inline_writes_total', 'Writes done by the request because the queue was full.', queued['inline_writes'])
+        lines += _counter('netrunner_side_effect_failures_total', 'Batches that failed to write.', queued['failures'])
+        return '\n'.join(lines) + '\n'
+
+
+request_metrics = RequestMetrics()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_query_started', None)
+    if started is not None and request_metrics.app is not None:
+        request_metrics.record_query(statement, time.perf_counter() - started)
@@ -0,0 +1,258 @@
+from datetime import datetime
+
+from src.models.user import db
+from src.models.netrunner import (
+    Netrunner, Contract, EpicHack, Milestone, DataStreamEntry, DailyProductivity, DailyEstimateAccuracy,
+    BASE_EXP_PER_HOUR, BASE_CREDITS_PER_HOUR
+)
+from src.services.side_effects import side_effects
+from src.services.entity_cache import entity_cache
+
+
+class OperationError(Exception):
+    """A mutation that was refused; nothing was written for it."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def _get(model, object_id, name):
+    obj = entity_cache.get(model, object_id) if model in entity_cache.models else db.session.get(model, object_id)
+    if obj is None:
+        raise OperationError(f'{name} not found', 404)
+    return obj
+
+
+def create_contract(netrunner_id, data):
+    """Add a contract. It is not flushed, so a run of creates becomes one INSERT."""
+    if not data or 'title' not in data:
+        raise OperationError('Title is required')
+
+    contract = Contract(
+        netrunner_id=netrunner_id,
+        title=data['title'],
+        description=data.get('description', ''),
+        difficulty=data.get('difficulty', 'Standard-Op'),
+        time_estimate=data.get('time_estimate', 1.0),
+        contract_type=data.get('contract_type', 'main'),
+        epic_hack_id=data.get('epic_hack_id')
+    )
+
+    # Calculate rewards based on difficulty and time
+    contract.calculate_rewards()
+
+    db.session.add(contract)
+
+    # Data stream log line is written after commit by the side effect queue
+    side_effects.log(netrunner_id, f"NEW_CONTRACT: {contract.title} [{contract.difficulty}]", 'info')
+    return contract
+
+
+def start_contract(contract_id):
+    """Start a contract (initiate hack)"""
+    contract = _get(Contract, contract_id, 'Contract')
+
+    if contract.status != 'pending':
+        raise OperationError('Contract is not in pending status')
+
+    contract.status = 'active'
+
+    side_effects.log(contract.netrunner_id, f"HACK_INITIATED: {contract.title}", 'info')
+    return contract
+
+
+def complete_contract(contract_id, data):
+    """Complete a contract and pay out; returns (contract, netrunner, rewards)"""
+    contract = _get(Contract, contract_id, 'Contract')
+    netrunner = _get(Netrunner, contract.netrunner_id, 'Netrunner')
+
+    if contract.status not in ['active', 'pending']:
+        raise OperationError('Contract cannot be completed')
+
+    # Status transition is conditional, so concurrent completions pay out once
+    time_spent = float(data.get('time_spent', contract.time_estimate or 1.0))
+    if Contract.mark_completed(contract.id, time_spent) is None:
+        raise OperationError('Contract cannot be completed')
+
+    # Calculate efficiency bonus/penalty
+    efficiency_multiplier = 1.0
+    if contract.time_estimate and contract.time_spent:
+        if contract.time_spent <= contract.time_estimate:
+            # Efficiency bonus
+            efficiency_multiplier = 1.2
+            bandwidth_recovery = 0.25
+        else:
+            # Time penalty
+            efficiency_multiplier = 0.8
+            bandwidth_recovery = 0
+    else:
+        bandwidth_recovery = 0.1
+
+    # Apply signal debt penalty if active
+    if netrunner.signal_debt:
+        efficiency_multiplier *= 0.75
+
+    # Award rewards
+    exp_gained = int(contract.exp_reward * efficiency_multiplier)
+    credits_gained = int(contract.credit_reward * efficiency_multiplier)
+
+    # Data stream entries (written after commit by the side effect queue)
+    side_effects.log(
+        netrunner.id, f"CONTRACT_COMPLETED: {contract.title} +{exp_gained} EXP +{credits_gained} ¥", 'success'
+    )
+
+    if bandwidth_recovery > 0:
+        side_effects.log(netrunner.id, f"BANDWIDTH_RECOVERED: Efficient execution +{bandwidth_recovery} BW", 'success')
+
+    # Handle hack debrief if provided
+    debrief = data.get('debrief')
+    bonus_exp = 0
+    if debrief:
+        # Award bonus for reflection
+        bonus_exp = 25
+
+        side_effects.log(netrunner.id, f"HACK_DEBRIEF: Reflection bonus +{bonus_exp} EXP", 'success')
+
+    # Award rewards in one atomic UPDATE; level-ups are settled from the returned row
+    netrunner = Netrunner.apply_delta(
+        netrunner.id,
+        exp=exp_gained + bonus_exp,
+        credits=credits_gained,
+        bandwidth=bandwidth_recovery
+    )
+    DailyProductivity.record(
+        netrunner.id,
+        exp_earned=exp_gained + bonus_exp,
+        credits_earned=credits_gained,
+        contracts_completed=1,
+        bandwidth_recovered=bandwidth_recovery
+    )
+    DailyEstimateAccuracy.record(contract)
+
+    return contract, netrunner, {
+        'exp_gained': exp_gained,
+        'credits_gained': credits_gained,
+        'bandwidth_recovered': bandwidth_recovery
+    }
+
+
+def spend_bandwidth(netrunner_id, data):
+    """Spend bandwidth (signal noise); returns the netrunner"""
+    if not data or 'amount' not in data:
+        raise OperationError('Amount is required')
+
+    amount = float(data['amount'])
+    activity = data.get('activity', 'Unproductive activity')
+
+    # Apply signal noise penalty (higher cost)
+    penalty_multiplier = float(data.get('penalty_multiplier', 1.5))
+    actual_cost = amount * penalty_multiplier
+
+    netrunner = Netrunner.apply_delta(netrunner_id, bandwidth=-actual_cost)
+    if netrunner is None:
+        raise OperationError('Netrunner not found', 404)
+    DailyProductivity.record(netrunner_id, bandwidth_spent=actual_cost)
+
+    # Add data stream entry
+    db.session.add(DataStreamEntry(
+        netrunner_id=netrunner_id,
+        message=f"SIGNAL_NOISE: {activity} -{actual_cost} BW",
+        entry_type='warning'
+    ))
+
+    if netrunner.signal_debt:
+        db.session.add(DataStreamEntry(
+            netrunner_id=netrunner_id,
+            message="SIGNAL_DEBT: System performance degraded",
+            entry_type='error'
+        ))
+
+    return netrunner
+
+
+def create_epic_hack(netrunner_id, data):
+    """Add an epic hack (not flushed, like create_contract)"""
+    if not data or 'title' not in data:
+        raise OperationError('Title is required')
+
+    epic_hack = EpicHack(
+        netrunner_id=netrunner_id,
+        title=data['title'],
+        description=data.get('description', ''),
+        target_date=datetime.fromisoformat(data['target_date']) if data.get('target_date') else None
+    )
+
+    db.session.add(epic_hack)
+
+    side_effects.log(netrunner_id, f"EPIC_HACK_INITIATED: {epic_hack.title}", 'info')
+    return epic_hack
+
+
+def create_milestone(epic_hack_id, data):
+    """Add a milestone to an epic hack; returns (milestone, epic_hack)"""
+    if not data or 'title' not in data:
+        raise OperationError('Title is required')
+
+    exp_reward = int(data.get('exp_reward', BASE_EXP_PER_HOUR))
+    credit_reward = int(data.get('credit_reward', BASE_CREDITS_PER_HOUR))
+    _get(EpicHack, epic_hack_id, 'Epic hack')
+
+    # Counters move in the same transaction as the insert
+    epic_hack = EpicHack.count_new_milestone(epic_hack_id)
+    if epic_hack is None:
+        raise OperationError('Epic hack is already completed')
+
+    milestone = Milestone(
+        epic_hack_id=epic_hack_id,
+        netrunner_id=epic_hack.netrunner_id,
+        title=data['title'],
+        exp_reward=exp_reward,
+        credit_reward=credit_reward
+    )
+    db.session.add(milestone)
+    return milestone, epic_hack
+
+
+def complete_milestone(milestone_id):
+    """Complete a milestone, and the epic hack with it once every milestone is done.
+
+    Returns (milestone, epic_hack, netrunner, rewards).
+    """
+    milestone = _get(Milestone, milestone_id, 'Milestone')
+
+    # Status transition is conditional, so concurrent completions pay out once
+    if Milestone.mark_completed(milestone.id) is None:
+        raise OperationError('Milestone cannot be completed')
+
+    epic_hack = EpicHack.count_completed_milestone(milestone.epic_hack_id)
+    exp_gained = milestone.exp_reward
+    credits_gained = milestone.credit_reward
+
+    db.session.add(DataStreamEntry(
+        netrunner_id=milestone.netrunner_id,
+        message=f"MILESTONE_COMPLETED: {milestone.title} +{exp_gained} EXP +{credits_gained} ¥",
+        entry_type='success'
+    ))
+
+    # The UPDATE that made completed reach total is the only one that sees them equal
+    epic_completed = epic_hack.completed_milestones == epic_hack.total_milestones
+    if epic_completed:
+        bonus_exp, bonus_credits = epic_hack.completion_bonus()
+        exp_gained += bonus_exp
+        credits_gained += bonus_credits
+        db.session.add(DataStreamEntry(
+            netrunner_id=milestone.netrunner_id,
+            message=f"EPIC_HACK_COMPLETED: {epic_hack.title} +{bonus_exp} EXP +{bonus_credits} ¥",
+            entry_type='success'
+        ))
+
+    netrunner = Netrunner.apply_delta(milestone.netrunner_id, exp=exp_gained, credits=credits_gained)
+    DailyProductivity.record(milestone.netrunner_id, exp_earned=exp_gained, credits_earned=credits_gained)
+
+    return milestone, epic_hack, netrunner, {
+        'exp_gained': exp_gained,
+        'credits_gained': credits_gained,
+        'epic_hack_completed': epic_completed
+    }
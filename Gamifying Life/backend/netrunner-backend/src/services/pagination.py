@@ -0,0 +1,95 @@
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_token(key):
+    raw = json.dumps(key, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_token(token):
+    """Inverse of encode_token; raises InvalidCursor for anything malformed."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded))
+    except ValueError:
+        raise InvalidCursor(token)
+    if not isinstance(key, list):
+        raise InvalidCursor(token)
+    return key
+
+
+def encode_cursor(created_at, row_id, tier=0):
+    key = [created_at.isoformat(), row_id]
+    if tier:
+        key.append(tier)
+    return encode_token(key)
+
+
+def decode_cursor(token):
+    """Return (created_at, id, tier); tier is 0 for single-table cursors."""
+    try:
+        created_at, row_id, *rest = decode_token(token)
+        tier = int(rest[0]) if rest else 0
+        if len(rest) > 1 or tier < 0:
+            raise ValueError(token)
+        return datetime.fromisoformat(created_at), int(row_id), tier
+    except (ValueError, TypeError):
+        raise InvalidCursor(token)
+
+
+def page_size(requested):
+    if requested is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(requested, MAX_PAGE_SIZE))
+
+
+def keyset_page(query, model, cursor=None, limit=None):
+    """Return (rows, next_cursor) for query ordered newest first.
+
+    Rows are keyed on (created_at, id), which the (netrunner_id,
+    created_at, id) indexes cover, so every page is a single index seek.
+    """
+    return keyset_page_tiers([(query, model)], cursor, limit)
+
+
+def keyset_page_tiers(tiers, cursor=None, limit=None):
+    """keyset_page over one sequence split across tables, newest tier first.
+
+    The cursor remembers which tier it stopped in, so once a client pages
+    past the hot table the newer tiers are not queried again.
+    """
+    limit = page_size(limit)
+    created_at, row_id, start = decode_cursor(cursor) if cursor else (None, None, 0)
+    if start >= len(tiers):
+        raise InvalidCursor(cursor)
+
+    rows = []
+    for tier in range(start, len(tiers)):
+        query, model = tiers[tier]
+        if created_at is not None:
+            query = query.filter(tuple_(model.created_at, model.id) < tuple_(created_at, row_id))
+        wanted = limit - len(rows)
+        page = query.order_by(model.created_at.desc(), model.id.desc()).limit(wanted + 1).all()
+        if len(page) > wanted:
+            rows += page[:wanted]
+            return rows, encode_cursor(rows[-1].created_at, rows[-1].id, tier)
+        rows += page
+        if len(rows) == limit:
+            # Page filled exactly at the end of this tier; older tiers may still have rows
+            if tier + 1 < len(tiers):
+                return rows, encode_cursor(rows[-1].created_at, rows[-1].id, tier + 1)
+            break
+        if rows:
+            created_at, row_id = rows[-1].created_at, rows[-1].id
+    return rows, None
@@ -0,0 +1,104 @@
+from json.encoder import encode_basestring_ascii
+
+from flask import Response
+from sqlalchemy import Boolean, DateTime, Float, Integer
+
+from src.models.user import db
+
+# Rows are encoded in chunks of this many when a whole result is streamed
+STREAM_CHUNK_ROWS = 500
+
+
+def _encode_datetime(value):
+    return '"' + value.isoformat() + '"'
+
+
+def _encode_float(value):
+    return float.__repr__(float(value))
+
+
+def _encode_bool(value):
+    return 'true' if value else 'false'
+
+
+def _encoder_for(column_type):
+    if isinstance(column_type, DateTime):
+        return _encode_datetime
+    if isinstance(column_type, Boolean):
+        return _encode_bool
+    if isinstance(column_type, Float):
+        return _encode_float
+    if isinstance(column_type, Integer):
+        return int.__repr__
+    return encode_basestring_ascii
+
+
+class Projection:
+    """Serializes a fixed set of model columns straight from result tuples.
+
+    query() selects only those columns, so no ORM objects or per-row dicts
+    are built, and encode() writes each row as JSON text with a per-column
+    encoder picked once from the column type. Keys come out sorted, the
+    same as jsonify, so responses match the model's to_dict().
+    """
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = sorted(fields)
+        self.columns = [getattr(model, name) for name in self.fields]
+        table_columns = model.__table__.c
+        self._encoders = [_encoder_for(table_columns[name].type) for name in self.fields]
+        self._prefixes = [
+            ('{' if position == 0 else ',') + encode_basestring_ascii(name) + ':'
+            for position, name in enumerate(self.fields)
+        ]
+        self._layout = list(zip(self._prefixes, self._encoders))
+
+    def query(self, *criteria):
+        return db.session.query(*self.columns).filter(*criteria)
+
+    def encode(self, row):
+        return ''.join([
+            prefix + ('null' if value is None else encode(value))
+            for (prefix, encode), value in zip(self._layout, row)
+        ]) + '}'
+
+    def encode_list(self, rows):
+        return '[' + ','.join([self.encode(row) for row in rows]) + ']'
+
+    def encode_groups(self, rows, key):
+        """JSON object of arrays keyed by column key, like grouping to_dict() output by hand."""
+        position = self.fields.index(key)
+        groups = {}
+        for row in rows:
+            groups.setdefault(row[position], []).append(self.encode(row))
+        return '{' + ','.join(
+            encode_basestring_ascii(name) + ':[' + ','.join(groups[name]) + ']' for name in sorted(groups)
+        ) + '}'
+
+    def encode_mapping(self, rows, key):
+        """JSON object with one record per row, keyed by column key."""
+        position = self.fields.index(key)
+        encoded = sorted((row[position], self.encode(row)) for row in rows)
+        return '{' + ','.join(encode_basestring_ascii(name) + ':' + body for name, body in encoded) + '}'
+
+
+def json_body(body, status=200):
+    return Response(body + '\n', status=status, mimetype='application/json')
+
+
+def page_response(projection, rows, next_cursor):
+    """Same body as jsonify({'items': ..., 'next_cursor': ...}) for one keyset page."""
+    cursor = 'null' if next_cursor is None else encode_basestring_ascii(next_cursor)
+    return json_body('{"items":' + projection.encode_list(rows) + ',"next_cursor":' + cursor + '}')
+
+
+def stream_array(projection, rows):
+    """Stream rows out as a JSON array without building the whole body at once."""
+    def generate():
+        yield '['
+        for start in range(0, len(rows), STREAM_CHUNK_ROWS):
+            chunk = ','.join([projection.encode(row) for row in rows[start:start + STREAM_CHUNK_ROWS]])
+            yield chunk if start == 0 else ',' + chunk
+        yield ']\n'
+    return Response(generate(), mimetype='application/json')
@@ -0,0 +1,70 @@
+import importlib
+import os
+import re
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, inspect
+
+from src.models.user import db
+import src.models.netrunner  # registers the netrunner tables on db.metadata
+
+MIGRATIONS_PACKAGE = 'src.migrations'
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'migrations')
+MIGRATION_FILE = re.compile(r'^(v\d{4}_\w+)\.py$')
+
+# Kept out of db.metadata so create_all never touches it
+schema_migration = Table(
+    'schema_migration', MetaData(),
+    Column('version', String(120), primary_key=True),
+    Column('applied_at', DateTime, nullable=False)
+)
+
+
+def discover():
+    """(version, module) for every migration in src/migrations, oldest first."""
+    versions = sorted(
+        match.group(1) for match in map(MIGRATION_FILE.match, os.listdir(MIGRATIONS_DIR)) if match
+    )
+    return [(version, importlib.import_module(f'{MIGRATIONS_PACKAGE}.{version}')) for version in versions]
+
+
+def _applied(connection):
+    schema_migration.create(connection, checkfirst=True)
+    return set(connection.execute(schema_migration.select().with_only_columns(schema_migration.c.version)).scalars())
+
+
+def _stamp(connection, version):
+    connection.execute(schema_migration.insert().values(version=version, applied_at=datetime.utcnow()))
+
+
+def status(engine):
+    with engine.begin() as connection:
+        applied = _applied(connection)
+    return [(version, version in applied) for version, _ in discover()]
+
+
+def upgrade(engine):
+    """Apply pending migrations, each in its own transaction; returns the versions applied.
+
+    An empty database is created straight from the models and stamped with
+    every known version, so only existing databases replay migrations.
+    """
+    migrations = discover()
+    with engine.begin() as connection:
+        applied = _applied(connection)
+        fresh = not applied and not set(inspect(connection).get_table_names()) & set(db.metadata.tables)
+        if fresh:
+            db.metadata.create_all(connection)
+            for version, _ in migrations:
+                _stamp(connection, version)
+            return [version for version, _ in migrations]
+
+    done = []
+    for version, module in migrations:
+        if version in applied:
+            continue
+        with engine.begin() as connection:
+            module.upgrade(connection)
+            _stamp(connection, version)
+        done.append(version)
+    return done
@@ -0,0 +1,477 @@
+import bisect
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, jsonify, request
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from src.models.user import db
+from src.models.netrunner import Netrunner, ShardDirectory, ShardIdRemap
+from src.services import schema
+
+# Shard k hands out ids in (k * ID_SPAN, (k + 1) * ID_SPAN] for every table
+# in ID_RANGED_TABLES, so those ids are unique across shards and name their
+# shard. 2**40 per shard keeps ids below 2**53, safe for JavaScript clients,
+# up to 8192 shards.
+ID_SPAN = 2 ** 40
+ID_RANGED_TABLES = ('contract', 'epic_hack', 'milestone', 'skill_point', 'data_stream_entry')
+# Route arguments holding one of those ids, and the table it names a row of
+ID_ROUTE_ARGS = {'contract_id': 'contract', 'epic_hack_id': 'epic_hack', 'milestone_id': 'milestone'}
+# Points per shard on the hash ring; more points spread netrunners more evenly
+RING_REPLICAS = 64
+
+
+class ShardRouter:
+    """Spreads netrunners over several SQLite databases so writes stop queuing on one lock.
+
+    ShardDirectory, in the default database, records which shard holds
+    each netrunner and allocates netrunner ids. A new netrunner goes to
+    the shard its id hashes to on a consistent-hash ring, so adding a shard
+    only moves about 1/N of the existing netrunners (see jobs/rebalance.py).
+    Contracts, epic hacks, milestones, skill points and data stream
+    entries take their ids from their shard's ID_SPAN range, so routes that
+    only carry one of those ids find the shard without a lookup.
+
+    Each request's db.session is bound to the shard named by its
+    netrunner_id, contract_id, epic_hack_id or milestone_id argument; for
+    the last three the row's owner is read from the shard its id names.
+    Moves give rows new ids from the target's range, and an old id is
+    translated to the new one (see remapped()) before the view runs.
+    Netrunner tables then go to that shard, and shared tables (users, the
+    directory) to the default database. Directory entries are cached per
+    process for directory_ttl seconds. Requests for a netrunner that is
+    being moved, or for any of its rows, answer 503 until the move is
+    done. fan_out() runs a read against every shard in parallel, and
+    run_each() runs a fleet-wide job once per shard in parallel.
+
+    SHARD_COUNT = N keeps the main database as shard 0 and adds shards
+    1..N-1 as shard-NN.db files in SHARD_DIR. An existing database
+    therefore keeps its netrunners where they are until they are
+    rebalanced. SHARD_URIS lists the databases explicitly instead. With
+    fewer than two shards the router is off and everything runs on the
+    main database as before.
+    """
+
+    def __init__(self, app=None, directory_ttl=5.0, replicas=RING_REPLICAS):
+        self.app = None
+        self.directory_ttl = directory_ttl
+        self.replicas = replicas
+        self.fan_out_workers = None
+        # Bind key per shard; None is the default database
+        self.keys = [None]
+        self._ring_points = []
+        self._ring_shards = []
+        # netrunner_id -> (expires_at, shard, moving)
+        self._directory = {}
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Register the shard databases as binds; call before db.init_app so they get engines."""
+        self.app = app
+        self.directory_ttl = app.config.setdefault('SHARD_DIRECTORY_TTL', self.directory_ttl)
+        self.replicas = app.config.setdefault('SHARD_RING_REPLICAS', self.replicas)
+        count = app.config.setdefault('SHARD_COUNT', 0)
+        uris = list(app.config.setdefault('SHARD_URIS', []))
+        if not uris and count > 1:
+            directory = app.config['SHARD_DIR']
+            os.makedirs(directory, exist_ok=True)
+            uris = [app.config['SQLALCHEMY_DATABASE_URI']] + [
+                f"sqlite:///{os.path.join(directory, f'shard-{shard:02d}.db')}" for shard in range(1, count)
+            ]
+
+        self.keys = [None]
+        if len(uris) > 1:
+            binds = app.config.setdefault('SQLALCHEMY_BINDS', {})
+            self.keys = []
+            for shard, uri in enumerate(uris):
+                key = None if uri == app.config['SQLALCHEMY_DATABASE_URI'] else f'shard{shard}'
+                if key is not None:
+                    binds[key] = uri
+                self.keys.append(key)
+        self.fan_out_workers = app.config.setdefault('SHARD_FAN_OUT_WORKERS', len(self.keys))
+
+        points = sorted(
+            (_hash(f'shard-{shard}-{replica}'), shard)
+            for shard in range(len(self.keys)) for replica in range(self.replicas)
+        )
+        self._ring_points = [point for point, _ in points]
+        self._ring_shards = [shard for _, shard in points]
+        with self._lock:
+            self._directory = {}
+        app.extensions['shards'] = self
+        if self.enabled:
+            app.before_request(self._bind_request)
+            app.teardown_request(self._unbind)
+
+    @property
+    def enabled(self):
+        return len(self.keys) > 1
+
+    @property
+    def count(self):
+        return len(self.keys)
+
+    def engine(self, shard):
+        return db.engines[self.keys[shard]]
+
+    def engines(self):
+        return [self.engine(shard) for shard in range(self.count)]
+
+    def ring_shard(self, netrunner_id):
+        """Where the hash ring places a netrunner id."""
+        index = bisect.bisect(self._ring_points, _hash(str(netrunner_id)))
+        return self._ring_shards[index % len(self._ring_shards)]
+
+    def id_shard(self, object_id):
+        """Shard owning a contract, epic hack, milestone, skill point or data stream id; None if out of range."""
+        shard = (object_id - 1) // ID_SPAN
+        return shard if 0 <= shard < self.count else None
+
+    def id_floor(self):
+        """Ids on the session's shard start above this."""
+        return db.session().info.get('shard', 0) * ID_SPAN
+
+    def bind(self, shard):
+        """Send db.session's netrunner tables to shard from now on."""
+        if not self.enabled:
+            return
+        session = db.session()
+        session.info['shard'] = shard
+        session.info['shard_engine'] = self.engine(shard)
+
+    def unbind(self):
+        session = db.session()
+        session.info.pop('shard', None)
+        session.info.pop('shard_engine', None)
+
+    def lookup(self, netrunner_id):
+        """(shard, moving) for a netrunner, or None if the directory doesn't know it."""
+        if not self.enabled:
+            return 0, False
+        with self._lock:
+            cached = self._directory.get(netrunner_id)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1:]
+        return self._load([netrunner_id]).get(netrunner_id)
+
+    def engine_for(self, netrunner_id):
+        placement = self.lookup(netrunner_id)
+        return self.engine(placement[0]) if placement is not None else db.engine
+
+    def write_each(self, items, key, write, on_error=None):
+        """Call write(connection, items) once per shard for items whose netrunner is on it, outside a request.
+
+        Returns (results, deferred): write's return values for the groups
+        that committed, and the items left unwritten because their
+        netrunner is being moved (or could not be looked up again once some
+        groups had committed), for the caller to retry later.
+
+        Each group is written under BEGIN IMMEDIATE, after checking which of
+        its netrunners still have a row on that shard, so nothing lands on a
+        shard a move has just emptied. Items found missing are looked up in
+        the directory again and retried once; those still missing belong to
+        no netrunner and are dropped. An exception from a group is passed to
+        on_error(group, exc) and the other groups still go ahead, or raised
+        when there is no on_error.
+        """
+        if not self.enabled:
+            if items:
+                try:
+                    with db.engine.begin() as connection:
+                        return [write(connection, items)], []
+                except Exception as exc:
+                    if on_error is None:
+                        raise
+                    on_error(items, exc)
+            return [], []
+
+        results, deferred = [], []
+        pending = items
+        for _ in range(2):
+            try:
+                groups, moving = self._partition(pending, key)
+            except Exception:
+                if pending is items:
+                    raise
+                # Other groups have committed; hand the rest back rather than write those twice
+                deferred.extend(pending)
+                break
+            deferred.extend(moving)
+            missing = []
+            for engine, group in groups:
+                try:
+                    with engine.connect() as connection:
+                        connection.exec_driver_sql('BEGIN IMMEDIATE')
+                        present = set(connection.execute(
+                            db.select(Netrunner.id).where(Netrunner.id.in_({key(item) for item in group}))
+                        ).scalars())
+                        here = [item for item in group if key(item) in present]
+                        result = write(connection, here) if here else None
+                        connection.commit()
+                except Exception as exc:
+                    if on_error is None:
+                        raise
+                    on_error(group, exc)
+                    continue
+                if here:
+                    results.append(result)
+                missing.extend(item for item in group if key(item) not in present)
+            if not missing:
+                break
+            self.forget({key(item) for item in missing})
+            pending = missing
+        return results, deferred
+
+    def forget(self, netrunner_ids):
+        """Drop cached directory entries, so the next lookup reads the directory."""
+        with self._lock:
+            for netrunner_id in netrunner_ids:
+                self._directory.pop(netrunner_id, None)
+
+    def remapped(self, table_name, old_id):
+        """The id a shard move gave the table_name row that had old_id, or None."""
+        if not self.enabled:
+            return None
+        table = ShardIdRemap.__table__
+        with db.engine.connect() as connection:
+            return connection.execute(
+                db.select(table.c.new_id).where(table.c.table_name == table_name, table.c.old_id == old_id)
+            ).scalar()
+
+    def alias_taken(self, alias):
+        """Whether a netrunner already uses alias, on any shard."""
+        column = ShardDirectory.alias if self.enabled else Netrunner.alias
+        return db.session.execute(db.select(column).where(column == alias)).first() is not None
+
+    def allocate(self, alias):
+        """Reserve a netrunner id for alias and bind db.session to the shard it hashes to.
+
+        The directory row commits with the rest of the session; check
+        alias_taken() first. Returns None while sharding is off, leaving the
+        id to the netrunner table.
+        """
+        if not self.enabled:
+            return None
+        session = db.session()
+        entry = ShardDirectory(alias=alias, shard=0)
+        session.add(entry)
+        session.flush()
+        entry.shard = self.ring_shard(entry.netrunner_id)
+        session.flush()
+        self.bind(entry.shard)
+        return entry.netrunner_id
+
+    def place(self, netrunner_ids, shard=None, moving=False):
+        """Point directory entries at shard (None keeps it) and set their moving flag; commits at once."""
+        table = ShardDirectory.__table__
+        values = {'moving': moving}
+        if shard is not None:
+            values['shard'] = shard
+        with db.engine.begin() as connection:
+            connection.execute(table.update().where(table.c.netrunner_id.in_(list(netrunner_ids))).values(**values))
+        self.forget(netrunner_ids)
+
+    def backfill(self):
+        """Add every netrunner found on a shard to the directory; returns (added, skipped).
+
+        Netrunners already listed are left alone; skipped counts those whose
+        alias is listed under another id.
+        """
+        added = skipped = 0
+        for shard, engine in enumerate(self.engines()):
+            with engine.connect() as connection:
+                rows = connection.execute(db.select(Netrunner.id, Netrunner.alias)).all()
+            if not rows:
+                continue
+            table = ShardDirectory.__table__
+            with db.engine.begin() as connection:
+                known = set(connection.execute(db.select(table.c.netrunner_id)).scalars())
+                fresh = [
+                    {'netrunner_id': row.id, 'alias': row.alias, 'shard': shard, 'moving': False}
+                    for row in rows if row.id not in known
+                ]
+                if fresh:
+                    inserted = connection.execute(sqlite_insert(table).on_conflict_do_nothing(), fresh).rowcount
+                    added += inserted
+                    skipped += len(fresh) - inserted
+        return added, skipped
+
+    def migrate(self):
+        """Apply pending migrations to the default database and every shard; {database: versions applied}.
+
+        Shards past 0 also get their id floor set, so a fresh shard starts
+        handing out ids in its own range.
+        """
+        applied = {name: schema.upgrade(engine) for name, engine in self.databases()}
+        for shard in range(1, self.count):
+            with self.engine(shard).begin() as connection:
+                _set_id_floor(connection, shard)
+        return applied
+
+    def databases(self):
+        """(name, engine) for the default database and every shard stored apart from it."""
+        return [('default', db.engine)] + [
+            (f'shard {shard}', db.engines[key]) for shard, key in enumerate(self.keys) if key is not None
+        ]
+
+    def fan_out(self, query):
+        """[query(executor) for every shard], run in parallel on a connection per shard.
+
+        query gets something with .execute(). While sharding is off it is
+        called once with db.session, so it sees the request's own writes.
+        """
+        if not self.enabled:
+            return [query(db.session)]
+
+        def run(engine):
+            with engine.connect() as connection:
+                return query(connection)
+        return list(self._executor().map(run, self.engines()))
+
+    def run_each(self, job, *args, **kwargs):
+        """[job(*args, **kwargs) for every shard], in parallel, each with db.session bound to its shard.
+
+        Each shard gets its own thread, app context and session, so a job
+        that commits as it goes (the daily reset, retention) holds only
+        its own shard's write lock. Runs job once, in place, while
+        sharding is off.
+        """
+        if not self.enabled:
+            return [job(*args, **kwargs)]
+        app = current_app._get_current_object()
+
+        def run(shard):
+            with app.app_context():
+                self.bind(shard)
+                try:
+                    return job(*args, **kwargs)
+                finally:
+                    db.session.remove()
+        return list(self._executor().map(run, range(self.count)))
+
+    def _load(self, netrunner_ids):
+        table = ShardDirectory.__table__
+        with db.engine.connect() as connection:
+            rows = connection.execute(
+                db.select(table.c.netrunner_id, table.c.shard, table.c.moving)
+                .where(table.c.netrunner_id.in_(list(netrunner_ids)))
+            ).all()
+        expires_at = time.monotonic() + self.directory_ttl
+        placements = {}
+        with self._lock:
+            # Misses aren't cached, so a netrunner created by another worker is found at once
+            for netrunner_id, shard, moving in rows:
+                self._directory[netrunner_id] = (expires_at, shard, moving)
+                placements[netrunner_id] = (shard, moving)
+        return placements
+
+    def _partition(self, items, key):
+        """([(engine, items)], items whose netrunner is moving), from the cached directory."""
+        netrunner_ids = {key(item) for item in items}
+        now = time.monotonic()
+        placements = {}
+        with self._lock:
+            for netrunner_id in netrunner_ids:
+                cached = self._directory.get(netrunner_id)
+                if cached is not None and cached[0] > now:
+                    placements[netrunner_id] = cached[1:]
+        missing = netrunner_ids - set(placements)
+        if missing:
+            placements.update(self._load(missing))
+
+        groups = {}
+        moving = []
+        for item in items:
+            placement = placements.get(key(item))
+            if placement is not None and placement[1]:
+                moving.append(item)
+                continue
+            engine = self.engine(placement[0]) if placement is not None else db.engine
+            groups.setdefault(engine, []).append(item)
+        return list(groups.items()), moving
+
+    def _executor(self):
+        # Threads don't survive fork, so each worker process starts its own pool
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.fan_out_workers or self.count, thread_name_prefix='shard-fan-out'
+                    )
+                    self._pid = os.getpid()
+        return self._pool
+
+    def _bind_request(self):
+        args = request.view_args or {}
+        if 'netrunner_id' in args:
+            return self._bind_netrunner(args['netrunner_id'])
+        for name, table_name in ID_ROUTE_ARGS.items():
+            if name in args:
+                shard = self.id_shard(args[name])
+                if shard is None:
+                    return None
+                self.bind(shard)
+                table = db.metadata.tables[table_name]
+                owner = db.session.execute(db.select(table.c.netrunner_id).where(table.c.id == args[name])).scalar()
+                if owner is None:
+                    new_id = self.remapped(table_name, args[name])
+                    if new_id is None:
+                        # Stays bound to the shard the id names, and the view answers 404
+                        return None
+                    # The view gets the row's id from after its last move
+                    args[name] = new_id
+                    return self._bind_request()
+                return self._bind_netrunner(owner)
+        return None
+
+    def _bind_netrunner(self, netrunner_id):
+        placement = self.lookup(netrunner_id)
+        # Unknown netrunners stay on the default database, where the view answers 404 as usual
+        if placement is None:
+            return None
+        shard, moving = placement
+        if moving:
+            response = jsonify({'error': 'Netrunner is being moved to another shard, retry shortly'})
+            response.status_code = 503
+            response.headers['Retry-After'] = str(max(1, round(self.directory_ttl)))
+            return response
+        self.bind(shard)
+        return None
+
+    def _unbind(self, exc):
+        self.unbind()
+
+
+shard_router = ShardRouter()
+
+
+def _hash(key):
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big')
+
+
+def _set_id_floor(connection, shard):
+    floor = shard * ID_SPAN
+    for name in ID_RANGED_TABLES:
+        highest = connection.exec_driver_sql(f'SELECT max(id) FROM {name}').scalar() or 0
+        if highest > floor:
+            continue
+        ddl = connection.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+        ).scalar()
+        if 'AUTOINCREMENT' not in ddl.upper():
+            raise RuntimeError(
+                f'Table {name} on shard {shard} was created without AUTOINCREMENT; '
+                f'shards past 0 must start from an empty database'
+            )
+        seq = connection.exec_driver_sql('SELECT seq FROM sqlite_sequence WHERE name = ?', (name,)).scalar()
+        if seq is None:
+            connection.exec_driver_sql('INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)', (name, floor))
+        elif seq < floor:
+            connection.exec_driver_sql('UPDATE sqlite_sequence SET seq = ? WHERE name = ?', (floor, name))
@@ -0,0 +1,259 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import event
+
+from src.models.user import db
+from src.models.netrunner import Netrunner, DataStreamEntry
+from src.services.dashboard_cache import dashboard_cache
+from src.services.event_stream import event_broker
+from src.services.shards import shard_router
+
+
+class SideEffectQueue:
+    """Writes data stream log lines off the request path.
+
+    log() only remembers the entry on the session. Once the request's
+    transaction commits, the entries go onto a bounded queue (a rollback
+    drops them). Worker threads take up to batch_size queued entries at a
+    time and write them as one multi-row INSERT per shard, in a short
+    transaction of their own that also bumps each netrunner's version (so
+    dashboard ETags change). They then wake the netrunners' SSE streams
+    and drop the affected dashboard snapshots.
+
+    When the queue is full, the committing request waits up to
+    enqueue_timeout for room. After that it writes its entries itself, so
+    nothing is lost under load. Entries for a netrunner that is being moved
+    to another shard are held back and retried every retry_interval
+    seconds until the move is done, and so is a batch a worker failed to
+    write at all. stop() drains the queue and runs at exit.
+    With SIDE_EFFECTS_SYNC the entries are added to the request's own
+    transaction instead, like any other row.
+    """
+
+    def __init__(self, app=None, max_queue=1000, workers=1, batch_size=200, enqueue_timeout=0.05,
+                 retry_interval=1.0):
+        self.app = None
+        self.sync = False
+        self.max_queue = max_queue
+        self.workers = workers
+        self.batch_size = batch_size
+        self.enqueue_timeout = enqueue_timeout
+        self.retry_interval = retry_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        # (retry_at, enqueued_at, entries) held back while their netrunners move shards
+        self._deferred = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+        self._pid = None
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.inline_writes = 0
+        self.failures = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.sync = app.config.setdefault('SIDE_EFFECTS_SYNC', self.sync)
+        self.max_queue = app.config.setdefault('SIDE_EFFECT_QUEUE_SIZE', self.max_queue)
+        self.workers = app.config.setdefault('SIDE_EFFECT_WORKERS', self.workers)
+        self.batch_size = app.config.setdefault('SIDE_EFFECT_BATCH_SIZE', self.batch_size)
+        self.enqueue_timeout = app.config.setdefault('SIDE_EFFECT_ENQUEUE_TIMEOUT', self.enqueue_timeout)
+        self.retry_interval = app.config.setdefault('SIDE_EFFECT_RETRY_INTERVAL', self.retry_interval)
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        app.extensions['side_effects'] = self
+        atexit.register(self.stop)
+        if not event.contains(db.session, 'after_commit', _enqueue_pending):
+            event.listen(db.session, 'after_commit', _enqueue_pending)
+            event.listen(db.session, 'after_rollback', _discard_pending)
+
+    def log(self, netrunner_id, message, entry_type='info'):
+        """Data stream entry for netrunner_id, written after the current transaction commits."""
+        session = db.session()
+        if self.sync or self.app is None:
+            session.add(DataStreamEntry(netrunner_id=netrunner_id, message=message, entry_type=entry_type))
+            return
+        session.info.setdefault('side_effects', []).append({
+            'netrunner_id': netrunner_id,
+            'message': message,
+            'entry_type': entry_type,
+            'created_at': datetime.utcnow()
+        })
+        # Make sure the unit of work commits even if nothing else was written
+        session.info['uow_written'] = True
+
+    def enqueue(self, entries):
+        if not entries:
+            return
+        self._ensure_workers()
+        item = (time.monotonic(), entries)
+        try:
+            self._queue.put(item, timeout=self.enqueue_timeout)
+        except queue.Full:
+            # Backpressure: the caller pays for its own write rather than dropping it
+            with self._lock:
+                self.inline_writes += 1
+            self._write([item])
+            return
+        with self._lock:
+            self.enqueued += len(entries)
+
+    def drain(self):
+        """Write everything still queued from the calling thread; returns the number of entries."""
+        written = 0
+        while True:
+            batch = self._take(block=False)
+            if not batch:
+                return written
+            written += self._write(batch)
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        if self._pid == os.getpid():
+            for thread in self._threads:
+                thread.join(timeout=timeout)
+        self._threads = []
+        self._pid = None
+        if self.app is not None:
+            with self._lock:
+                self._deferred = [(0.0, enqueued_at, entries) for _, enqueued_at, entries in self._deferred]
+            self.drain()
+            with self._lock:
+                held = sum(len(entries) for _, _, entries in self._deferred)
+            if held:
+                self.app.logger.warning('Dropped %d data stream entries for netrunners still being moved', held)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'depth': self._queue.qsize(),
+                'deferred': sum(len(entries) for _, _, entries in self._deferred),
+                'enqueued': self.enqueued,
+                'written': self.written,
+                'batches': self.batches,
+                'inline_writes': self.inline_writes,
+                'failures': self.failures,
+                'last_lag_seconds': self.last_lag,
+                'max_lag_seconds': self.max_lag
+            }
+
+    def _take(self, block):
+        """Up to batch_size queued entries, as a list of (enqueued_at, entries) items.
+
+        Held back entries whose retry time has come go first.
+        """
+        now = time.monotonic()
+        with self._lock:
+            batch = [(enqueued_at, entries) for retry_at, enqueued_at, entries in self._deferred if retry_at <= now]
+            if batch:
+                self._deferred = [item for item in self._deferred if item[0] > now]
+        if not batch:
+            try:
+                batch = [self._queue.get(timeout=0.5) if block else self._queue.get_nowait()]
+            except queue.Empty:
+                return []
+        count = sum(len(entries) for _, entries in batch)
+        while count < self.batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            count += len(item[1])
+        return batch
+
+    def _write(self, batch):
+        entries = [entry for _, items in batch for entry in items]
+        table = DataStreamEntry.__table__
+        netrunner = Netrunner.__table__
+
+        def insert(connection, group):
+            connection.execute(table.insert(), group)
+            connection.execute(
+                netrunner.update()
+                .where(netrunner.c.id.in_({entry['netrunner_id'] for entry in group}))
+                .values(version=netrunner.c.version + 1)
+            )
+            return group
+
+        def failed(group, exc):
+            with self._lock:
+                self.failures += 1
+            self.app.logger.error('Dropped %d data stream entries', len(group), exc_info=exc)
+
+        with self.app.app_context():
+            results, deferred = shard_router.write_each(
+                entries, key=lambda entry: entry['netrunner_id'], write=insert, on_error=failed
+            )
+        if deferred:
+            # Their netrunners are moving shards; try again once the move is done
+            with self._lock:
+                self._deferred.append((time.monotonic() + self.retry_interval, min(t for t, _ in batch), deferred))
+        written = [entry for group in results for entry in group]
+        if not written:
+            return 0
+
+        lag = time.monotonic() - min(enqueued_at for enqueued_at, _ in batch)
+        with self._lock:
+            self.written += len(written)
+            self.batches += 1
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+
+        for netrunner_id in {entry['netrunner_id'] for entry in written}:
+            event_broker.publish(netrunner_id)
+            dashboard_cache.invalidate(netrunner_id)
+        return len(written)
+
+    def _ensure_workers(self):
+        # Threads don't survive fork, so each worker process starts its own
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._threads = [
+                threading.Thread(target=self._run, name=f'side-effects-{n}', daemon=True)
+                for n in range(self.workers)
+            ]
+        for thread in self._threads:
+            thread.start()
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._take(block=True)
+            if not batch:
+                continue
+            try:
+                self._write(batch)
+            except Exception:
+                # Nothing was written (e.g. the shard directory was locked); hold the batch back and retry it
+                entries = [entry for _, items in batch for entry in items]
+                with self._lock:
+                    self.failures += 1
+                    self._deferred.append((time.monotonic() + self.retry_interval, min(t for t, _ in batch), entries))
+                self.app.logger.exception('Data stream write failed, retrying %d entries', len(entries))
+
+
+side_effects = SideEffectQueue()
+
+
+def _enqueue_pending(session):
+    entries = session.info.pop('side_effects', None)
+    if entries:
+        side_effects.enqueue(entries)
+
+
+def _discard_pending(session):
+    session.info.pop('side_effects', None)
@@ -0,0 +1,34 @@
+from sqlalchemy import event
+
+from src.models.user import db
+
+
+def init_app(app):
+    """Put SQLite connections in WAL mode with a busy timeout.
+
+    WAL lets readers proceed while a writer holds the lock, and the busy
+    timeout makes concurrent writers wait for the lock instead of failing
+    with 'database is locked'.
+    """
+    app.config.setdefault('SQLITE_JOURNAL_MODE', 'WAL')
+    app.config.setdefault('SQLITE_BUSY_TIMEOUT_MS', 5000)
+    app.config.setdefault('SQLITE_SYNCHRONOUS', 'NORMAL')
+
+    pragmas = [
+        f"PRAGMA journal_mode={app.config['SQLITE_JOURNAL_MODE']}",
+        f"PRAGMA busy_timeout={int(app.config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"PRAGMA synchronous={app.config['SQLITE_SYNCHRONOUS']}",
+    ]
+
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    # Every shard database gets the same settings as the default one
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        if engine.dialect.name == 'sqlite':
+            event.listen(engine, 'connect', _set_pragmas)
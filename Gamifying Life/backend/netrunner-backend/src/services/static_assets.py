@@ -0,0 +1,124 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # optional; without it only gzip variants are built
+    brotli = None
+
+# Vite emits assets/<name>-<hash>.<ext>; those names change whenever the content does
+HASHED_ASSET = re.compile(r'^assets/.+-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$')
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml', 'application/xml')
+PRECOMPRESSED_SUFFIXES = {'.br': 'br', '.gz': 'gzip'}
+ENCODING_PREFERENCE = ('br', 'gzip')
+
+
+class StaticAsset:
+    __slots__ = ('path', 'mimetype', 'etag', 'cache_control', 'bodies')
+
+    def __init__(self, path, mimetype, etag, cache_control, bodies):
+        self.path = path
+        self.mimetype = mimetype
+        self.etag = etag
+        self.cache_control = cache_control
+        # Content-Encoding ('identity', 'gzip', 'br') -> bytes
+        self.bodies = bodies
+
+
+class StaticManifest:
+    """The built frontend, scanned once into memory at startup.
+
+    Every file in the static folder is read once, given a strong ETag and,
+    when compressible, gzip/brotli variants. Pre-built .gz/.br files next
+    to an asset are used as-is. Hashed Vite assets are cached as immutable
+    for a year, everything else revalidates with its ETag. Unknown paths
+    fall back to index.html from memory, so serving never touches the disk.
+    """
+
+    def __init__(self, app=None):
+        self.assets = {}
+        self.index = None
+        self.precompress = True
+        self.compress_min_size = 1024
+        self.max_age = 3600
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.precompress = app.config.setdefault('STATIC_PRECOMPRESS', self.precompress)
+        self.compress_min_size = app.config.setdefault('STATIC_COMPRESS_MIN_SIZE', self.compress_min_size)
+        self.max_age = app.config.setdefault('STATIC_MAX_AGE', self.max_age)
+        app.extensions['static_assets'] = self
+        self.scan(app.static_folder)
+
+    def scan(self, root):
+        """Rebuild the manifest from root; returns the number of assets found."""
+        assets = {}
+        if root and os.path.isdir(root):
+            for directory, _, filenames in os.walk(root):
+                for filename in filenames:
+                    full_path = os.path.join(directory, filename)
+                    path = os.path.relpath(full_path, root).replace(os.sep, '/')
+                    if os.path.splitext(path)[1] in PRECOMPRESSED_SUFFIXES:
+                        continue
+                    assets[path] = self._load(full_path, path)
+        self.assets = assets
+        self.index = assets.get('index.html')
+        return len(assets)
+
+    def _load(self, full_path, path):
+        with open(full_path, 'rb') as handle:
+            body = handle.read()
+        mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        bodies = {'identity': body}
+        for suffix, encoding in PRECOMPRESSED_SUFFIXES.items():
+            if os.path.exists(full_path + suffix):
+                with open(full_path + suffix, 'rb') as handle:
+                    bodies[encoding] = handle.read()
+        if self.precompress and len(body) >= self.compress_min_size and mimetype.startswith(COMPRESSIBLE_TYPES):
+            if 'gzip' not in bodies:
+                bodies['gzip'] = gzip.compress(body, compresslevel=9, mtime=0)
+            if 'br' not in bodies and brotli is not None:
+                bodies['br'] = brotli.compress(body)
+        # Keep a variant only when it actually saves bytes
+        bodies = {encoding: data for encoding, data in bodies.items() if encoding == 'identity' or len(data) < len(body)}
+
+        if HASHED_ASSET.match(path):
+            cache_control = 'public, max-age=31536000, immutable'
+        elif path == 'index.html':
+            cache_control = 'no-cache'
+        else:
+            cache_control = f'public, max-age={self.max_age}'
+        etag = hashlib.sha256(body).hexdigest()[:32]
+        return StaticAsset(path, mimetype, etag, cache_control, bodies)
+
+    def lookup(self, path):
+        """The asset for path, index.html for anything unknown, or None if there is no build."""
+        return self.assets.get(path) or self.index
+
+    def response_for(self, asset):
+        encoding = 'identity'
+        if len(asset.bodies) > 1:
+            accepted = request.accept_encodings
+            encoding = next(
+                (name for name in ENCODING_PREFERENCE if name in asset.bodies and accepted[name]),
+                'identity'
+            )
+
+        response = Response(asset.bodies[encoding], mimetype=asset.mimetype)
+        # Each encoding is a different byte sequence, so it needs its own strong ETag
+        response.set_etag(asset.etag if encoding == 'identity' else f'{asset.etag}-{encoding}')
+        response.headers['Cache-Control'] = asset.cache_control
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        if len(asset.bodies) > 1:
+            response.vary.add('Accept-Encoding')
+        return response.make_conditional(request)
+
+
+static_assets = StaticManifest()
@@ -0,0 +1,339 @@
+import json
+import re
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, Float, Integer
+from sqlalchemy.exc import DBAPIError
+
+from src.models.user import db
+from src.models.netrunner import (
+    Netrunner, Contract, EpicHack, Milestone, SkillPoint, SkillTreeRollup, LevelCount, ExpCount,
+    DataStreamEntry, DataStreamArchive
+)
+from src.services.operations import OperationError
+from src.services.projection import Projection
+from src.services.shards import shard_router
+from src.jobs.analytics_backfill import rebuild_daily_analytics
+
+EXPORT_FORMAT = 1
+# Rows fetched per round trip while exporting, and inserted per executemany while importing
+EXPORT_CHUNK_ROWS = 2000
+IMPORT_CHUNK_ROWS = 5000
+
+NETRUNNER_FIELDS = Projection(Netrunner, [
+    'id', 'alias', 'level', 'exp', 'credits', 'max_bandwidth', 'current_bandwidth', 'signal_debt',
+    'created_at', 'last_active'
+])
+# (record type, projection) in dependency order: epic hacks come before the
+# contracts and milestones that point at them, and archived data stream
+# entries before live ones so the imported ids keep the same order
+SECTIONS = [
+    ('epic_hack', Projection(EpicHack, [
+        'id', 'title', 'description', 'status', 'progress', 'target_date', 'created_at', 'completed_at',
+        'total_milestones', 'completed_milestones'
+    ])),
+    ('contract', Projection(Contract, [
+        'id', 'title', 'description', 'difficulty', 'status', 'time_estimate', 'time_spent', 'progress',
+        'exp_reward', 'credit_reward', 'contract_type', 'epic_hack_id', 'created_at', 'started_at', 'completed_at'
+    ])),
+    ('milestone', Projection(Milestone, [
+        'id', 'epic_hack_id', 'title', 'status', 'exp_reward', 'credit_reward', 'created_at', 'completed_at'
+    ])),
+    ('skill_point', Projection(SkillPoint, ['id', 'skill_tree', 'points', 'acquired_at'])),
+    ('data_stream_archive', Projection(DataStreamArchive, ['id', 'message', 'entry_type', 'created_at'])),
+    ('data_stream', Projection(DataStreamEntry, ['id', 'message', 'entry_type', 'created_at'])),
+]
+SECTION_FIELDS = dict(SECTIONS)
+# Table whose id sequence each record type draws from; archived entries keep
+# the id they had as live entries
+ID_SPACES = {
+    record_type: 'data_stream_entry' if record_type == 'data_stream_archive' else projection.model.__tablename__
+    for record_type, projection in SECTIONS
+}
+ISO_DATETIME = re.compile(r'\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(?:\.\d{6})?$')
+
+
+def export_ndjson(engine, netrunner_id):
+    """NDJSON lines for one netrunner's full history, read through a single snapshot.
+
+    A generator over its own connection, so the response can keep
+    streaming after the request context is gone. Every section is read in
+    EXPORT_CHUNK_ROWS partitions, which keeps memory flat however many
+    rows there are. On SQLite the whole export runs in one read
+    transaction, so rows committed mid-export don't show up half way.
+    """
+    with engine.connect() as connection:
+        if engine.dialect.name == 'sqlite':
+            connection.exec_driver_sql('BEGIN')
+        yield from export_lines(connection, netrunner_id)
+
+
+def export_lines(connection, netrunner_id):
+    """export_ndjson() on a connection the caller holds, in chunks of whole lines."""
+    netrunner = connection.execute(
+        db.select(*NETRUNNER_FIELDS.columns).where(Netrunner.id == netrunner_id)
+    ).first()
+    if netrunner is None:
+        return
+    yield _line('export', json.dumps({
+        'format': EXPORT_FORMAT, 'netrunner_id': netrunner_id, 'exported_at': datetime.utcnow().isoformat()
+    }, sort_keys=True))
+    yield _line('netrunner', NETRUNNER_FIELDS.encode(netrunner))
+
+    for record_type, projection in SECTIONS:
+        prefix = '{"type":"' + record_type + '","data":'
+        result = connection.execution_options(yield_per=EXPORT_CHUNK_ROWS).execute(
+            db.select(*projection.columns)
+            .where(projection.model.netrunner_id == netrunner_id)
+            .order_by(projection.model.id)
+        )
+        for rows in result.partitions():
+            yield ''.join([prefix + projection.encode(row) + '}\n' for row in rows])
+
+
+def _line(record_type, data):
+    return '{"type":"' + record_type + '","data":' + data + '}\n'
+
+
+class _Converter:
+    """Turns exported records back into insert parameters for one table.
+
+    Every value is checked against its column's type and coerced into the
+    form SQLite stores, with a coercer picked once per column; a value of
+    the wrong type, or a missing NOT NULL value, is refused with the line
+    number. DateTime values are rewritten from ISO 8601 straight into
+    SQLite's text layout, so bulk rows skip the datetime round trip and
+    SQLAlchemy's per-row bind processing (see _insert).
+    """
+
+    def __init__(self, projection, skip=('id',)):
+        table_columns = projection.model.__table__.c
+        self.names = [name for name in projection.fields if name not in skip]
+        self._layout = [
+            (name, _coercer_for(table_columns[name].type), table_columns[name].nullable)
+            for name in self.names
+        ]
+
+    def __call__(self, data, number, **overrides):
+        params = {}
+        for name, coerce, nullable in self._layout:
+            value = data.get(name)
+            if value is None:
+                if not nullable and name not in overrides:
+                    raise OperationError(f'Line {number}: {name} is required')
+            else:
+                try:
+                    value = coerce(value)
+                except (TypeError, ValueError):
+                    raise OperationError(f'Line {number}: invalid {name} {value!r}')
+            params[name] = value
+        params.update(overrides)
+        return params
+
+
+def _coercer_for(column_type):
+    if isinstance(column_type, DateTime):
+        return _stored_datetime
+    if isinstance(column_type, Boolean):
+        return _stored_bool
+    if isinstance(column_type, Float):
+        return _stored_float
+    if isinstance(column_type, Integer):
+        return _stored_int
+    return _stored_str
+
+
+def _stored_datetime(value):
+    """'2026-01-02T03:04:05[.123456]' as SQLite's '2026-01-02 03:04:05.123456'"""
+    if not isinstance(value, str) or not ISO_DATETIME.match(value):
+        raise ValueError(value)
+    return value.replace('T', ' ') if len(value) == 26 else value.replace('T', ' ') + '.000000'
+
+
+def _stored_bool(value):
+    if not isinstance(value, bool):
+        raise TypeError(value)
+    return int(value)
+
+
+def _stored_float(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise TypeError(value)
+    return float(value)
+
+
+def _stored_int(value):
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise TypeError(value)
+    return value
+
+
+def _stored_str(value):
+    if not isinstance(value, str):
+        raise TypeError(value)
+    return value
+
+
+def import_ndjson(lines, alias=None, chunk_size=IMPORT_CHUNK_ROWS, netrunner_id=None, id_map=None):
+    """Load an export_ndjson() stream as a new netrunner in one transaction.
+
+    lines may be any iterable of str or bytes lines (a file, a request
+    stream), read once and never held in memory as a whole. Rows go in
+    with chunked executemany inserts. Every row gets a fresh id, handed
+    out here so the contracts and milestones pointing at an epic hack can
+    follow it. Pass a dict as id_map to get {table name: {exported id: new
+    id}} back. The skill tree rollups, level counts and daily analytics are
+    filled in afterwards.
+
+    The new netrunner gets its id and shard from the shard directory. A
+    shard move passes netrunner_id instead, already listed in the directory,
+    with the session bound to the target shard.
+
+    Index upkeep during the load stays cheap without dropping anything:
+    the history indexes all lead with netrunner_id, and the new netrunner
+    sorts after every existing one, so each insert lands at the end of the
+    b-tree. Returns (netrunner_id, rows inserted per record type). The caller
+    commits.
+    """
+    records = _records(lines)
+    _, record_type, data = next(records, (None, None, None))
+    if record_type != 'export' or data.get('format') != EXPORT_FORMAT:
+        raise OperationError('Not a netrunner export (expected an export header line)')
+    number, record_type, data = next(records, (None, None, None))
+    if record_type != 'netrunner':
+        raise OperationError('Export is missing the netrunner record')
+
+    alias = alias or data.get('alias')
+    if not alias:
+        raise OperationError('Alias is required')
+    if netrunner_id is None:
+        if shard_router.alias_taken(alias):
+            raise OperationError(f'Alias {alias!r} already exists', 409)
+        netrunner_id = shard_router.allocate(alias)
+
+    netrunner_params = _Converter(NETRUNNER_FIELDS)(data, number, alias=alias)
+    for name in ('created_at', 'last_active'):
+        if netrunner_params[name] is not None:
+            netrunner_params[name] = datetime.fromisoformat(netrunner_params[name])
+    if netrunner_id is not None:
+        netrunner_params['id'] = netrunner_id
+    netrunner_id = db.session.execute(
+        Netrunner.__table__.insert().values(**netrunner_params, version=1).returning(Netrunner.id)
+    ).scalar_one()
+    level = netrunner_params.get('level') or 1
+    LevelCount.shift(db.session.connection(), to_level=level)
+    ExpCount.shift(db.session.connection(), to_key=(level, netrunner_params.get('exp') or 0))
+
+    counts = {record_type: 0 for record_type, _ in SECTIONS}
+    converters = {record_type: _Converter(projection) for record_type, projection in SECTIONS}
+    # Only epic hack ids are needed for the import itself
+    remap = id_map if id_map is not None else {}
+    next_ids = {space: _next_id(space) for space in set(ID_SPACES.values())}
+
+    pending_type, pending = None, []
+    for number, record_type, data in records:
+        convert = converters.get(record_type)
+        if convert is None:
+            raise OperationError(f'Unknown record type {record_type!r}')
+        if record_type != pending_type or len(pending) >= chunk_size:
+            _insert(pending_type, pending, counts)
+            pending_type, pending = record_type, []
+
+        params = convert(data, number, netrunner_id=netrunner_id)
+        space = ID_SPACES[record_type]
+        params['id'] = next_ids[space]
+        next_ids[space] += 1
+        if id_map is not None or record_type == 'epic_hack':
+            remap.setdefault(space, {})[_source_id(data, number)] = params['id']
+        if record_type in ('contract', 'milestone'):
+            params['epic_hack_id'] = remap.get('epic_hack', {}).get(params['epic_hack_id'])
+            if record_type == 'milestone' and params['epic_hack_id'] is None:
+                raise OperationError(f"Line {number}: milestone points at an unknown epic hack")
+        pending.append(params)
+    _insert(pending_type, pending, counts)
+
+    _rebuild_skill_rollups(netrunner_id)
+    rebuild_daily_analytics(netrunner_id, commit=False)
+    return netrunner_id, counts
+
+
+def _records(lines):
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            record_type, data = record['type'], record['data']
+        except (ValueError, KeyError, TypeError):
+            raise OperationError(f'Line {number} is not an export record')
+        if not isinstance(data, dict):
+            raise OperationError(f'Line {number} is not an export record')
+        yield number, record_type, data
+
+
+def _source_id(data, number):
+    try:
+        return _stored_int(data.get('id'))
+    except TypeError:
+        raise OperationError(f"Line {number}: invalid id {data.get('id')!r}")
+
+
+def _insert(record_type, rows, counts):
+    if not rows:
+        return
+    # Rows are already in storage form, so they go to the driver's
+    # executemany as they are; compiling and binding each row through
+    # SQLAlchemy costs several times the INSERT itself
+    table = SECTION_FIELDS[record_type].model.__table__
+    columns = list(rows[0])
+    try:
+        db.session.connection().exec_driver_sql(
+            f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({', '.join(':' + name for name in columns)})",
+            rows
+        )
+    except DBAPIError as e:
+        # Values are validated up front, so this is a constraint the rows broke together
+        raise OperationError(f'Could not import {record_type} records: {e.orig}')
+    counts[record_type] += len(rows)
+
+
+def _next_id(table_name):
+    """First free id in table_name on the session's shard.
+
+    Above every id the table has ever handed out (AUTOINCREMENT tables
+    remember those in sqlite_sequence), so an id a move left in a remap is
+    never given to another row.
+    """
+    highest = max(_max_id(table_name), _sequence(table_name), shard_router.id_floor())
+    if table_name == 'data_stream_entry':
+        highest = max(highest, _max_id('data_stream_archive'))
+    return highest + 1
+
+
+def _max_id(table_name):
+    table = db.metadata.tables[table_name]
+    return db.session.execute(db.select(db.func.max(table.c.id))).scalar() or 0
+
+
+def _sequence(table_name):
+    connection = db.session.connection()
+    if connection.dialect.name != 'sqlite' or connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_sequence'"
+    ).first() is None:
+        return 0
+    return connection.exec_driver_sql('SELECT seq FROM sqlite_sequence WHERE name = ?', (table_name,)).scalar() or 0
+
+
+def _rebuild_skill_rollups(netrunner_id):
+    # Core inserts skip the SkillPoint mapper events, so fill the rollups in one statement
+    points = SkillPoint.__table__
+    db.session.execute(SkillTreeRollup.__table__.insert().from_select(
+        ['netrunner_id', 'skill_tree', 'total_points', 'point_count', 'last_acquired_at'],
+        db.select(
+            points.c.netrunner_id,
+            points.c.skill_tree,
+            db.func.sum(points.c.points),
+            db.func.count(),
+            db.func.max(points.c.acquired_at)
+        ).where(points.c.netrunner_id == netrunner_id).group_by(points.c.netrunner_id, points.c.skill_tree)
+    ))
@@ -0,0 +1,77 @@
+import threading
+
+from flask import g, has_request_context
+from sqlalchemy import event
+
+from src.models.user import db
+
+
+class UnitOfWork:
+    """Commits everything a request wrote in a single transaction.
+
+    Routes only add/flush; the session is committed once after the view
+    returns a successful response and rolled back on errors.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.commits = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['unit_of_work'] = self
+        app.after_request(self._finish)
+        app.teardown_request(self._teardown)
+        if not event.contains(db.session, 'after_commit', _count_commit):
+            event.listen(db.session, 'after_flush', _mark_written)
+            event.listen(db.session, 'do_orm_execute', _mark_dml)
+            event.listen(db.session, 'after_commit', _count_commit)
+
+    def _finish(self, response):
+        session = db.session()
+        written = session.info.pop('uow_written', False) or bool(
+            session.new or session.dirty or session.deleted
+        )
+        if response.status_code < 400 and written:
+            session.commit()
+        else:
+            session.rollback()
+
+        commits = g.get('commit_count', 0)
+        with self._lock:
+            self.requests += 1
+            self.commits += commits
+        response.headers['X-DB-Commits'] = str(commits)
+        return response
+
+    def _teardown(self, exc):
+        if exc is not None:
+            db.session.rollback()
+        db.session().info.pop('uow_written', None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'commits': self.commits,
+                'commits_per_request': self.commits / self.requests if self.requests else 0.0
+            }
+
+
+unit_of_work = UnitOfWork()
+
+
+def _mark_written(session, flush_context):
+    session.info['uow_written'] = True
+
+
+def _mark_dml(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info['uow_written'] = True
+
+
+def _count_commit(session):
+    if has_request_context():
+        g.commit_count = g.get('commit_count', 0) + 1
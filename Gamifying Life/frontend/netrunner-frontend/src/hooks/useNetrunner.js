@@ -128,6 +128,18 @@ export const useNetrunner = (netrunnerId) => {
     fetchDashboardData();
   }, [fetchDashboardData]);
 
+  useEffect(() => {
+    if (!netrunnerId) return;
+
+    return ApiService.subscribeDataStream(netrunnerId, (entry) => {
+      setDataStream(prev => 
+        prev.some(existing => existing.id === entry.id)
+          ? prev
+          : [entry, ...prev].slice(0, 10)
+      );
+    });
+  }, [netrunnerId]);
+
   return {
     netrunner,
     contracts,
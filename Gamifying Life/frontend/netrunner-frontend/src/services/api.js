@@ -45,8 +45,9 @@ class ApiService {
     return this.request(`/netrunner/${id}/dashboard`);
   }
 
-  async getContracts(id) {
-    return this.request(`/netrunner/${id}/contracts`);
+  async getContracts(id, cursor = null) {
+    const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+    return this.request(`/netrunner/${id}/contracts${query}`);
   }
 
   async createContract(netrunner_id, contractData) {
@@ -82,8 +83,9 @@ class ApiService {
     });
   }
 
-  async getEpicHacks(netrunner_id) {
-    return this.request(`/netrunner/${netrunner_id}/epic-hacks`);
+  async getEpicHacks(netrunner_id, cursor = null) {
+    const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+    return this.request(`/netrunner/${netrunner_id}/epic-hacks${query}`);
   }
 
   async createEpicHack(netrunner_id, epicHackData) {
@@ -93,18 +95,70 @@ class ApiService {
     });
   }
 
-  async getDataStream(netrunner_id, limit = 20) {
-    return this.request(`/netrunner/${netrunner_id}/data-stream?limit=${limit}`);
+  async getMilestones(epicHackId, cursor = null) {
+    const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+    return this.request(`/epic-hacks/${epicHackId}/milestones${query}`);
+  }
+
+  async createMilestone(epicHackId, milestoneData) {
+    return this.request(`/epic-hacks/${epicHackId}/milestones`, {
+      method: 'POST',
+      body: milestoneData
+    });
+  }
+
+  async completeMilestone(milestoneId) {
+    return this.request(`/milestones/${milestoneId}/complete`, {
+      method: 'POST'
+    });
+  }
+
+  // Ordered batch of actions (e.g. queued while offline) applied in one transaction.
+  // Create ops may set a `ref` that later ops use in place of an id.
+  async syncOperations(netrunner_id, ops, atomic = false) {
+    return this.request(`/netrunner/${netrunner_id}/sync`, {
+      method: 'POST',
+      body: { ops, atomic }
+    });
+  }
+
+  // Daily totals; start/end are YYYY-MM-DD, default is the last 30 days
+  async getAnalytics(netrunner_id, start = null, end = null) {
+    const params = new URLSearchParams();
+    if (start) params.set('start', start);
+    if (end) params.set('end', end);
+    const query = params.toString();
+    return this.request(`/netrunner/${netrunner_id}/analytics${query ? `?${query}` : ''}`);
+  }
+
+  async getDataStream(netrunner_id, limit = 20, cursor = null) {
+    const query = cursor ? `&cursor=${encodeURIComponent(cursor)}` : '';
+    return this.request(`/netrunner/${netrunner_id}/data-stream?limit=${limit}${query}`);
+  }
+
+  // Live data stream; EventSource resends Last-Event-ID on reconnect
+  subscribeDataStream(netrunner_id, onEntry) {
+    const source = new EventSource(`${API_BASE_URL}/netrunner/${netrunner_id}/data-stream/events`);
+    source.addEventListener('data_stream', (event) => onEntry(JSON.parse(event.data)));
+    return () => source.close();
   }
 
   async getSkills(netrunner_id) {
     return this.request(`/netrunner/${netrunner_id}/skills`);
   }
 
+  // Full history as NDJSON; a plain link so the browser streams the download
+  exportUrl(netrunner_id) {
+    return `${API_BASE_URL}/netrunner/${netrunner_id}/export`;
+  }
+
+  // A few starter contracts in one /sync batch; large datasets come from `flask netrunner seed`
   async setupDemoData(netrunner_id) {
-    return this.request(`/demo/setup/${netrunner_id}`, {
-      method: 'POST'
-    });
+    return this.syncOperations(netrunner_id, [
+      { op: 'create_contract', title: 'Complete React Tutorial', description: 'Learn React fundamentals and build a simple app', difficulty: 'Standard-Op', time_estimate: 2.0, contract_type: 'main' },
+      { op: 'create_contract', title: 'Morning Workout Routine', description: 'Complete daily exercise routine', difficulty: 'Low-Profile', time_estimate: 0.75, contract_type: 'maintenance' },
+      { op: 'create_contract', title: 'Database Architecture Review', description: 'Review and optimize database schema', difficulty: 'High-Stakes', time_estimate: 3.0, contract_type: 'main' }
+    ]);
   }
 }
 